@@ -0,0 +1,51 @@
+from logging.config import fileConfig
+from alembic import context
+from app.database import create_db_engine
+from app.models import Base
+from app.search_index import is_search_index_name
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def _database_url() -> str:
+    from app.config import get_settings
+    return config.get_main_option("sqlalchemy.url") or get_settings().database_url
+
+def _include_name(name, type_, parent_names) -> bool:
+    # The FTS5 transcript index is managed outside the ORM metadata
+    return not (type_ == "table" and is_search_index_name(name))
+
+def run_migrations_offline():
+    """Emit migration SQL without connecting to the database."""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=_include_name
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Run migrations against the configured database."""
+    connectable = create_db_engine(_database_url())
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+            include_name=_include_name
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    connectable.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,106 @@
+"""Initial schema: agents, customers, calls and inquiries
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 02:01:12.042578
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('agents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('employee_id', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('phone_number', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('average_performance_score', sa.Float(), nullable=True),
+    sa.Column('total_calls_handled', sa.Integer(), nullable=True),
+    sa.Column('specialization', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('agents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_agents_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_agents_employee_id'), ['employee_id'], unique=True)
+        batch_op.create_index(batch_op.f('ix_agents_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_agents_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_agents_phone_number'), ['phone_number'], unique=True)
+
+    op.create_table('customers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('phone_number', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customers_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_customers_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_customers_phone_number'), ['phone_number'], unique=True)
+
+    op.create_table('calls',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=True),
+    sa.Column('agent_id', sa.Integer(), nullable=True),
+    sa.Column('transcript', sa.Text(), nullable=True),
+    sa.Column('call_date', sa.DateTime(), nullable=True),
+    sa.Column('agent_performance_score', sa.Float(), nullable=True),
+    sa.Column('agent_issues', sa.Text(), nullable=True),
+    sa.Column('customer_interest_score', sa.Float(), nullable=True),
+    sa.Column('customer_description', sa.Text(), nullable=True),
+    sa.Column('customer_preferences', sa.Text(), nullable=True),
+    sa.Column('test_drive_readiness', sa.Float(), nullable=True),
+    sa.Column('analysis_results', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_calls_id'), ['id'], unique=False)
+
+    op.create_table('inquiries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('referral_nr', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('variables', sa.JSON(), nullable=True),
+    sa.Column('transcripts', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_id', 'referral_nr', name='uq_customer_referral')
+    )
+    with op.batch_alter_table('inquiries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_inquiries_id'), ['id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('inquiries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_inquiries_id'))
+
+    op.drop_table('inquiries')
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_calls_id'))
+
+    op.drop_table('calls')
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customers_phone_number'))
+        batch_op.drop_index(batch_op.f('ix_customers_id'))
+        batch_op.drop_index(batch_op.f('ix_customers_email'))
+
+    op.drop_table('customers')
+    with op.batch_alter_table('agents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_agents_phone_number'))
+        batch_op.drop_index(batch_op.f('ix_agents_name'))
+        batch_op.drop_index(batch_op.f('ix_agents_id'))
+        batch_op.drop_index(batch_op.f('ix_agents_employee_id'))
+        batch_op.drop_index(batch_op.f('ix_agents_email'))
+
+    op.drop_table('agents')
@@ -0,0 +1,31 @@
+"""Persistent cache of analysis results, keyed by transcript hash
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 02:01:13.104215
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('analysis_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.Column('hits', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_analysis_cache_created_at', 'analysis_cache', ['created_at'], unique=False)
+    op.create_index('ix_analysis_cache_last_used_at', 'analysis_cache', ['last_used_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_analysis_cache_last_used_at', table_name='analysis_cache')
+    op.drop_index('ix_analysis_cache_created_at', table_name='analysis_cache')
+    op.drop_table('analysis_cache')
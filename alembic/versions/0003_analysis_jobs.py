@@ -0,0 +1,44 @@
+"""Background analysis jobs and the analysis status of calls
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 02:01:13.861930
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('analysis_status', sa.String(), nullable=True))
+
+    op.create_table('analysis_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('call_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['call_id'], ['calls.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('call_id')
+    )
+    op.create_index('ix_analysis_jobs_id', 'analysis_jobs', ['id'], unique=False)
+    op.create_index('ix_analysis_jobs_status', 'analysis_jobs', ['status'], unique=False)
+
+    # Calls stored before background analysis were analysed inline
+    op.execute("UPDATE calls SET analysis_status = 'completed' WHERE analysis_status IS NULL")
+
+def downgrade():
+    op.drop_index('ix_analysis_jobs_status', table_name='analysis_jobs')
+    op.drop_index('ix_analysis_jobs_id', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
+
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.drop_column('analysis_status')
@@ -0,0 +1,24 @@
+"""Indexes for per-agent and per-customer call queries and inquiry status
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 02:01:14.579137
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_calls_agent_id_call_date', 'calls', ['agent_id', 'call_date'], unique=False)
+    op.create_index('ix_calls_customer_id_call_date', 'calls', ['customer_id', 'call_date'], unique=False)
+    op.create_index('ix_inquiries_status', 'inquiries', ['status'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_inquiries_status', table_name='inquiries')
+    op.drop_index('ix_calls_customer_id_call_date', table_name='calls')
+    op.drop_index('ix_calls_agent_id_call_date', table_name='calls')
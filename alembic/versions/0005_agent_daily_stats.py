@@ -0,0 +1,67 @@
+"""Per-agent daily rollup of analysed calls, backfilled from existing calls
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 02:04:20.473563
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('agent_daily_stats',
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('call_count', sa.Integer(), nullable=False),
+    sa.Column('performance_sum', sa.Float(), nullable=False),
+    sa.Column('performance_count', sa.Integer(), nullable=False),
+    sa.Column('interest_sum', sa.Float(), nullable=False),
+    sa.Column('interest_count', sa.Integer(), nullable=False),
+    sa.Column('readiness_sum', sa.Float(), nullable=False),
+    sa.Column('readiness_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
+    sa.PrimaryKeyConstraint('agent_id', 'day')
+    )
+
+    calls = sa.table(
+        'calls',
+        sa.column('agent_id', sa.Integer),
+        sa.column('call_date', sa.DateTime),
+        sa.column('agent_performance_score', sa.Float),
+        sa.column('customer_interest_score', sa.Float),
+        sa.column('test_drive_readiness', sa.Float),
+        sa.column('analysis_status', sa.String)
+    )
+    day = sa.func.date(calls.c.call_date)
+    totals = sa.select(
+        calls.c.agent_id,
+        day,
+        sa.func.count(),
+        sa.func.coalesce(sa.func.sum(calls.c.agent_performance_score), 0.0),
+        sa.func.count(calls.c.agent_performance_score),
+        sa.func.coalesce(sa.func.sum(calls.c.customer_interest_score), 0.0),
+        sa.func.count(calls.c.customer_interest_score),
+        sa.func.coalesce(sa.func.sum(calls.c.test_drive_readiness), 0.0),
+        sa.func.count(calls.c.test_drive_readiness)
+    ).where(
+        calls.c.agent_id.isnot(None),
+        calls.c.call_date.isnot(None),
+        sa.or_(calls.c.analysis_status.is_(None), calls.c.analysis_status == 'completed')
+    ).group_by(calls.c.agent_id, day)
+    stats = sa.table('agent_daily_stats', *[
+        sa.column(name) for name in (
+            'agent_id', 'day', 'call_count',
+            'performance_sum', 'performance_count',
+            'interest_sum', 'interest_count',
+            'readiness_sum', 'readiness_count'
+        )
+    ])
+    op.execute(stats.insert().from_select([c.name for c in stats.columns], totals))
+
+def downgrade():
+    op.drop_table('agent_daily_stats')
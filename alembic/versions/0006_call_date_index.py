@@ -0,0 +1,20 @@
+"""Index on calls.call_date for cursor pagination ordered by (call_date, id)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 02:10:41.118204
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_calls_call_date', 'calls', ['call_date'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_calls_call_date', table_name='calls')
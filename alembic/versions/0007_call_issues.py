@@ -0,0 +1,78 @@
+"""Normalised call issues, backfilled from calls.agent_issues
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 02:16:02.530117
+"""
+from alembic import op
+import re
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of the canonicalisation in app.services.issue_service at this revision
+_WHITESPACE = re.compile(r"\s+")
+_NO_ISSUE_LABELS = {"no issues", "no issue", "none", "n/a", "na", "nothing"}
+
+def _split_issues(agent_issues):
+    labels = []
+    for label in (agent_issues or "").split(","):
+        label = _WHITESPACE.sub(" ", label).strip(" \t.;:-").casefold()
+        if label and label not in _NO_ISSUE_LABELS and label not in labels:
+            labels.append(label)
+    return labels
+
+def upgrade():
+    call_issues = op.create_table('call_issues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('call_id', sa.Integer(), nullable=False),
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('issue', sa.String(), nullable=False),
+    sa.Column('call_date', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
+    sa.ForeignKeyConstraint(['call_id'], ['calls.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    calls = sa.table(
+        'calls',
+        sa.column('id', sa.Integer),
+        sa.column('agent_id', sa.Integer),
+        sa.column('call_date', sa.DateTime),
+        sa.column('agent_issues', sa.Text)
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(calls.c.id, calls.c.agent_id, calls.c.call_date, calls.c.agent_issues).where(
+            calls.c.agent_id.isnot(None),
+            calls.c.call_date.isnot(None),
+            calls.c.agent_issues.isnot(None),
+            calls.c.agent_issues != ''
+        )
+    )
+    batch = []
+    for row in rows:
+        batch.extend(
+            {'call_id': row.id, 'agent_id': row.agent_id, 'issue': issue, 'call_date': row.call_date}
+            for issue in _split_issues(row.agent_issues)
+        )
+        if len(batch) >= 1000:
+            op.bulk_insert(call_issues, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(call_issues, batch)
+
+    # Indexes are built after the backfill, which is faster than maintaining them row by row
+    op.create_index('ix_call_issues_agent_id_issue_call_date', 'call_issues', ['agent_id', 'issue', 'call_date'], unique=False)
+    op.create_index('ix_call_issues_call_date_issue', 'call_issues', ['call_date', 'issue'], unique=False)
+    op.create_index('ix_call_issues_call_id', 'call_issues', ['call_id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_call_issues_call_id', table_name='call_issues')
+    op.drop_index('ix_call_issues_call_date_issue', table_name='call_issues')
+    op.drop_index('ix_call_issues_agent_id_issue_call_date', table_name='call_issues')
+    op.drop_table('call_issues')
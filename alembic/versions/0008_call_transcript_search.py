@@ -0,0 +1,27 @@
+"""Full-text index of call transcripts (SQLite FTS5), backfilled from calls
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 03:05:41.218904
+"""
+from alembic import op
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS calls_fts "
+        "USING fts5(transcript, tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT INTO calls_fts (rowid, transcript) SELECT id, transcript FROM calls WHERE transcript IS NOT NULL")
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS calls_fts")
@@ -0,0 +1,47 @@
+"""Bulk import jobs, with their progress for resuming, and rejected rows
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 02:14:05.752571
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('import_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('rows_processed', sa.Integer(), nullable=True),
+    sa.Column('inserted', sa.Integer(), nullable=True),
+    sa.Column('rejected', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_jobs_id', 'import_jobs', ['id'], unique=False)
+
+    op.create_table('import_rejects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('row', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['import_jobs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_import_rejects_job_id', 'import_rejects', ['job_id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_import_rejects_job_id', table_name='import_rejects')
+    op.drop_table('import_rejects')
+    op.drop_index('ix_import_jobs_id', table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -0,0 +1,121 @@
+"""Move call transcripts and raw analysis results to a compressed side table
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 03:41:12.604417
+"""
+from alembic import op
+import json
+import logging
+import zlib
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+BATCH_SIZE = 1000
+# Frozen copy of app.db_types.CompressedText at this revision
+COMPRESSION_LEVEL = 6
+
+calls = sa.table(
+    'calls',
+    sa.column('id', sa.Integer()),
+    sa.column('transcript', sa.Text()),
+    sa.column('analysis_results', sa.Text())
+)
+call_contents = sa.table(
+    'call_contents',
+    sa.column('call_id', sa.Integer()),
+    sa.column('transcript', sa.LargeBinary()),
+    sa.column('analysis_results', sa.LargeBinary())
+)
+
+def _raw(value):
+    if value is None:
+        return None
+    # JSON columns come back already decoded on some drivers
+    return (value if isinstance(value, str) else json.dumps(value)).encode('utf-8')
+
+def _compress(raw):
+    return None if raw is None else zlib.compress(raw, COMPRESSION_LEVEL)
+
+def _decompress(value):
+    return None if value is None else zlib.decompress(value).decode('utf-8')
+
+def _batches(bind, table, key):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table).where(key > last_id).order_by(key).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def upgrade():
+    op.create_table('call_contents',
+    sa.Column('call_id', sa.Integer(), nullable=False),
+    sa.Column('transcript', sa.LargeBinary(), nullable=True),
+    sa.Column('analysis_results', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['call_id'], ['calls.id'], ),
+    sa.PrimaryKeyConstraint('call_id')
+    )
+
+    bind = op.get_bind()
+    count = raw_size = compressed_size = 0
+    for rows in _batches(bind, calls, calls.c.id):
+        values = []
+        for row in rows:
+            transcript, analysis_results = _raw(row.transcript), _raw(row.analysis_results)
+            values.append({
+                'call_id': row.id,
+                'transcript': _compress(transcript),
+                'analysis_results': _compress(analysis_results)
+            })
+            raw_size += sum(len(value) for value in (transcript, analysis_results) if value is not None)
+            compressed_size += sum(
+                len(value) for value in (values[-1]['transcript'], values[-1]['analysis_results']) if value is not None
+            )
+        bind.execute(call_contents.insert(), values)
+        count += len(rows)
+
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.drop_column('analysis_results')
+        batch_op.drop_column('transcript')
+
+    if raw_size:
+        logger.info(
+            f"Compressed the transcripts and analysis results of {count} calls: "
+            f"{raw_size / 2**20:.1f} MiB -> {compressed_size / 2**20:.1f} MiB "
+            f"({1 - compressed_size / raw_size:.0%} saved). Run VACUUM to return the space to the filesystem."
+        )
+
+def downgrade():
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('transcript', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('analysis_results', sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    for rows in _batches(bind, call_contents, call_contents.c.call_id):
+        bind.execute(
+            calls.update().where(calls.c.id == sa.bindparam('call_id')).values(
+                transcript=sa.bindparam('raw_transcript'),
+                analysis_results=sa.bindparam('raw_analysis_results')
+            ),
+            [
+                {
+                    'call_id': row.call_id,
+                    'raw_transcript': _decompress(row.transcript),
+                    'raw_analysis_results': _decompress(row.analysis_results)
+                }
+                for row in rows
+            ]
+        )
+
+    op.drop_table('call_contents')
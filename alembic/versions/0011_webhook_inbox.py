@@ -0,0 +1,39 @@
+"""Inbox of received inquiry webhooks, deduplicated by delivery
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 02:29:49.092162
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('webhook_inbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dedupe_key', sa.String(length=128), nullable=False),
+    sa.Column('inquiry_id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inquiry_id'], ['inquiries.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dedupe_key')
+    )
+    op.create_index('ix_webhook_inbox_id', 'webhook_inbox', ['id'], unique=False)
+    op.create_index('ix_webhook_inbox_inquiry_id', 'webhook_inbox', ['inquiry_id'], unique=False)
+    op.create_index('ix_webhook_inbox_status', 'webhook_inbox', ['status'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_webhook_inbox_status', table_name='webhook_inbox')
+    op.drop_index('ix_webhook_inbox_inquiry_id', table_name='webhook_inbox')
+    op.drop_index('ix_webhook_inbox_id', table_name='webhook_inbox')
+    op.drop_table('webhook_inbox')
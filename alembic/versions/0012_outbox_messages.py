@@ -0,0 +1,41 @@
+"""Outbox of outbound requests, sent by the dispatcher after commit
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 02:35:05.638043
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('outbox_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('inquiry_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('response_code', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inquiry_id'], ['inquiries.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_messages_id', 'outbox_messages', ['id'], unique=False)
+    op.create_index('ix_outbox_messages_inquiry_id', 'outbox_messages', ['inquiry_id'], unique=False)
+    op.create_index('ix_outbox_messages_status_next_attempt_at', 'outbox_messages', ['status', 'next_attempt_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_outbox_messages_status_next_attempt_at', table_name='outbox_messages')
+    op.drop_index('ix_outbox_messages_inquiry_id', table_name='outbox_messages')
+    op.drop_index('ix_outbox_messages_id', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
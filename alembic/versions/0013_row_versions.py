@@ -0,0 +1,62 @@
+"""Row versions and update timestamps for ETags, and the agents' missing created_at
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17 02:40:02.738721
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('agents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('inquiries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    # Rows from before these columns existed get the migration time
+    for table, columns in (
+        ('agents', ('created_at', 'updated_at')),
+        ('calls', ('updated_at',)),
+        ('customers', ('updated_at',)),
+        ('inquiries', ('created_at', 'updated_at'))
+    ):
+        for column in columns:
+            op.execute(f"UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE {column} IS NULL")
+
+def downgrade():
+    with op.batch_alter_table('inquiries', schema=None) as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('calls', schema=None) as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('agents', schema=None) as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
@@ -0,0 +1,38 @@
+"""Next attempt times for retrying analysis jobs and inbox webhooks with backoff
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17 03:07:13.675837
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('analysis_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('webhook_inbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+
+    # Rows from before backoff are due straight away
+    for table in ('analysis_jobs', 'webhook_inbox'):
+        op.execute(f"UPDATE {table} SET next_attempt_at = created_at WHERE next_attempt_at IS NULL")
+
+    op.create_index('ix_analysis_jobs_status_next_attempt_at', 'analysis_jobs', ['status', 'next_attempt_at'], unique=False)
+    op.create_index('ix_webhook_inbox_status_next_attempt_at', 'webhook_inbox', ['status', 'next_attempt_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_webhook_inbox_status_next_attempt_at', table_name='webhook_inbox')
+    op.drop_index('ix_analysis_jobs_status_next_attempt_at', table_name='analysis_jobs')
+
+    with op.batch_alter_table('webhook_inbox', schema=None) as batch_op:
+        batch_op.drop_column('next_attempt_at')
+
+    with op.batch_alter_table('analysis_jobs', schema=None) as batch_op:
+        batch_op.drop_column('next_attempt_at')
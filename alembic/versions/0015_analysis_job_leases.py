@@ -0,0 +1,25 @@
+"""Claim times of analysis jobs, so only jobs whose lease expired are requeued
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-17 03:24:00.838261
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('analysis_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('locked_at', sa.DateTime(), nullable=True))
+
+    # Jobs processing before leases were claimed when they were last updated
+    op.execute("UPDATE analysis_jobs SET locked_at = updated_at WHERE status = 'processing'")
+
+def downgrade():
+    with op.batch_alter_table('analysis_jobs', schema=None) as batch_op:
+        batch_op.drop_column('locked_at')
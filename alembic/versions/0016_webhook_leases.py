@@ -0,0 +1,25 @@
+"""Claim times of inbox webhooks, so only webhooks whose lease expired are requeued
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-17 03:31:42.517093
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('webhook_inbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('locked_at', sa.DateTime(), nullable=True))
+
+    # Webhooks processing before leases were claimed when they were last updated
+    op.execute("UPDATE webhook_inbox SET locked_at = updated_at WHERE status = 'processing'")
+
+def downgrade():
+    with op.batch_alter_table('webhook_inbox', schema=None) as batch_op:
+        batch_op.drop_column('locked_at')
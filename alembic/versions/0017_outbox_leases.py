@@ -0,0 +1,25 @@
+"""Claim times of outbox messages, so only messages whose lease expired are requeued
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-17 03:38:05.260814
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0017'
+down_revision = '0016'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.batch_alter_table('outbox_messages', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('locked_at', sa.DateTime(), nullable=True))
+
+    # Messages sending before leases were claimed when they were last updated
+    op.execute("UPDATE outbox_messages SET locked_at = updated_at WHERE status = 'sending'")
+
+def downgrade():
+    with op.batch_alter_table('outbox_messages', schema=None) as batch_op:
+        batch_op.drop_column('locked_at')
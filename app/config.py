@@ -0,0 +1,128 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+class Settings:
+    """Runtime configuration read from the environment."""
+
+    def __init__(self):
+        self.testing = os.getenv("TESTING") == "1"
+
+        # Database. Tests always use their own file unless TEST_DATABASE_URL says otherwise.
+        self.database_url = (
+            os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db") if self.testing
+            else os.getenv("DATABASE_URL", "sqlite:///./gargash.db")
+        )
+        # SQLite pragmas applied to every connection
+        self.sqlite_journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+        self.sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        self.sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+        # Negative values are in KiB, as in PRAGMA cache_size
+        self.sqlite_cache_size = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+        # Connection pool for server databases
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        self.db_pool_recycle_seconds = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+        self.db_pool_timeout_seconds = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+        self.db_pool_pre_ping = _env_bool("DB_POOL_PRE_PING", True)
+
+        # Gemini
+        self.google_api_key = os.getenv("GOOGLE_API_KEY")
+        self.gemini_model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+        # How long the cached list of available models stays fresh (seconds)
+        self.gemini_models_refresh_seconds = float(os.getenv("GEMINI_MODELS_REFRESH_SECONDS", "3600"))
+        # Warm up the shared Gemini client when the app starts
+        self.ai_warmup_on_startup = _env_bool("AI_WARMUP_ON_STARTUP", not self.testing)
+        # Gemini client limits, retries and circuit breaker
+        self.gemini_max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+        self.gemini_requests_per_minute = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+        self.gemini_tokens_per_minute = float(os.getenv("GEMINI_TOKENS_PER_MINUTE", "1000000"))
+        self.gemini_max_retries = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+        self.gemini_backoff_base = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "0.5"))
+        self.gemini_backoff_max = float(os.getenv("GEMINI_BACKOFF_MAX_SECONDS", "20"))
+        self.gemini_attempt_timeout = float(os.getenv("GEMINI_ATTEMPT_TIMEOUT_SECONDS", "30"))
+        self.gemini_deadline = float(os.getenv("GEMINI_DEADLINE_SECONDS", "90"))
+        self.gemini_breaker_threshold = int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+        self.gemini_breaker_reset_seconds = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+        # "fail_fast" rejects calls while the circuit is open, "queue" waits for it to half-open
+        self.gemini_breaker_mode = os.getenv("GEMINI_BREAKER_MODE", "fail_fast")
+
+        # Tiered analysis: routine calls are scored locally instead of by the model
+        self.tiered_analysis_enabled = _env_bool("TIERED_ANALYSIS_ENABLED", True)
+        self.tiered_confidence_threshold = float(os.getenv("TIERED_CONFIDENCE_THRESHOLD", "0.75"))
+
+        # Background call analysis
+        self.analysis_workers_enabled = _env_bool("ANALYSIS_WORKERS_ENABLED", not self.testing)
+        self.analysis_worker_count = int(os.getenv("ANALYSIS_WORKERS", "4"))
+        self.analysis_max_attempts = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+        # Retries wait this long, doubling per attempt up to the maximum
+        self.analysis_retry_base_seconds = float(os.getenv("ANALYSIS_RETRY_BASE_SECONDS", "5"))
+        self.analysis_retry_max_seconds = float(os.getenv("ANALYSIS_RETRY_MAX_SECONDS", "300"))
+        # How often the workers look for jobs due for a retry
+        self.analysis_poll_seconds = float(os.getenv("ANALYSIS_POLL_SECONDS", "5"))
+        # A job still processing this long after it was claimed has lost its worker and is requeued
+        self.analysis_lease_seconds = float(os.getenv("ANALYSIS_LEASE_SECONDS", "900"))
+
+        # Outbound bland.ai calls, sent from the outbox by the dispatcher
+        self.bland_api_url = os.getenv("BLAND_API_URL", "https://api.bland.ai/v1/calls")
+        # Secrets and deployment URLs have no default; call requests fail until they are set
+        self.bland_api_key = os.getenv("BLAND_API_KEY")
+        self.bland_webhook_url = os.getenv("BLAND_WEBHOOK_URL")
+        self.outbox_dispatcher_enabled = _env_bool("OUTBOX_DISPATCHER_ENABLED", not self.testing)
+        self.outbox_concurrency = int(os.getenv("OUTBOX_CONCURRENCY", "4"))
+        self.outbox_timeout_seconds = float(os.getenv("OUTBOX_TIMEOUT_SECONDS", "10"))
+        self.outbox_max_attempts = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+        # Retries wait this long, doubling per attempt up to the maximum
+        self.outbox_retry_base_seconds = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "2"))
+        self.outbox_retry_max_seconds = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "300"))
+        # How often the dispatcher looks for messages due for a retry
+        self.outbox_poll_seconds = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+        # A message still sending this long after it was claimed has lost its worker and is sent again
+        self.outbox_lease_seconds = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+        # Inquiry webhook inbox
+        self.webhook_workers_enabled = _env_bool("WEBHOOK_WORKERS_ENABLED", not self.testing)
+        self.webhook_worker_count = int(os.getenv("WEBHOOK_WORKERS", "2"))
+        self.webhook_max_attempts = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+        self.webhook_retry_base_seconds = float(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "5"))
+        self.webhook_retry_max_seconds = float(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "300"))
+        self.webhook_poll_seconds = float(os.getenv("WEBHOOK_POLL_SECONDS", "5"))
+        self.webhook_lease_seconds = float(os.getenv("WEBHOOK_LEASE_SECONDS", "900"))
+
+        # Long transcripts are analysed in chunks, up to this many characters in total
+        self.long_transcript_max_length = int(os.getenv("LONG_TRANSCRIPT_MAX_LENGTH", "200000"))
+        self.long_transcript_overlap_turns = int(os.getenv("LONG_TRANSCRIPT_OVERLAP_TURNS", "1"))
+        self.long_transcript_concurrency = int(os.getenv("LONG_TRANSCRIPT_CONCURRENCY", "4"))
+
+        # Batch call ingestion
+        self.call_batch_concurrency = int(os.getenv("CALL_BATCH_CONCURRENCY", "8"))
+        self.call_batch_max_size = int(os.getenv("CALL_BATCH_MAX_SIZE", "1000"))
+
+        # Bulk import: rows validated, deduplicated and inserted per transaction
+        self.import_batch_size = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+        # Analysis result cache
+        self.analysis_cache_enabled = _env_bool("ANALYSIS_CACHE_ENABLED", True)
+        self.analysis_cache_memory_size = int(os.getenv("ANALYSIS_CACHE_MEMORY_SIZE", "1024"))
+        self.analysis_cache_ttl_seconds = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.analysis_cache_max_entries = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "100000"))
+
+        # Agent performance result cache; writes in this process invalidate it at once,
+        # writes by other processes show up once entries are this old
+        self.performance_cache_enabled = _env_bool("PERFORMANCE_CACHE_ENABLED", True)
+        self.performance_cache_size = int(os.getenv("PERFORMANCE_CACHE_SIZE", "4096"))
+        self.performance_cache_max_staleness_seconds = float(os.getenv("PERFORMANCE_CACHE_MAX_STALENESS_SECONDS", "30"))
+
+@lru_cache()
+def get_settings() -> Settings:
+    """Get the process-wide settings."""
+    return Settings()
@@ -1,29 +1,112 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
 from .models import Base
+from app.config import Settings, get_settings
 from app.models import Agent
 from app.schemas import AgentCreate
+from app import search_index  # noqa: F401  registers the transcript index listeners
 import time
 from sqlalchemy.orm import Session
 from datetime import datetime, UTC
+from typing import Optional
 
-load_dotenv()
+def _is_sqlite_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
 
-# Use test database for testing, otherwise use main database
-db_url = "sqlite:///./test.db" if os.getenv("TESTING") == "1" else "sqlite:///./gargash.db"
+def _sqlite_pragmas(settings: Settings, url: str) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size={settings.sqlite_cache_size}",
+        f"PRAGMA mmap_size={settings.sqlite_mmap_size}"
+    ]
+    # WAL needs a file: readers then no longer wait for writers
+    if not _is_sqlite_memory(url):
+        pragmas.insert(0, f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    return pragmas
+
+def _apply_pragmas(engine: Engine, pragmas: list):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def _pool_options(settings: Settings) -> dict:
+    return dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping
+    )
+
+# Async drivers used in place of each database's default one
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+def async_database_url(url: str) -> str:
+    """Switch a database URL to the async driver of its database."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver known for {backend}")
+    if parsed.get_driver_name() == driver:
+        return url
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+def create_db_engine(url: Optional[str] = None, settings: Optional[Settings] = None) -> Engine:
+    """Create the database engine for a URL, tuned from settings.
+
+    SQLite connections get WAL journaling and the configured pragmas. Other
+    databases get a sized, recycled connection pool.
+    """
+    settings = settings or get_settings()
+    url = url or settings.database_url
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.sqlite_busy_timeout_ms / 1000
+            }
+        )
+        _apply_pragmas(engine, _sqlite_pragmas(settings, url))
+        return engine
+
+    return create_engine(url, **_pool_options(settings))
+
+def create_async_db_engine(url: Optional[str] = None, settings: Optional[Settings] = None, **kwargs) -> AsyncEngine:
+    """Create the async engine for the request path, tuned like `create_db_engine`.
+
+    The URL is switched to the database's async driver (aiosqlite for
+    SQLite). Extra keyword arguments go to `create_async_engine`.
+    """
+    settings = settings or get_settings()
+    url = async_database_url(url or settings.database_url)
+    if url.startswith("sqlite"):
+        engine = create_async_engine(url, connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000}, **kwargs)
+        _apply_pragmas(engine.sync_engine, _sqlite_pragmas(settings, url))
+        return engine
+    return create_async_engine(url, **{**_pool_options(settings), **kwargs})
 
 # Create database engine
-engine = create_engine(
-    db_url,
-    connect_args={"check_same_thread": False} if db_url.startswith("sqlite") else {}
-)
+engine = create_db_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions for the async request path. Objects stay loaded
+# after commit, since lazy loads can't run outside the session's greenlet.
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -34,6 +117,11 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def get_default_ai_agent_id(db: Session = None):
     """Get the ID of the default AI agent, creating it if it doesn't exist."""
     if db is None:
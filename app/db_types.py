@@ -0,0 +1,38 @@
+import json
+import zlib
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+class CompressedText(TypeDecorator):
+    """Text stored as a zlib-compressed BLOB. Reads and writes plain strings."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, level: int = 6, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.level = level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(self._dump(value).encode("utf-8"), self.level)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._load(zlib.decompress(value).decode("utf-8"))
+
+    def _dump(self, value) -> str:
+        return value
+
+    def _load(self, text: str):
+        return text
+
+class CompressedJSON(CompressedText):
+    """JSON stored as a zlib-compressed BLOB. Reads and writes Python values."""
+    cache_ok = True
+
+    def _dump(self, value) -> str:
+        return json.dumps(value)
+
+    def _load(self, text: str):
+        return json.loads(text)
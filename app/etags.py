@@ -0,0 +1,28 @@
+from typing import Any, Iterable, Optional, Sequence
+import hashlib
+from fastapi import Response, status
+
+def versions_etag(resource: str, versions: Iterable[Sequence[Any]], *params: Any) -> str:
+    """Build a strong ETag from the (id, version) pairs of the rows a response is made of.
+
+    `params` are the request options that change the representation of the
+    same rows, such as the view or the page bounds. Only the small version
+    tuples are hashed, never the response body.
+    """
+    digest = hashlib.sha256(resource.encode("utf-8"))
+    digest.update(repr(params).encode("utf-8"))
+    for row in versions:
+        digest.update(repr(tuple(row)).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names `etag`. GET uses the weak comparison, so a W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def not_modified(etag: str) -> Response:
+    """An empty 304 response for a client whose copy is current."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
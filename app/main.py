@@ -1,24 +1,65 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional, Union
+from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
-from . import models, schemas
-from .database import get_db, engine
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import json
+from . import database, models, schemas
+from .database import get_async_db, get_db, engine
+from .etags import etag_matches, not_modified, versions_etag
+from .search_index import ensure_search_index
+from .config import get_settings
 from .services.agent_service import AgentService
+from .services.async_call_service import AsyncCallService
+from .services.async_inquiry_service import AsyncInquiryService
 from .services.call_service import CallService
 from .services.customer_service import CustomerService
-from .services.ai_service import AIService
 from .services.inquiry_service import InquiryService
+from .services.ai_service import get_shared_ai_service, warm_up_shared_ai_service
+from .services.import_service import ImportService, detect_format, read_rows
+from .services.issue_service import IssueService
+from .services.search_service import SearchService
+from .services.tiered_ai_service import get_analysis_service
+from .services.analysis_cache import get_analysis_cache
+from .services.performance_cache import get_performance_cache
+from .services.analysis_job_service import AnalysisWorkerPool, get_analysis_worker_pool
+from .services.webhook_inbox_service import WebhookInboxService, WebhookInboxWorkerPool, get_webhook_inbox_worker_pool
+from .services.outbox_service import OutboxDispatcher, OutboxService, get_outbox_dispatcher
 from pydantic import ValidationError
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the AI service and run the background workers for the life of the app."""
+    settings = get_settings()
+    if settings.ai_warmup_on_startup:
+        warm_up_shared_ai_service()
+    pools = [
+        pool for pool, enabled in (
+            (get_analysis_worker_pool(), settings.analysis_workers_enabled),
+            (get_webhook_inbox_worker_pool(), settings.webhook_workers_enabled),
+            (get_outbox_dispatcher(), settings.outbox_dispatcher_enabled)
+        ) if enabled
+    ]
+    for pool in pools:
+        await run_in_threadpool(pool.start)
+    yield
+    for pool in pools:
+        await run_in_threadpool(pool.shutdown)
 
 # Create FastAPI app
 app = FastAPI(
     title="Call Analysis System",
     description="AI-powered call analysis for Mercedes-Benz dealership",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -30,10 +71,23 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+PaginationMode = Literal["offset", "cursor"]
+CallView = Literal["full", "summary"]
+CallList = Union[List[schemas.Call], List[schemas.CallSummary]]
+ImportKind = Literal["agents", "customers", "calls"]
+ImportFormat = Literal["csv", "ndjson"]
+InboxStatusFilter = Literal["pending", "processing", "completed", "failed"]
+OutboxStatusFilter = Literal["pending", "sending", "sent", "failed"]
+
+def _call_list(calls: List[models.Call], view: str) -> list:
+    """Shape calls for a list response. Summary rows are built from the loaded columns only."""
+    if view == "summary":
+        return [schemas.CallSummary.model_validate(call) for call in calls]
+    return calls
+
 # Dependency for AI service (for test overrides)
 def get_ai_service():
-    from .services.ai_service import AIService
-    return AIService()
+    return get_analysis_service()
 
 # Agent endpoints
 @app.post("/agents/", response_model=schemas.Agent)
@@ -41,10 +95,36 @@ def create_agent(agent: schemas.AgentCreate, db: Session = Depends(get_db)):
     """Create a new agent."""
     return AgentService(db).create_agent(agent)
 
-@app.get("/agents/", response_model=List[schemas.Agent])
-def get_agents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of agents."""
-    return AgentService(db).get_agents(skip, limit)
+@app.get("/agents/", response_model=Union[List[schemas.Agent], schemas.Page[schemas.Agent]])
+def get_agents(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    pagination: PaginationMode = "offset",
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get list of agents.
+
+    With `pagination=cursor` (or a `cursor`), returns a page ordered by ID
+    with a `next_cursor` for the following page. The ETag changes when an
+    agent on the page does; send it back in `If-None-Match` to get a 304.
+    """
+    service = AgentService(db)
+    if pagination == "cursor" or cursor:
+        versions, next_cursor = service.get_agents_page_versions(cursor, limit)
+        etag = versions_etag("agents", versions, "cursor", cursor, limit, next_cursor)
+    else:
+        etag = versions_etag("agents", service.get_agents_versions(skip, limit), "offset", skip, limit)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    if pagination == "cursor" or cursor:
+        items, next_cursor = service.get_agents_page(cursor, limit)
+        return {"items": items, "next_cursor": next_cursor}
+    return service.get_agents(skip, limit)
 
 @app.get("/agents/{agent_id}", response_model=schemas.Agent)
 def get_agent(agent_id: int, db: Session = Depends(get_db)):
@@ -70,21 +150,64 @@ def get_agent_performance(agent_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Agent not found")
     return performance
 
+@app.get("/agents/{agent_id}/issues", response_model=List[schemas.IssueCount])
+def get_agent_issues(
+    agent_id: int,
+    days: int = Query(30, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Get an agent's most frequent issues over the last `days` days."""
+    if not AgentService(db).get_agent(agent_id):
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return IssueService(db).agent_issue_counts(agent_id, days, limit)
+
+@app.get("/issues/top", response_model=List[schemas.IssueCount])
+def get_top_issues(days: int = Query(7, ge=1), limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
+    """Get the most frequent issues across all agents over the last `days` days."""
+    return IssueService(db).top_issues(days, limit)
+
 # Customer endpoints
 @app.post("/customers/", response_model=schemas.Customer)
 def create_customer(customer: schemas.CustomerCreate, db: Session = Depends(get_db)):
     """Create a new customer."""
     return CustomerService(db).create_customer(customer)
 
-@app.get("/customers/", response_model=List[schemas.Customer])
-def get_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get list of customers."""
-    return CustomerService(db).get_customers(skip, limit)
+@app.get("/customers/", response_model=Union[List[schemas.Customer], schemas.Page[schemas.Customer]])
+def get_customers(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    pagination: PaginationMode = "offset",
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get list of customers.
+
+    With `pagination=cursor` (or a `cursor`), returns a page ordered by ID
+    with a `next_cursor` for the following page.
+    """
+    service = CustomerService(db)
+    if pagination == "cursor" or cursor:
+        items, next_cursor = service.get_customers_page(cursor, limit)
+        return {"items": items, "next_cursor": next_cursor}
+    return service.get_customers(skip, limit)
 
 @app.get("/customers/{customer_id}", response_model=schemas.Customer)
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
-    """Get customer by ID."""
-    customer = CustomerService(db).get_customer(customer_id)
+def get_customer(
+    customer_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get customer by ID. Send the ETag back in `If-None-Match` to get a 304 while it is unchanged."""
+    service = CustomerService(db)
+    version = service.get_customer_version(customer_id)
+    if version is not None:
+        etag = versions_etag("customer", [(customer_id, version)])
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+    customer = service.get_customer(customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     return customer
@@ -99,38 +222,265 @@ def update_customer(customer_id: int, customer: schemas.CustomerUpdate, db: Sess
 
 # Call endpoints
 @app.post("/calls/", response_model=schemas.Call)
-def create_call(call: schemas.CallCreate, db: Session = Depends(get_db), ai_service=Depends(get_ai_service)):
-    """Create a new call with AI analysis."""
-    return CallService(db, ai_service).create_call(call)
+def create_call(
+    call: schemas.CallCreate,
+    response: Response,
+    async_analysis: bool = False,
+    db: Session = Depends(get_db),
+    ai_service=Depends(get_ai_service),
+    worker_pool: AnalysisWorkerPool = Depends(get_analysis_worker_pool)
+):
+    """Create a new call with AI analysis.
+
+    With `async_analysis=true` the call is stored straight away with a pending
+    analysis and 202 Accepted is returned; poll `/calls/{id}/analysis` for the result.
+    """
+    if not async_analysis:
+        return CallService(db, ai_service).create_call(call)
+    db_call = CallService(db, ai_service).submit_call(call)
+    worker_pool.submit(db_call.analysis_job.id)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return db_call
+
+@app.post("/calls/batch", response_model=schemas.CallBatchResult)
+def create_calls_batch(
+    calls: List[schemas.CallCreate],
+    concurrency: Optional[int] = Query(None, ge=1, le=64),
+    db: Session = Depends(get_db),
+    ai_service=Depends(get_ai_service)
+):
+    """Create many calls in one request, analysing them concurrently."""
+    if len(calls) > get_settings().call_batch_max_size:
+        raise HTTPException(status_code=413, detail="Batch too large")
+    results = CallService(db, ai_service).create_calls_batch(calls, concurrency)
+    created = sum(1 for result in results if result["status"] == "created")
+    return {"created": created, "failed": len(results) - created, "results": results}
 
-@app.get("/calls/", response_model=List[schemas.Call])
-def get_all_calls(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get a list of all calls."""
-    return CallService(db).get_calls(skip=skip, limit=limit)
+def _sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _call_analysis_events(ai_service, call: schemas.CallCreate):
+    """Stream a call's analysis as server-sent events, then store the call.
+
+    The response body is sent after the endpoint returns and its `get_db`
+    session is closed, so the events use a session of their own.
+    """
+    db = database.SessionLocal()
+    try:
+        call_service = CallService(db, ai_service)
+        analysis = await run_in_threadpool(call_service.get_cached_analysis, call.transcript)
+        if analysis is None:
+            parts = []
+            try:
+                async for text in ai_service.stream_analysis(call.transcript):
+                    parts.append(text)
+                    yield _sse_event("partial", {"text": text})
+                analysis = ai_service.parse_analysis("".join(parts))
+            except Exception as e:
+                yield _sse_event("error", {"detail": str(e)})
+                return
+        try:
+            db_call = await run_in_threadpool(call_service.create_call, call, analysis)
+        except HTTPException as e:
+            yield _sse_event("error", {"detail": e.detail})
+            return
+        yield _sse_event("result", {"call_id": db_call.id, "analysis": analysis})
+    finally:
+        await run_in_threadpool(db.close)
+
+@app.post("/calls/analyze/stream")
+def stream_call_analysis(call: schemas.CallCreate, db: Session = Depends(get_db), ai_service=Depends(get_ai_service)):
+    """Analyse a call with streamed output, sent as server-sent events.
+
+    `partial` events carry model output as it is generated. A final `result`
+    event carries the parsed analysis and the ID of the stored call, or an
+    `error` event is sent instead.
+    """
+    CallService(db, ai_service).validate_streaming_call(call)
+    return StreamingResponse(
+        _call_analysis_events(ai_service, call),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/calls/", response_model=Union[CallList, schemas.Page[schemas.Call], schemas.Page[schemas.CallSummary]])
+async def get_all_calls(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    pagination: PaginationMode = "offset",
+    cursor: Optional[str] = None,
+    agent_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    view: CallView = "full",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a list of calls, optionally filtered by agent, customer and date range.
+
+    With `pagination=cursor` (or a `cursor`), returns a page ordered by call
+    date and ID with a `next_cursor` for the following page. Deep pages cost
+    the same as the first one. `view=summary` returns scores and dates only.
+    """
+    service = AsyncCallService(db)
+    filters = dict(agent_id=agent_id, customer_id=customer_id, start_date=start_date, end_date=end_date, view=view)
+    if pagination == "cursor" or cursor:
+        items, next_cursor = await service.get_calls_page(cursor, limit, **filters)
+        return {"items": _call_list(items, view), "next_cursor": next_cursor}
+    return _call_list(await service.get_calls(skip=skip, limit=limit, **filters), view)
+
+@app.get("/calls/search", response_model=List[schemas.CallSearchResult])
+def search_calls(
+    q: str = Query(..., min_length=1),
+    agent_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Search call transcripts, best match first.
+
+    Words must all appear; use "quoted phrases", `prefix*` and `OR` to
+    refine. Each result carries a highlighted snippet of the transcript.
+    """
+    return SearchService(db).search_calls(
+        q, agent_id=agent_id, start_date=start_date, end_date=end_date, limit=limit, offset=offset
+    )
 
 @app.get("/calls/{call_id}", response_model=schemas.Call)
-def get_call(call_id: int, db: Session = Depends(get_db)):
+async def get_call(call_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get call by ID."""
-    call = CallService(db).get_call(call_id)
+    call = await AsyncCallService(db).get_call(call_id)
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
     return call
 
-@app.get("/customers/{customer_id}/calls/", response_model=List[schemas.Call])
-def get_customer_calls(customer_id: int, db: Session = Depends(get_db)):
-    """Get all calls for a customer."""
-    return CallService(db).get_customer_calls(customer_id)
+@app.get("/calls/{call_id}/analysis", response_model=schemas.CallAnalysisStatus)
+async def get_call_analysis(call_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the analysis status of a call."""
+    service = AsyncCallService(db)
+    call = await service.get_call(call_id)
+    if not call:
+        raise HTTPException(status_code=404, detail="Call not found")
+    job = await service.get_job_for_call(call_id)
+    return {
+        "call_id": call.id,
+        "analysis_status": call.analysis_status,
+        "attempts": job.attempts if job else 0,
+        "error": job.error if job else None,
+        "analysis_results": call.analysis_results if call.analysis_status == models.AnalysisStatus.COMPLETED else None
+    }
+
+@app.get("/customers/{customer_id}/calls/", response_model=CallList)
+async def get_customer_calls(
+    customer_id: int,
+    response: Response,
+    view: CallView = "full",
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all calls for a customer. `view=summary` returns scores and dates only.
+
+    The ETag changes when a call is added or changed; send it back in
+    `If-None-Match` to get a 304.
+    """
+    service = AsyncCallService(db)
+    etag = versions_etag("customer_calls", await service.get_customer_call_versions(customer_id), customer_id, view)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return _call_list(await service.get_customer_calls(customer_id, view), view)
 
-@app.get("/agents/{agent_id}/calls/", response_model=List[schemas.Call])
-def get_agent_calls(agent_id: int, days: int = 30, db: Session = Depends(get_db)):
-    """Get recent calls for an agent."""
-    return CallService(db).get_agent_calls(agent_id, days)
+@app.get("/agents/{agent_id}/calls/", response_model=CallList)
+async def get_agent_calls(
+    agent_id: int,
+    days: int = 30,
+    view: CallView = "full",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get recent calls for an agent. `view=summary` returns scores and dates only."""
+    return _call_list(await AsyncCallService(db).get_agent_calls(agent_id, days, view), view)
+
+# Bulk import endpoints
+@app.post("/imports/{kind}", response_model=schemas.ImportJob)
+def import_rows(
+    kind: ImportKind,
+    file: UploadFile = File(...),
+    job_id: Optional[int] = None,
+    format: Optional[ImportFormat] = None,
+    db: Session = Depends(get_db),
+    worker_pool: AnalysisWorkerPool = Depends(get_analysis_worker_pool)
+):
+    """Bulk import agents, customers or historical calls from a CSV or NDJSON file.
+
+    Rows are validated with the create schemas and inserted in batches;
+    rejected rows are listed at `/imports/{id}/rejects`. To resume an
+    interrupted import, upload the same file again with its `job_id`.
+    Imported calls are queued for background analysis.
+    """
+    service = ImportService(db)
+    fmt = format or detect_format(file.filename, file.content_type)
+    job = service.resume_job(job_id, kind) if job_id else service.start_job(kind, file.filename)
+    job = service.run(job, read_rows(file.file, fmt))
+    for analysis_job_id in service.analysis_job_ids:
+        worker_pool.submit(analysis_job_id)
+    return job
+
+@app.get("/imports/{job_id}", response_model=schemas.ImportJob)
+def get_import(job_id: int, db: Session = Depends(get_db)):
+    """Get the progress of an import."""
+    job = ImportService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@app.get("/imports/{job_id}/rejects", response_model=List[schemas.ImportReject])
+def get_import_rejects(
+    job_id: int,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get the rows an import rejected, with the reasons."""
+    service = ImportService(db)
+    if not service.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return service.get_rejects(job_id, skip, limit)
+
+@app.get("/analysis/cache/stats", response_model=schemas.AnalysisCacheStats)
+def get_analysis_cache_stats():
+    """Get analysis cache hit/miss counters."""
+    return get_analysis_cache().stats()
+
+@app.get("/agents/performance/cache/stats", response_model=schemas.PerformanceCacheStats)
+def get_performance_cache_stats():
+    """Get agent performance cache hit/miss counters."""
+    return get_performance_cache().stats()
+
+@app.get("/ai/stats", response_model=schemas.AIClientStats)
+def get_ai_client_stats():
+    """Get Gemini rate limiter, retry and circuit breaker state."""
+    return get_shared_ai_service().client.stats()
 
 @app.post("/inquiries/", response_model=schemas.InquiryResponse)
-def create_inquiry(inquiry: schemas.InquiryCreate, db: Session = Depends(get_db)):
-    inquiry_service = InquiryService(db)
+def create_inquiry(
+    inquiry: schemas.InquiryCreate,
+    db: Session = Depends(get_db),
+    ai_service=Depends(get_ai_service),
+    dispatcher: OutboxDispatcher = Depends(get_outbox_dispatcher)
+):
+    """Create an inquiry and queue the bland.ai call to the customer.
+
+    The call request is written to the outbox with the inquiry and sent by
+    the dispatcher, so the response does not wait on bland.ai.
+    """
+    inquiry_service = InquiryService(db, ai_service)
     try:
         db_inquiry = inquiry_service.create_inquiry(inquiry)
+        for message_id in inquiry_service.outbox_message_ids:
+            dispatcher.submit(message_id)
         # Merge Inquiry and Customer fields for the response
         customer = db_inquiry.customer
         return {
@@ -138,6 +488,8 @@ def create_inquiry(inquiry: schemas.InquiryCreate, db: Session = Depends(get_db)
             "customer_id": db_inquiry.customer_id,
             "referral_nr": db_inquiry.referral_nr,
             "status": db_inquiry.status,
+            "created_at": db_inquiry.created_at,
+            "updated_at": db_inquiry.updated_at,
             "phone_number": customer.phone_number,
             "email": customer.email,
             "name": customer.name
@@ -150,30 +502,77 @@ def create_inquiry(inquiry: schemas.InquiryCreate, db: Session = Depends(get_db)
                 err['ctx']['error'] = str(err['ctx']['error'])
         raise HTTPException(status_code=422, detail=errors)
 
-@app.post("/inquiries/webhook", response_model=schemas.InquiryResponse)
-def update_inquiry(
+@app.post("/inquiries/webhook", response_model=schemas.WebhookReceipt, status_code=status.HTTP_202_ACCEPTED)
+async def receive_inquiry_webhook(
     inquiry_update: schemas.InquiryUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    inbox_pool: WebhookInboxWorkerPool = Depends(get_webhook_inbox_worker_pool)
+):
+    """Store a bland.ai webhook and acknowledge it straight away.
+
+    The inquiry is updated and the transcript analysed by the background
+    inbox workers. Redeliveries (same call ID, or the same payload) are
+    acknowledged with `duplicate` set and not applied again.
+    """
+    item, created = await AsyncInquiryService(db).receive_webhook(inquiry_update)
+    if created:
+        inbox_pool.submit(item.id)
+    return {"id": item.id, "inquiry_id": item.inquiry_id, "status": item.status, "duplicate": not created}
+
+@app.get("/inquiries/webhook/inbox", response_model=List[schemas.WebhookInboxItem])
+def get_webhook_inbox(
+    status: Optional[InboxStatusFilter] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
-    """Update an inquiry by ID."""
-    inquiry_service = InquiryService(db)
-    try:
-        db_inquiry = inquiry_service.update_inquiry(inquiry_update.metadata.inquiry_id, inquiry_update)
-        # Merge Inquiry and Customer fields for the response
-        customer = db_inquiry.customer
-        return {
-            "id": db_inquiry.id,
-            "customer_id": db_inquiry.customer_id,
-            "referral_nr": db_inquiry.referral_nr,
-            "status": db_inquiry.status,
-            "phone_number": customer.phone_number,
-            "email": customer.email,
-            "name": customer.name
-        }
-    except ValidationError as e:
-        # Convert ValueError in ctx to string for JSON serialization
-        errors = e.errors()
-        for err in errors:
-            if 'ctx' in err and 'error' in err['ctx']:
-                err['ctx']['error'] = str(err['ctx']['error'])
-        raise HTTPException(status_code=422, detail=errors)
\ No newline at end of file
+    """List stored webhooks, oldest first. Use `status=failed` to find those to replay."""
+    return WebhookInboxService(db).get_items(status, skip, limit)
+
+@app.get("/inquiries/webhook/inbox/{item_id}", response_model=schemas.WebhookInboxItem)
+def get_webhook_inbox_item(item_id: int, db: Session = Depends(get_db)):
+    """Get a stored webhook and how its processing went."""
+    item = WebhookInboxService(db).get_item(item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    return item
+
+@app.post("/inquiries/webhook/inbox/{item_id}/replay", response_model=schemas.WebhookInboxItem)
+def replay_webhook_inbox_item(
+    item_id: int,
+    db: Session = Depends(get_db),
+    inbox_pool: WebhookInboxWorkerPool = Depends(get_webhook_inbox_worker_pool)
+):
+    """Queue a failed webhook to be processed again."""
+    item = WebhookInboxService(db).replay_item(item_id)
+    inbox_pool.submit(item.id)
+    return item
+
+@app.get("/outbox", response_model=List[schemas.OutboxMessage])
+def get_outbox_messages(
+    status: Optional[OutboxStatusFilter] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """List outbound requests, oldest first. Use `status=failed` to find those to replay."""
+    return OutboxService(db).get_messages(status, skip, limit)
+
+@app.get("/outbox/{message_id}", response_model=schemas.OutboxMessage)
+def get_outbox_message(message_id: int, db: Session = Depends(get_db)):
+    """Get an outbound request and how its delivery went."""
+    message = OutboxService(db).get_message(message_id)
+    if not message:
+        raise HTTPException(status_code=404, detail="Outbox message not found")
+    return message
+
+@app.post("/outbox/{message_id}/replay", response_model=schemas.OutboxMessage)
+def replay_outbox_message(
+    message_id: int,
+    db: Session = Depends(get_db),
+    dispatcher: OutboxDispatcher = Depends(get_outbox_dispatcher)
+):
+    """Queue a failed outbound request to be sent again."""
+    message = OutboxService(db).replay_message(message_id)
+    dispatcher.submit(message.id)
+    return message
@@ -1,10 +1,22 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey, Boolean, JSON, UniqueConstraint, Index, text
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime, UTC
 from enum import Enum
+from app.db_types import CompressedJSON, CompressedText
 
 Base = declarative_base()
 
+def version_column() -> Column:
+    """A row version counter for ETags, bumped by every UPDATE of the row, bulk ones included."""
+    return Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
+
+class AnalysisStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class Agent(Base):
     """Represents a call center agent with performance metrics."""
     __tablename__ = "agents"
@@ -14,7 +26,9 @@ class Agent(Base):
     employee_id = Column(String, unique=True, index=True)
     email = Column(String, unique=True, index=True)
     phone_number = Column(String, unique=True, index=True)
-    # created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    version = version_column()
     is_active = Column(Boolean, default=True)
     
     # Performance metrics
@@ -33,6 +47,8 @@ class Customer(Base):
     email = Column(String, unique=True, index=True)
     name = Column(String)
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    version = version_column()
     calls = relationship("Call", back_populates="customer")
     inquiries = relationship("Inquiry", back_populates="customer")
 
@@ -43,7 +59,6 @@ class Call(Base):
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"))
     agent_id = Column(Integer, ForeignKey("agents.id"))
-    transcript = Column(Text)
     call_date = Column(DateTime, default=lambda: datetime.now(UTC))
     
     # Agent Analysis
@@ -55,12 +70,149 @@ class Call(Base):
     customer_description = Column(Text, default="")
     customer_preferences = Column(Text, default="")
     test_drive_readiness = Column(Float, default=0.0)
-    
-    # Raw analysis results
-    analysis_results = Column(JSON, default=dict)
-    
+    analysis_status = Column(String, default=AnalysisStatus.COMPLETED)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    version = version_column()
+
+    # Transcript and raw analysis results live compressed in call_contents
+    content = relationship("CallContent", back_populates="call", uselist=False, cascade="all, delete-orphan")
+    transcript = association_proxy("content", "transcript", creator=lambda value: CallContent(transcript=value))
+    analysis_results = association_proxy(
+        "content", "analysis_results", creator=lambda value: CallContent(analysis_results=value)
+    )
+
     customer = relationship("Customer", back_populates="calls")
     agent = relationship("Agent", back_populates="calls")
+    analysis_job = relationship("AnalysisJob", back_populates="call", uselist=False)
+    issues = relationship("CallIssue", back_populates="call", cascade="all, delete-orphan")
+
+    # Call history, filtered by agent or customer and ordered by date (then id)
+    __table_args__ = (
+        Index("ix_calls_call_date", "call_date"),
+        Index("ix_calls_agent_id_call_date", "agent_id", "call_date"),
+        Index("ix_calls_customer_id_call_date", "customer_id", "call_date"),
+    )
+
+class CallContent(Base):
+    """The bulky part of a call, kept out of `calls` so scans of scores and dates stay small."""
+    __tablename__ = "call_contents"
+
+    call_id = Column(Integer, ForeignKey("calls.id"), primary_key=True)
+    transcript = Column(CompressedText)
+    analysis_results = Column(CompressedJSON, default=dict)
+
+    call = relationship("Call", back_populates="content")
+
+class CallIssue(Base):
+    """One canonical issue reported on a call, denormalised with the call's agent and date for ranking."""
+    __tablename__ = "call_issues"
+
+    id = Column(Integer, primary_key=True)
+    call_id = Column(Integer, ForeignKey("calls.id"), nullable=False, index=True)
+    agent_id = Column(Integer, ForeignKey("agents.id"), nullable=False)
+    issue = Column(String, nullable=False)
+    call_date = Column(DateTime, nullable=False)
+
+    call = relationship("Call", back_populates="issues")
+
+    # Covering indexes for per-agent and fleet-wide issue counts over a date window
+    __table_args__ = (
+        Index("ix_call_issues_agent_id_issue_call_date", "agent_id", "issue", "call_date"),
+        Index("ix_call_issues_call_date_issue", "call_date", "issue"),
+    )
+
+class AgentDailyStats(Base):
+    """Per-agent, per-day totals of analysed calls, kept up to date as calls are analysed."""
+    __tablename__ = "agent_daily_stats"
+
+    agent_id = Column(Integer, ForeignKey("agents.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    call_count = Column(Integer, nullable=False, default=0)
+    # Sums and counts of non-null scores, so averages skip missing scores like AVG does
+    performance_sum = Column(Float, nullable=False, default=0.0)
+    performance_count = Column(Integer, nullable=False, default=0)
+    interest_sum = Column(Float, nullable=False, default=0.0)
+    interest_count = Column(Integer, nullable=False, default=0)
+    readiness_sum = Column(Float, nullable=False, default=0.0)
+    readiness_count = Column(Integer, nullable=False, default=0)
+
+class AnalysisJob(Base):
+    """A queued AI analysis of a call, processed by the background worker pool."""
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    call_id = Column(Integer, ForeignKey("calls.id"), nullable=False, unique=True)
+    status = Column(String, default=AnalysisStatus.PENDING, index=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    # When a worker claimed the job; its lease runs from here
+    locked_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    call = relationship("Call", back_populates="analysis_job")
+
+    # The worker pool's query: pending jobs that are due
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+class AnalysisCacheEntry(Base):
+    """Persisted AI analysis result, keyed by a hash of the normalised transcript and model version."""
+    __tablename__ = "analysis_cache"
+
+    key = Column(String(64), primary_key=True)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC), index=True)
+    last_used_at = Column(DateTime, default=lambda: datetime.now(UTC), index=True)
+    hits = Column(Integer, default=0)
+
+class ImportStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class ImportJob(Base):
+    """A bulk import of agents, customers or calls. `rows_processed` is where a resumed import picks up."""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    source = Column(String, nullable=True)
+    status = Column(String, default=ImportStatus.RUNNING)
+    rows_processed = Column(Integer, default=0)
+    inserted = Column(Integer, default=0)
+    rejected = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    rejects = relationship("ImportReject", back_populates="job", cascade="all, delete-orphan")
+
+class ImportReject(Base):
+    """A source row an import could not insert, with the reason."""
+    __tablename__ = "import_rejects"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id"), nullable=False, index=True)
+    row = Column(Integer, nullable=False)
+    error = Column(Text, nullable=False)
+    data = Column(JSON, nullable=True)
+
+    job = relationship("ImportJob", back_populates="rejects")
+
+class InboxStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
 
 class InquiryStatus(str, Enum):
     CALLING = "calling"
@@ -76,9 +228,10 @@ class Inquiry(Base):
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     referral_nr = Column(String, nullable=False)
-    status = Column(String, default=InquiryStatus.CALLING)
-    #created_at = Column(DateTime, default=datetime.utcnow)
-    #updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    status = Column(String, default=InquiryStatus.CALLING, index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    version = version_column()
     variables = Column(JSON, nullable=True)
     transcripts = Column(JSON, nullable=True)
     
@@ -88,4 +241,54 @@ class Inquiry(Base):
     # Unique constraint
     __table_args__ = (
         UniqueConstraint('customer_id', 'referral_nr', name='uq_customer_referral'),
-    ) 
\ No newline at end of file
+    )
+
+class WebhookInboxItem(Base):
+    """A received inquiry webhook, stored as delivered and processed by the background inbox workers.
+
+    `dedupe_key` identifies a delivery (bland.ai's call ID, or a hash of the
+    payload), so redeliveries of the same webhook are stored only once.
+    """
+    __tablename__ = "webhook_inbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    dedupe_key = Column(String(128), nullable=False, unique=True)
+    inquiry_id = Column(Integer, ForeignKey("inquiries.id"), nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, default=InboxStatus.PENDING, index=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    # When a worker claimed the webhook; its lease runs from here
+    locked_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    # The worker pool's query: pending webhooks that are due
+    __table_args__ = (
+        Index("ix_webhook_inbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+class OutboxMessage(Base):
+    """An outbound request, written in the transaction of the change that needs it and sent by the outbox dispatcher."""
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    inquiry_id = Column(Integer, ForeignKey("inquiries.id"), nullable=True, index=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    # When a worker claimed the message; its lease runs from here
+    locked_at = Column(DateTime, nullable=True)
+    response_code = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    sent_at = Column(DateTime, nullable=True)
+
+    # The dispatcher's query: pending messages that are due
+    __table_args__ = (
+        Index("ix_outbox_messages_status_next_attempt_at", "status", "next_attempt_at"),
+    )
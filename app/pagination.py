@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import json
+from fastapi import HTTPException
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """Decode a cursor back into sort key values for `columns`. Raises a 400 for a bad cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong number of values")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_statement(query, columns: Sequence, cursor: Optional[str], limit: int):
+    """Restrict a Query or Select to the page after `cursor`, plus one row to tell if there is a next page.
+
+    The last column must be unique (the primary key). Rows are found with a
+    row-value comparison on the sort key, which an index on `columns` turns
+    into a seek, so deep pages cost the same as the first one.
+    """
+    if cursor:
+        query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+    return query.order_by(*columns).limit(limit + 1)
+
+def page_of(rows: list, columns: Sequence, limit: int) -> Tuple[list, Optional[str]]:
+    """Split the rows fetched by `keyset_statement` into the page and the cursor of the next one."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column in columns])
+
+def keyset_page(query: Query, columns: Sequence, cursor: Optional[str], limit: int) -> Tuple[list, Optional[str]]:
+    """Fetch the page of `query` after `cursor`, ordered by `columns`.
+
+    Returns the rows and the cursor of the next page, or None on the last
+    page. See `keyset_statement`.
+    """
+    return page_of(keyset_statement(query, columns, cursor, limit).all(), columns, limit)
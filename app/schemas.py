@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, field_validator, model_validator
+from typing import Optional, List, Dict, Any, Generic, TypeVar
 from datetime import datetime, UTC
 import re
 from app.models import InquiryStatus
@@ -92,6 +92,194 @@ class Call(CallBase):
     customer_preferences: str = ""
     test_drive_readiness: float = 0.0
     analysis_results: Dict[str, Any] = {}
+    analysis_status: str = "completed"
+
+class CallSummary(BaseModel):
+    """Call scores and dates without the transcript or raw analysis."""
+    id: int
+    customer_id: int
+    agent_id: int
+    call_date: datetime
+    agent_performance_score: float = 0.0
+    customer_interest_score: float = 0.0
+    test_drive_readiness: float = 0.0
+    analysis_status: str = "completed"
+
+    class Config:
+        from_attributes = True
+
+class CallSearchResult(CallSummary):
+    """A call matching a transcript search, with the matching text highlighted."""
+    snippet: str
+    rank: float
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """One page of a cursor-paginated list. Pass `next_cursor` back to get the next page."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+class CallBatchItemResult(BaseModel):
+    """Outcome of one call in a batch."""
+    index: int
+    status: str
+    status_code: int = 200
+    call: Optional[Call] = None
+    error: Optional[str] = None
+
+class CallBatchResult(BaseModel):
+    """Outcome of a batch of calls."""
+    created: int
+    failed: int
+    results: List[CallBatchItemResult]
+
+class ImportJob(BaseModel):
+    """Progress and totals of a bulk import."""
+    id: int
+    kind: str
+    source: Optional[str] = None
+    status: str
+    rows_processed: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ImportReject(BaseModel):
+    """A rejected import row: its number in the source (from 1) and why it was rejected."""
+    row: int
+    error: str
+    data: Optional[Any] = None
+
+    class Config:
+        from_attributes = True
+
+class CallAnalysisStatus(BaseModel):
+    """Progress of a call's AI analysis."""
+    call_id: int
+    analysis_status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    analysis_results: Optional[Dict[str, Any]] = None
+
+class AnalysisCacheStats(BaseModel):
+    """Analysis cache size and hit/miss counters."""
+    enabled: bool
+    memory_size: int
+    memory_max_size: int
+    memory_hits: int
+    memory_evictions: int
+    persistent_hits: int
+    misses: int
+    writes: int
+    persistent_evictions: int
+    hit_rate: float
+
+class PerformanceCacheStats(BaseModel):
+    """Agent performance cache size and hit/miss counters."""
+    enabled: bool
+    size: int
+    max_size: int
+    max_staleness_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    hit_rate: float
+
+class AIClientStats(BaseModel):
+    """Gemini client limiter state and retry counters."""
+    max_concurrency: int
+    in_flight: int
+    requests: int
+    successes: int
+    failures: int
+    retries: int
+    timeouts: int
+    request_bucket: Dict[str, Any]
+    token_bucket: Dict[str, Any]
+    circuit_breaker: Dict[str, Any]
+
+def _as_score(value):
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").strip() or 0.0
+    return 0.0 if value is None else value
+
+def _as_text(value):
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value if item)
+    return "" if value is None else str(value)
+
+class AgentPerformanceAnalysis(BaseModel):
+    """Model assessment of the agent."""
+    score: float = 0.0
+    issues: List[str] = []
+
+    _coerce_score = field_validator('score', mode='before')(_as_score)
+
+    @field_validator('issues', mode='before')
+    @classmethod
+    def split_issues(cls, v):
+        if v is None:
+            return []
+        if isinstance(v, str):
+            return [item.strip() for item in v.split(",") if item.strip()]
+        return [str(item) for item in v if item]
+
+class CustomerAnalysis(BaseModel):
+    """Model assessment of the customer."""
+    interest_score: float = 0.0
+    description: str = ""
+    preferences: str = ""
+
+    _coerce_score = field_validator('interest_score', mode='before')(_as_score)
+    _coerce_text = field_validator('description', 'preferences', mode='before')(_as_text)
+
+class TestDriveAnalysis(BaseModel):
+    """Model assessment of test drive readiness."""
+    readiness_score: float = 0.0
+
+    _coerce_score = field_validator('readiness_score', mode='before')(_as_score)
+
+class CallAnalysisResult(BaseModel):
+    """Structured analysis returned by the model. Scores are normalised to 0-100."""
+    agent_performance: AgentPerformanceAnalysis = AgentPerformanceAnalysis()
+    customer_analysis: CustomerAnalysis = CustomerAnalysis()
+    test_drive: TestDriveAnalysis = TestDriveAnalysis()
+
+    @model_validator(mode='after')
+    def normalise_scores(self):
+        # Models mix up 0-1 and 0-100 scales; a reply whose scores all fit in
+        # 0-1 is taken to be on that scale.
+        scored = [
+            (self.agent_performance, 'score'),
+            (self.customer_analysis, 'interest_score'),
+            (self.test_drive, 'readiness_score')
+        ]
+        fractional = all(getattr(part, name) <= 1.0 for part, name in scored)
+        for part, name in scored:
+            value = getattr(part, name) * (100.0 if fractional else 1.0)
+            setattr(part, name, min(max(value, 0.0), 100.0))
+        return self
+
+    def to_call_fields(self) -> Dict[str, Any]:
+        """Flatten into the analysis columns stored on a call."""
+        return {
+            "agent_performance_score": self.agent_performance.score,
+            "agent_issues": ", ".join(self.agent_performance.issues),
+            "customer_interest_score": self.customer_analysis.interest_score,
+            "customer_description": self.customer_analysis.description,
+            "customer_preferences": self.customer_analysis.preferences,
+            "test_drive_readiness": self.test_drive.readiness_score
+        }
+
+class IssueCount(BaseModel):
+    """An issue and the number of calls it was reported on."""
+    issue: str
+    count: int
 
 class AgentPerformance(BaseModel):
     """Agent performance summary."""
@@ -119,6 +307,8 @@ class InquiryResponse(InquiryBase):
     id: int
     customer_id: int
     status: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -132,4 +322,43 @@ class InquiryUpdate(BaseModel):
     concatenated_transcript: str
 
     class Config:
-        extra = "allow" 
\ No newline at end of file
+        extra = "allow"
+
+class WebhookReceipt(BaseModel):
+    """Acknowledgement of a stored webhook. `duplicate` is set for a redelivery of a stored one."""
+    id: int
+    inquiry_id: int
+    status: str
+    duplicate: bool = False
+
+class WebhookInboxItem(BaseModel):
+    """A stored webhook and how its processing went."""
+    id: int
+    dedupe_key: str
+    inquiry_id: int
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    payload: Dict[str, Any]
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class OutboxMessage(BaseModel):
+    """An outbound request and how its delivery went."""
+    id: int
+    kind: str
+    inquiry_id: Optional[int] = None
+    status: str
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    response_code: Optional[int] = None
+    error: Optional[str] = None
+    payload: Dict[str, Any]
+    created_at: datetime
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
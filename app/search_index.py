@@ -0,0 +1,76 @@
+"""SQLite FTS5 index of call transcripts.
+
+`calls_fts` is a standalone FTS5 table whose rowid is the call id. It keeps
+its own uncompressed copy of each transcript (needed for snippets) and is
+kept in step with `call_contents` by mapper events on the ORM write path,
+in the same transaction as the write. Other databases have no index;
+searching them is unsupported.
+"""
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.models import Call, CallContent
+
+FTS_TABLE = "calls_fts"
+
+def _enabled(connection: Connection) -> bool:
+    return connection.dialect.name == "sqlite"
+
+CREATE_FTS_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    "USING fts5(transcript, tokenize='unicode61 remove_diacritics 2')"
+)
+
+def is_search_index_name(name: str) -> bool:
+    """Whether a table belongs to the index (FTS5 adds `calls_fts_data`, `calls_fts_idx`, ...)."""
+    return name == FTS_TABLE or name.startswith(f"{FTS_TABLE}_")
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the transcript index if it is missing and fill it from existing calls.
+
+    Returns True if the index was created.
+    """
+    with engine.begin() as connection:
+        if not _enabled(connection) or inspect(connection).has_table(FTS_TABLE):
+            return False
+        connection.execute(text(CREATE_FTS_TABLE))
+        # Transcripts are stored compressed, so they are indexed from Python
+        result = connection.execute(
+            select(CallContent.call_id, CallContent.transcript).where(CallContent.transcript.is_not(None))
+        )
+        while rows := result.fetchmany(1000):
+            index_transcripts(connection, rows)
+        return True
+
+def index_transcripts(connection: Connection, rows):
+    """Add or replace the index entries for (call id, transcript) pairs."""
+    rows = [{"id": call_id, "transcript": transcript} for call_id, transcript in rows]
+    if not rows or not _enabled(connection):
+        return
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), rows)
+    rows = [row for row in rows if row["transcript"] is not None]
+    if rows:
+        connection.execute(text(f"INSERT INTO {FTS_TABLE} (rowid, transcript) VALUES (:id, :transcript)"), rows)
+
+@event.listens_for(Call.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    if _enabled(connection):
+        connection.execute(text(CREATE_FTS_TABLE))
+
+@event.listens_for(Call.__table__, "after_drop")
+def _drop_search_index(target, connection, **kw):
+    if _enabled(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+@event.listens_for(CallContent, "after_insert")
+def _index_new_call(mapper, connection, target):
+    index_transcripts(connection, [(target.call_id, target.transcript)])
+
+@event.listens_for(CallContent, "after_update")
+def _reindex_changed_call(mapper, connection, target):
+    if inspect(target).attrs.transcript.history.has_changes():
+        index_transcripts(connection, [(target.call_id, target.transcript)])
+
+@event.listens_for(CallContent, "after_delete")
+def _unindex_deleted_call(mapper, connection, target):
+    if _enabled(connection):
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": target.call_id})
@@ -1,10 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, OperationalError
-from app.models import Agent, Call
+from app.models import Agent
+from app.pagination import keyset_page
 from app.schemas import AgentCreate, AgentUpdate, AgentPerformance
-from datetime import datetime, UTC, timedelta
+from app.services.agent_stats_service import AgentStatsService
+from app.services.issue_service import IssueService
+from app.services.performance_cache import get_performance_cache, mark_agent_changed
+from datetime import datetime, UTC
 import logging
 
 class AgentService:
@@ -49,7 +53,21 @@ class AgentService:
 
     def get_agents(self, skip: int = 0, limit: int = 100):
         """Get filtered list of agents."""
-        return self.db.query(Agent).offset(skip).limit(limit).all()
+        return self.db.query(Agent).order_by(Agent.id).offset(skip).limit(limit).all()
+
+    def get_agents_versions(self, skip: int = 0, limit: int = 100) -> List[Tuple[int, int]]:
+        """Get the (id, version) pairs of the agents `get_agents` returns, for an ETag."""
+        return self.db.query(Agent.id, Agent.version).order_by(Agent.id).offset(skip).limit(limit).all()
+
+    def get_agents_page(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Agent], Optional[str]]:
+        """Get a page of agents ordered by ID, and the cursor of the next page."""
+        return keyset_page(self.db.query(Agent), (Agent.id,), cursor, limit)
+
+    def get_agents_page_versions(
+        self, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Tuple[int, int]], Optional[str]]:
+        """Get the (id, version) pairs of the page `get_agents_page` returns, and its next cursor, for an ETag."""
+        return keyset_page(self.db.query(Agent.id, Agent.version), (Agent.id,), cursor, limit)
 
     def get_agent(self, agent_id: int) -> Agent:
         """Get a specific agent."""
@@ -71,6 +89,7 @@ class AgentService:
             for key, value in agent.dict(exclude_unset=True).items():
                 setattr(db_agent, key, value)
 
+            mark_agent_changed(self.db, agent_id)
             self.db.commit()
             self.db.refresh(db_agent)
             return db_agent
@@ -92,67 +111,43 @@ class AgentService:
             return False
             
         self.db.delete(db_agent)
+        mark_agent_changed(self.db, agent_id)
         self.db.commit()
         return True
 
-    def calculate_performance(self, agent_id: int) -> AgentPerformance:
-        """Calculate agent performance metrics."""
+    def calculate_performance(self, agent_id: int, days: int = 30) -> AgentPerformance:
+        """Calculate agent performance metrics over the last `days` days.
+
+        Totals come from the daily rollup, one row per day in the window, and
+        issues from the call_issues index. Results are cached per agent and
+        window until a call for the agent commits.
+        """
+        cache = get_performance_cache()
+        cache_key = cache.key(agent_id, days)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            logging.error(f"calculate_performance input: agent_id={agent_id}")
             agent = self.get_agent(agent_id)
             if not agent:
-                logging.error("Agent not found")
                 raise HTTPException(status_code=404, detail="Agent not found")
 
-            # Get recent calls (last 30 days)
-            cutoff_date = datetime.now(UTC) - timedelta(days=30)
-            recent_calls = self.db.query(Call).filter(
-                Call.agent_id == agent_id,
-                Call.call_date >= cutoff_date
-            ).all()
-            logging.error(f"Recent calls: {recent_calls}")
-
-            # Calculate metrics
-            total_calls = len(recent_calls)
-            if total_calls == 0:
-                logging.error("No recent calls found")
-                return AgentPerformance(
-                    agent_id=agent_id,
-                    agent_name=agent.name,
-                    total_calls_handled=0,
-                    average_performance_score=0.0,
-                    average_customer_interest=0.0,
-                    average_test_drive_readiness=0.0,
-                    agent_issues=[],
-                    specialization=agent.specialization,
-                    is_active=True
-                )
-
-            # Calculate averages and issues
-            valid_scores = [call.agent_performance_score for call in recent_calls if call.agent_performance_score is not None]
-            avg_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
-            valid_interest = [call.customer_interest_score for call in recent_calls if call.customer_interest_score is not None]
-            avg_interest = sum(valid_interest) / len(valid_interest) if valid_interest else 0.0
-            valid_readiness = [call.test_drive_readiness for call in recent_calls if call.test_drive_readiness is not None]
-            avg_readiness = sum(valid_readiness) / len(valid_readiness) if valid_readiness else 0.0
-            issues = []
-            for call in recent_calls:
-                if call.agent_issues:
-                    issues.extend([i.strip() for i in str(call.agent_issues).split(",") if i.strip()])
-            issues = list(set(issues))
-            logging.error(f"valid_scores: {valid_scores}, avg_score: {avg_score}, avg_interest: {avg_interest}, avg_readiness: {avg_readiness}, issues: {issues}")
-
-            return AgentPerformance(
+            totals = AgentStatsService(self.db).window_totals(agent_id, days)
+
+            performance = AgentPerformance(
                 agent_id=agent_id,
                 agent_name=agent.name,
-                total_calls_handled=total_calls,
-                average_performance_score=avg_score,
-                average_customer_interest=avg_interest,
-                average_test_drive_readiness=avg_readiness,
-                agent_issues=issues,
-                specialization=agent.specialization,
+                total_calls_handled=totals.total_calls,
+                average_performance_score=totals.avg_score or 0.0,
+                average_customer_interest=totals.avg_interest or 0.0,
+                average_test_drive_readiness=totals.avg_readiness or 0.0,
+                agent_issues=IssueService(self.db).agent_issues(agent_id, days) if totals.total_calls else [],
+                specialization=agent.specialization or "",
                 is_active=True
             )
+            cache.put(cache_key, performance)
+            return performance
 
         except HTTPException:
             raise
@@ -161,4 +156,4 @@ class AgentService:
             raise HTTPException(status_code=500, detail="Database error")
         except Exception as e:
             logging.error(f"Unhandled exception in calculate_performance: {e}")
-            raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
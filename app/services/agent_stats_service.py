@@ -0,0 +1,98 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, UTC
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models import AgentDailyStats, Call
+from app.services.performance_cache import mark_agent_changed
+
+_DELTA_COLUMNS = (
+    "call_count",
+    "performance_sum", "performance_count",
+    "interest_sum", "interest_count",
+    "readiness_sum", "readiness_count"
+)
+
+def _call_day(call: Call) -> date:
+    return (call.call_date or datetime.now(UTC)).date()
+
+def window_start(days: int, today: Optional[date] = None) -> date:
+    """First day of a window covering the last `days` calendar days, today included."""
+    return (today or datetime.now(UTC).date()) - timedelta(days=max(days, 1) - 1)
+
+class AgentStatsService:
+    """Service for the per-agent daily rollup of analysed calls.
+
+    Windowed agent metrics are read from at most one row per day instead of
+    scanning calls. Rows are updated in the caller's transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_calls(self, calls: Iterable[Call]):
+        """Add analysed calls to their agents' daily totals.
+
+        The agents' cached performance is dropped when the transaction commits.
+        """
+        deltas: Dict[tuple, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(_DELTA_COLUMNS, 0))
+        for call in calls:
+            delta = deltas[(call.agent_id, _call_day(call))]
+            delta["call_count"] += 1
+            for prefix, score in (
+                ("performance", call.agent_performance_score),
+                ("interest", call.customer_interest_score),
+                ("readiness", call.test_drive_readiness)
+            ):
+                if score is not None:
+                    delta[f"{prefix}_sum"] += score
+                    delta[f"{prefix}_count"] += 1
+        for (agent_id, day), delta in deltas.items():
+            self._add(agent_id, day, delta)
+            mark_agent_changed(self.db, agent_id)
+
+    def window_totals(self, agent_id: int, days: int = 30):
+        """Get call count and average scores for the last `days` days.
+
+        Averages are None when no call in the window has that score.
+        """
+        average = lambda total, count: func.sum(total) / func.nullif(func.sum(count), 0)
+        return self.db.query(
+            func.coalesce(func.sum(AgentDailyStats.call_count), 0).label("total_calls"),
+            average(AgentDailyStats.performance_sum, AgentDailyStats.performance_count).label("avg_score"),
+            average(AgentDailyStats.interest_sum, AgentDailyStats.interest_count).label("avg_interest"),
+            average(AgentDailyStats.readiness_sum, AgentDailyStats.readiness_count).label("avg_readiness")
+        ).filter(
+            AgentDailyStats.agent_id == agent_id,
+            AgentDailyStats.day >= window_start(days)
+        ).one()
+
+    def lifetime_calls(self, agent_id: int) -> int:
+        """Get the number of analysed calls an agent has ever handled."""
+        return self.db.query(func.coalesce(func.sum(AgentDailyStats.call_count), 0))\
+            .filter(AgentDailyStats.agent_id == agent_id)\
+            .scalar()
+
+    def _add(self, agent_id: int, day: date, delta: Dict[str, float]):
+        """Upsert one day's totals without reading them first, so concurrent writers don't lose updates."""
+        table = AgentDailyStats.__table__
+        values = {"agent_id": agent_id, "day": day, **delta}
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = insert(table).values(**values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.agent_id, table.c.day],
+                set_={column: table.c[column] + statement.excluded[column] for column in delta}
+            )
+            self.db.execute(statement)
+            return
+
+        updated = self.db.query(AgentDailyStats)\
+            .filter(AgentDailyStats.agent_id == agent_id, AgentDailyStats.day == day)\
+            .update({getattr(AgentDailyStats, column): getattr(AgentDailyStats, column) + value
+                     for column, value in delta.items()}, synchronize_session=False)
+        if not updated:
+            self.db.add(AgentDailyStats(**values))
+            self.db.flush()
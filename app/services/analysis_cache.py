@@ -0,0 +1,217 @@
+from datetime import datetime, UTC, timedelta
+from typing import Any, Dict, Iterable, Optional
+import copy
+import hashlib
+import logging
+import re
+import threading
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.cache import LRUCache
+from app.config import get_settings
+from app.models import AnalysisCacheEntry
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_transcript(transcript: str) -> str:
+    """Collapse whitespace and case so trivially different copies of a transcript match."""
+    return _WHITESPACE.sub(" ", transcript).strip().casefold()
+
+def analysis_namespace(ai_service) -> str:
+    """Identify the model and prompt version an AI service produces results with."""
+    return getattr(ai_service, "cache_namespace", None) or type(ai_service).__name__
+
+def analysis_cache_key(transcript: str, namespace: str) -> str:
+    """Build the cache key for a transcript analysed under a model/prompt namespace."""
+    payload = f"{namespace}\n{normalize_transcript(transcript)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+class AnalysisCache:
+    """Two-tier cache of AI analysis results.
+
+    The first tier is an in-process LRU. The second is the `analysis_cache`
+    table, which survives restarts and is shared by all workers. Entries
+    expire after `ttl_seconds`, and the table is trimmed to `max_entries`
+    (least recently used first) every `eviction_interval` writes.
+    """
+
+    def __init__(
+        self,
+        memory_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        eviction_interval: int = 100
+    ):
+        settings = get_settings()
+        self.enabled = settings.analysis_cache_enabled if enabled is None else enabled
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.analysis_cache_ttl_seconds
+        self.max_entries = max_entries if max_entries is not None else settings.analysis_cache_max_entries
+        self.eviction_interval = eviction_interval
+        self.memory = LRUCache(
+            max_size=memory_size if memory_size is not None else settings.analysis_cache_memory_size,
+            ttl_seconds=self.ttl_seconds
+        )
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.persistent_evictions = 0
+
+    def get(self, db: Session, key: str) -> Optional[Dict[str, Any]]:
+        """Look a result up in memory, then in the database. Returns a copy, or None on a miss."""
+        if not self.enabled:
+            return None
+        result = self.memory.get(key)
+        if result is not None:
+            return copy.deepcopy(result)
+
+        cutoff = datetime.now(UTC) - timedelta(seconds=self.ttl_seconds)
+        entry = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.key == key,
+            AnalysisCacheEntry.created_at >= cutoff
+        ).first()
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        entry.last_used_at = datetime.now(UTC)
+        entry.hits = (entry.hits or 0) + 1
+        with self._lock:
+            self.persistent_hits += 1
+        self.memory.set(key, entry.result)
+        return copy.deepcopy(entry.result)
+
+    def get_many(self, db: Session, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Look several results up with one database query for the memory misses. Returns copies of the hits by key."""
+        if not self.enabled:
+            return {}
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            result = self.memory.get(key)
+            if result is not None:
+                found[key] = copy.deepcopy(result)
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+
+        cutoff = datetime.now(UTC) - timedelta(seconds=self.ttl_seconds)
+        entries = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.key.in_(missing),
+            AnalysisCacheEntry.created_at >= cutoff
+        ).all()
+        now = datetime.now(UTC)
+        for entry in entries:
+            entry.last_used_at = now
+            entry.hits = (entry.hits or 0) + 1
+            self.memory.set(entry.key, entry.result)
+            found[entry.key] = copy.deepcopy(entry.result)
+        with self._lock:
+            self.persistent_hits += len(entries)
+            self.misses += len(missing) - len(entries)
+        return found
+
+    def put(self, db: Session, key: str, result: Dict[str, Any]):
+        """Store a result in both tiers. The database row is written with the caller's transaction."""
+        if not self.enabled:
+            return
+        self.memory.set(key, copy.deepcopy(result))
+        self._write(db, key, result)
+
+        with self._lock:
+            self.writes += 1
+            self._writes_since_eviction += 1
+            evict = self._writes_since_eviction >= self.eviction_interval
+            if evict:
+                self._writes_since_eviction = 0
+        if evict:
+            self.evict(db)
+
+    def _write(self, db: Session, key: str, result: Dict[str, Any]):
+        """Upsert the database row. Another request storing the same key at the same time must not fail the caller."""
+        table = AnalysisCacheEntry.__table__
+        now = datetime.now(UTC)
+        values = {"key": key, "result": result, "created_at": now, "last_used_at": now, "hits": 0}
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            statement = insert(table).values(**values)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={column: statement.excluded[column] for column in ("result", "created_at", "last_used_at", "hits")}
+            )
+            db.execute(statement)
+            return
+
+        try:
+            with db.begin_nested():
+                db.merge(AnalysisCacheEntry(**values))
+        except IntegrityError:
+            # A concurrent writer stored the same key first; its result is as good as ours
+            logging.info(f"Analysis cache entry {key} was written concurrently")
+
+    def evict(self, db: Session) -> int:
+        """Delete expired rows and trim the table to `max_entries`. Returns the number removed."""
+        cutoff = datetime.now(UTC) - timedelta(seconds=self.ttl_seconds)
+        removed = db.query(AnalysisCacheEntry)\
+            .filter(AnalysisCacheEntry.created_at < cutoff)\
+            .delete(synchronize_session=False)
+
+        excess = db.query(AnalysisCacheEntry).count() - self.max_entries
+        if excess > 0:
+            oldest = db.query(AnalysisCacheEntry.key)\
+                .order_by(AnalysisCacheEntry.last_used_at)\
+                .limit(excess)\
+                .subquery()
+            removed += db.query(AnalysisCacheEntry)\
+                .filter(AnalysisCacheEntry.key.in_(select(oldest.c.key)))\
+                .delete(synchronize_session=False)
+
+        with self._lock:
+            self.persistent_evictions += removed
+        if removed:
+            logging.info(f"Evicted {removed} analysis cache entries")
+        return removed
+
+    def clear(self, db: Optional[Session] = None):
+        """Empty the memory tier, and the database tier if a session is given."""
+        self.memory.clear()
+        if db is not None:
+            db.query(AnalysisCacheEntry).delete(synchronize_session=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for sizing the cache."""
+        memory = self.memory.stats()
+        with self._lock:
+            hits = memory["hits"] + self.persistent_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "memory_size": memory["size"],
+                "memory_max_size": memory["max_size"],
+                "memory_hits": memory["hits"],
+                "memory_evictions": memory["evictions"],
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "persistent_evictions": self.persistent_evictions,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get the process-wide analysis cache."""
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = AnalysisCache()
+    return _analysis_cache
@@ -0,0 +1,172 @@
+from datetime import datetime, UTC, timedelta
+from typing import Callable, List, Optional
+import logging
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models import AnalysisJob, AnalysisStatus, Call
+from app.services.ai_service import AIService
+from app.services.call_service import CallService
+from app.services.tiered_ai_service import get_analysis_service
+from app.services.worker_pool import WorkerPool
+
+class AnalysisJobService:
+    """Service for running queued call analysis jobs."""
+
+    def __init__(
+        self,
+        db: Session,
+        ai_service: AIService = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None
+    ):
+        settings = get_settings()
+        self.db = db
+        self.ai_service = ai_service or get_analysis_service()
+        self.max_attempts = max_attempts or settings.analysis_max_attempts
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None \
+            else settings.analysis_retry_base_seconds
+        self.retry_max_seconds = settings.analysis_retry_max_seconds
+        self.lease_seconds = settings.analysis_lease_seconds
+
+    def get_job_for_call(self, call_id: int) -> Optional[AnalysisJob]:
+        """Get the analysis job of a call."""
+        return self.db.query(AnalysisJob).filter(AnalysisJob.call_id == call_id).first()
+
+    def get_due_job_ids(self, limit: int = 1000) -> List[int]:
+        """Get the IDs of pending jobs whose next attempt is due, longest waiting first."""
+        rows = self.db.query(AnalysisJob.id)\
+            .filter(AnalysisJob.status == AnalysisStatus.PENDING, AnalysisJob.next_attempt_at <= datetime.now(UTC))\
+            .order_by(AnalysisJob.next_attempt_at)\
+            .limit(limit)\
+            .all()
+        return [row.id for row in rows]
+
+    def requeue_expired_jobs(self) -> int:
+        """Put processing jobs whose lease has expired back in the queue.
+
+        A job is leased to the worker that claims it for `analysis_lease_seconds`.
+        One still processing after that is taken to have lost its worker, for
+        example to a crash or a restart; jobs held by workers in other running
+        processes are left alone.
+        """
+        expired = datetime.now(UTC) - timedelta(seconds=self.lease_seconds)
+        count = self.db.query(AnalysisJob)\
+            .filter(
+                AnalysisJob.status == AnalysisStatus.PROCESSING,
+                or_(AnalysisJob.locked_at.is_(None), AnalysisJob.locked_at <= expired)
+            )\
+            .update({AnalysisJob.status: AnalysisStatus.PENDING}, synchronize_session=False)
+        self.db.commit()
+        return count
+
+    def claim_job(self, job_id: int) -> bool:
+        """Mark a due job as processing and lease it. Returns False if it is not due or another worker got it first."""
+        job = self.db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        if not job:
+            return False
+        now = datetime.now(UTC)
+        claimed = self.db.query(AnalysisJob)\
+            .filter(
+                AnalysisJob.id == job_id,
+                AnalysisJob.status == AnalysisStatus.PENDING,
+                AnalysisJob.next_attempt_at <= now
+            )\
+            .update({
+                AnalysisJob.status: AnalysisStatus.PROCESSING,
+                AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                AnalysisJob.locked_at: now,
+                AnalysisJob.updated_at: now
+            }, synchronize_session=False)
+        if claimed:
+            self.db.query(Call)\
+                .filter(Call.id == job.call_id)\
+                .update({Call.analysis_status: AnalysisStatus.PROCESSING}, synchronize_session=False)
+        self.db.commit()
+        return claimed == 1
+
+    def run_job(self, job_id: int) -> Optional[AnalysisJob]:
+        """Claim a job, analyse its call and store the results.
+
+        The database session is committed before the AI service is called, so
+        no transaction is held open while the model works. Returns the job, or
+        None if it was not pending.
+        """
+        if not self.claim_job(job_id):
+            return None
+
+        call_service = CallService(self.db, self.ai_service)
+        job = self.db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        transcript = job.call.transcript
+        analysis = call_service.get_cached_analysis(transcript)
+        self.db.commit()
+
+        if analysis is None:
+            try:
+                analysis = call_service.run_analysis(transcript)
+            except Exception as e:
+                logging.warning(f"Analysis job {job_id} failed: {str(e)}")
+                return self._fail_job(job_id, str(e))
+            call_service.cache_analysis(transcript, analysis)
+
+        try:
+            job = self.db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            call_service.apply_analysis(job.call, analysis)
+            job.status = AnalysisStatus.COMPLETED
+            job.error = None
+            self.db.commit()
+            self.db.refresh(job)
+            return job
+        except Exception as e:
+            self.db.rollback()
+            logging.error(f"Storing analysis for job {job_id} failed: {str(e)}")
+            return self._fail_job(job_id, str(e))
+
+    def _fail_job(self, job_id: int, error: str) -> AnalysisJob:
+        """Record a failed attempt, scheduling a retry with exponential backoff until attempts run out."""
+        job = self.db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        status = AnalysisStatus.PENDING if job.attempts < self.max_attempts else AnalysisStatus.FAILED
+        if status == AnalysisStatus.PENDING:
+            delay = min(self.retry_base_seconds * 2 ** (job.attempts - 1), self.retry_max_seconds)
+            job.next_attempt_at = datetime.now(UTC) + timedelta(seconds=delay)
+        job.status = status
+        job.error = error
+        job.call.analysis_status = status
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+class AnalysisWorkerPool(WorkerPool):
+    """Bounded pool of background threads that process analysis jobs."""
+
+    name = "analysis"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = None,
+        ai_service_factory: Callable[[], AIService] = None,
+        max_workers: Optional[int] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        settings = get_settings()
+        super().__init__(
+            session_factory, max_workers or settings.analysis_worker_count, poll_seconds or settings.analysis_poll_seconds
+        )
+        self.ai_service_factory = ai_service_factory or get_analysis_service
+
+    def resume_job_ids(self, db: Session) -> List[int]:
+        return self.due_job_ids(db)
+
+    def due_job_ids(self, db: Session) -> List[int]:
+        service = AnalysisJobService(db, self.ai_service_factory())
+        service.requeue_expired_jobs()
+        return service.get_due_job_ids()
+
+    def run_job(self, db: Session, job_id: int):
+        AnalysisJobService(db, self.ai_service_factory()).run_job(job_id)
+
+_analysis_worker_pool = AnalysisWorkerPool()
+
+def get_analysis_worker_pool() -> AnalysisWorkerPool:
+    """Get the process-wide analysis worker pool."""
+    return _analysis_worker_pool
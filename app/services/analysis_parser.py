@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Tuple
+import json
+import logging
+from pydantic import ValidationError
+from app.schemas import CallAnalysisResult
+
+class AnalysisParseError(ValueError):
+    """The model output contains no usable analysis."""
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+def extract_json(text: str) -> Tuple[str, List[str]]:
+    """Pull the first JSON object out of model output in one pass.
+
+    Markdown fences and any text before or after the object are skipped.
+    Trailing commas before a closing bracket are dropped. Returns the JSON
+    text and a list of the repairs made.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise AnalysisParseError("No JSON object in model output")
+
+    out: List[str] = []
+    repairs: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    pending_comma = False
+    end = start
+    for end, char in enumerate(text[start:], start):
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char.isspace():
+            if not pending_comma:
+                out.append(char)
+            continue
+        if char in "}]":
+            if pending_comma:
+                repairs.append("trailing comma")
+                pending_comma = False
+            if not stack or char != stack.pop():
+                raise AnalysisParseError("Unbalanced brackets in model output")
+            out.append(char)
+            if not stack:
+                break
+            continue
+        if pending_comma:
+            out.append(",")
+            pending_comma = False
+        if char == ",":
+            pending_comma = True
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        out.append(char)
+    else:
+        raise AnalysisParseError("Truncated JSON in model output")
+
+    if text[:start].strip() or text[end + 1:].strip():
+        repairs.append("surrounding text")
+    return "".join(out), repairs
+
+def parse_analysis_text(text: str) -> CallAnalysisResult:
+    """Parse and validate the model's analysis, repairing common defects."""
+    payload, repairs = extract_json(text or "")
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError as e:
+        raise AnalysisParseError(f"Invalid JSON in model output: {e.msg}")
+    if not isinstance(data, dict):
+        raise AnalysisParseError("Model output is not a JSON object")
+    try:
+        result = CallAnalysisResult.model_validate(data)
+    except ValidationError as e:
+        raise AnalysisParseError(f"Model output does not match the analysis schema: {e.error_count()} errors")
+    if repairs:
+        logging.debug(f"Repaired model output: {', '.join(repairs)}")
+    return result
+
+def to_call_analysis(result: CallAnalysisResult) -> Dict[str, Any]:
+    """Build the stored analysis fields, keeping the normalised structure in `analysis_results`."""
+    return {**result.to_call_fields(), "analysis_results": result.model_dump()}
@@ -0,0 +1,72 @@
+from datetime import datetime, UTC, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models import AnalysisJob, Call
+from app.pagination import keyset_statement, page_of
+from app.services.call_service import fill_call_defaults, filter_calls, with_call_view
+
+class AsyncCallService:
+    """Async counterpart of CallService's reads for the request path.
+
+    Builds the same statements as CallService and awaits them on an
+    AsyncSession.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_call(self, call_id: int) -> Optional[Call]:
+        """Get a call by ID."""
+        return await self.db.scalar(select(Call).options(selectinload(Call.content)).where(Call.id == call_id))
+
+    async def get_calls(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        customer_id: Optional[int] = None,
+        agent_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        view: str = "full"
+    ) -> List[Call]:
+        """Get filtered list of calls."""
+        statement = filter_calls(select(Call), customer_id, agent_id, start_date, end_date)
+        return list(await self.db.scalars(with_call_view(statement, view).offset(skip).limit(limit)))
+
+    async def get_calls_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        customer_id: Optional[int] = None,
+        agent_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        view: str = "full"
+    ) -> Tuple[List[Call], Optional[str]]:
+        """Get a page of filtered calls ordered by (call_date, id), and the cursor of the next page."""
+        columns = (Call.call_date, Call.id)
+        statement = filter_calls(select(Call), customer_id, agent_id, start_date, end_date)
+        statement = keyset_statement(with_call_view(statement, view), columns, cursor, limit)
+        return page_of(list(await self.db.scalars(statement)), columns, limit)
+
+    async def get_customer_calls(self, customer_id: int, view: str = "full") -> List[Call]:
+        """Get all calls for a customer."""
+        statement = with_call_view(select(Call).where(Call.customer_id == customer_id).order_by(Call.id), view)
+        return fill_call_defaults(list(await self.db.scalars(statement)))
+
+    async def get_customer_call_versions(self, customer_id: int) -> List[Tuple[int, int]]:
+        """Get the (id, version) pairs of the calls `get_customer_calls` returns, for an ETag."""
+        statement = select(Call.id, Call.version).where(Call.customer_id == customer_id).order_by(Call.id)
+        return list(await self.db.execute(statement))
+
+    async def get_agent_calls(self, agent_id: int, days: int = 30, view: str = "full") -> List[Call]:
+        """Get recent calls for an agent."""
+        cutoff_date = datetime.now(UTC) - timedelta(days=days)
+        statement = select(Call).where(Call.agent_id == agent_id, Call.call_date >= cutoff_date)
+        return list(await self.db.scalars(with_call_view(statement, view)))
+
+    async def get_job_for_call(self, call_id: int) -> Optional[AnalysisJob]:
+        """Get the analysis job of a call."""
+        return await self.db.scalar(select(AnalysisJob).where(AnalysisJob.call_id == call_id))
@@ -0,0 +1,22 @@
+from typing import Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import WebhookInboxItem
+from app.schemas import InquiryUpdate
+from app.services.ai_service import AIService
+from app.services.tiered_ai_service import get_analysis_service
+from app.services.webhook_inbox_service import WebhookInboxService
+
+class AsyncInquiryService:
+    """Async counterpart of InquiryService for the webhook request path.
+
+    The database writes run the sync services through `AsyncSession.run_sync`,
+    so the business rules live in one place.
+    """
+
+    def __init__(self, db: AsyncSession, ai_service: AIService = None):
+        self.db = db
+        self.ai_service = ai_service or get_analysis_service()
+
+    async def receive_webhook(self, inquiry_update: InquiryUpdate) -> Tuple[WebhookInboxItem, bool]:
+        """Store a webhook in the inbox. Returns the item and whether it is new."""
+        return await self.db.run_sync(lambda db: WebhookInboxService(db, self.ai_service).receive(inquiry_update))
@@ -1,77 +1,168 @@
 from datetime import datetime, UTC, timedelta
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, load_only, selectinload
 from fastapi import HTTPException
-from app.models import Call, Agent, Customer
+from app.models import Call, Agent, AgentDailyStats, Customer, AnalysisJob, AnalysisStatus
 from app.schemas import CallCreate
 from app.services.ai_service import AIService
-import time
+from app.services.agent_stats_service import AgentStatsService, window_start
+from app.services.issue_service import IssueService
+from app.services.gemini_client import GeminiUnavailableError
+from app.services.long_transcript import analyze_long_transcript
+from app.services.tiered_ai_service import get_analysis_service
+from app.services.analysis_cache import AnalysisCache, analysis_cache_key, analysis_namespace, get_analysis_cache
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, inspect, literal, select, union_all
 from sqlalchemy.exc import OperationalError
 import logging
+from app.config import get_settings
+from app.pagination import keyset_page
 
+# Longest transcript sent to the model in one prompt; longer ones are analysed in chunks
 MAX_TRANSCRIPT_LENGTH = 10000
 
+# Columns loaded for the summary view of call lists; transcripts and raw results stay in the database
+CALL_SUMMARY_COLUMNS = (
+    Call.id,
+    Call.customer_id,
+    Call.agent_id,
+    Call.call_date,
+    Call.agent_performance_score,
+    Call.customer_interest_score,
+    Call.test_drive_readiness,
+    Call.analysis_status
+)
+
+# Values used in place of NULL analysis fields in call responses
+CALL_FIELD_DEFAULTS = {
+    "agent_performance_score": 0.0,
+    "agent_issues": "",
+    "customer_interest_score": 0.0,
+    "customer_description": "",
+    "customer_preferences": "",
+    "test_drive_readiness": 0.0,
+    "analysis_results": dict
+}
+
+def filter_calls(
+    query,
+    customer_id: Optional[int] = None,
+    agent_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """Filter a Query or Select of calls by customer, agent and date range."""
+    if customer_id:
+        query = query.filter(Call.customer_id == customer_id)
+    if agent_id:
+        query = query.filter(Call.agent_id == agent_id)
+    if start_date:
+        query = query.filter(Call.call_date >= start_date)
+    if end_date:
+        query = query.filter(Call.call_date < end_date)
+    return query
+
+def with_call_view(query, view: str):
+    """Load only the summary columns of a Query or Select of calls for the summary view.
+
+    Other columns raise if touched instead of being loaded row by row. The
+    full view loads every call's transcript and raw results in one query.
+    """
+    if view == "summary":
+        return query.options(load_only(*CALL_SUMMARY_COLUMNS, raiseload=True))
+    return query.options(selectinload(Call.content))
+
+def fill_call_defaults(calls: List[Call]) -> List[Call]:
+    """Replace NULL analysis fields of loaded calls with their response defaults."""
+    for call in calls:
+        unloaded = inspect(call).unloaded
+        if "content" in unloaded:
+            unloaded = unloaded | {"transcript", "analysis_results"}
+        for field, default in CALL_FIELD_DEFAULTS.items():
+            if field not in unloaded and getattr(call, field) is None:
+                setattr(call, field, default() if callable(default) else default)
+    return calls
+
 class CallService:
     """Service for managing call records and analysis."""
     
-    def __init__(self, db: Session, ai_service: AIService = None):
+    def __init__(self, db: Session, ai_service: AIService = None, analysis_cache: AnalysisCache = None):
         """Initialize the call service with database session and optional AI service."""
         self.db = db
-        self.ai_service = ai_service or AIService()
+        self.ai_service = ai_service or get_analysis_service()
+        self.analysis_cache = analysis_cache or get_analysis_cache()
+
+    def create_call(self, call: CallCreate, analysis: Optional[dict] = None) -> Call:
+        """Create a new call record with AI analysis.
 
-    def create_call(self, call: CallCreate) -> Call:
-        """Create a new call record with AI analysis."""
+        Pass `analysis` to store a result that was already produced (e.g. by a
+        streamed generation) instead of calling the AI service.
+        """
         try:
-            # Validate transcript first
-            if not call.transcript.strip():
-                raise HTTPException(status_code=422, detail="Transcript must not be empty")
+            db_call = self.add_call(call, analysis)
+            self.db.commit()
+            self.db.refresh(db_call)
+            return db_call
             
-            if len(call.transcript) > MAX_TRANSCRIPT_LENGTH:
-                raise HTTPException(status_code=422, detail="Transcript too long")
+        except HTTPException as he:
+            self.db.rollback()
+            raise
+        except GeminiUnavailableError as e:
+            self.db.rollback()
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+        except OperationalError:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail="Database error")
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def add_call(self, call: CallCreate, analysis: Optional[dict] = None) -> Call:
+        """Validate and analyse a call and add it to the session without committing.
+
+        For callers that store the call in one transaction with other changes.
+        """
+        self._validate_call(call)
+
+        # Create call record
+        db_call = Call(
+            customer_id=call.customer_id,
+            agent_id=call.agent_id,
+            transcript=call.transcript,
+            call_date=call.call_date
+        )
 
-            # Verify customer exists
-            customer = self.db.query(Customer).filter(Customer.id == call.customer_id).first()
-            if not customer:
-                raise HTTPException(status_code=404, detail="Customer not found")
+        # Perform AI analysis, reusing the cached result for a known transcript
+        if analysis is None:
+            analysis = self._analyze(call.transcript)
+        else:
+            self.cache_analysis(call.transcript, analysis)
+        self.apply_analysis(db_call, analysis)
 
-            # Verify agent exists
-            agent = self.db.query(Agent).filter(Agent.id == call.agent_id).first()
-            if not agent:
-                raise HTTPException(status_code=404, detail="Agent not found")
+        self.db.add(db_call)
+        return db_call
+
+    def submit_call(self, call: CallCreate) -> Call:
+        """Store a call right away and queue its AI analysis as a background job."""
+        try:
+            self._validate_call(call)
 
-            # Create call record
             db_call = Call(
                 customer_id=call.customer_id,
                 agent_id=call.agent_id,
                 transcript=call.transcript,
-                call_date=call.call_date
-            )
-
-            # Perform AI analysis
-            analysis = self.ai_service.analyze_call(call.transcript)
-            
-            # Update call with analysis results
-            db_call.agent_performance_score = analysis.get("agent_performance_score")
-            db_call.agent_issues = analysis.get("agent_issues")
-            db_call.customer_interest_score = analysis.get("customer_interest_score")
-            db_call.customer_description = analysis.get("customer_description")
-            db_call.customer_preferences = analysis.get("customer_preferences")
-            db_call.test_drive_readiness = analysis.get("test_drive_readiness")
-            db_call.analysis_results = analysis
-
-            # Update agent metrics
-            agent.total_calls_handled += 1
-            agent.average_performance_score = (
-                (agent.average_performance_score * (agent.total_calls_handled - 1) +
-                 (analysis.get("agent_performance_score") or 0.0)) / agent.total_calls_handled
+                call_date=call.call_date,
+                analysis_status=AnalysisStatus.PENDING
             )
+            db_call.analysis_job = AnalysisJob(status=AnalysisStatus.PENDING, attempts=0)
 
             self.db.add(db_call)
             self.db.commit()
             self.db.refresh(db_call)
             return db_call
-            
-        except HTTPException as he:
+
+        except HTTPException:
             self.db.rollback()
             raise
         except OperationalError:
@@ -81,76 +172,271 @@ class CallService:
             self.db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
 
+    def create_calls_batch(self, calls: List[CallCreate], max_concurrency: Optional[int] = None) -> List[dict]:
+        """Create many calls at once.
+
+        Customer and agent IDs for the whole batch are checked in one query,
+        cache misses are analysed concurrently (at most `max_concurrency` at a
+        time, identical transcripts only once), all calls are inserted in one
+        transaction and each agent's metrics are updated once. Returns one
+        result per input item, in order, with an error for items that failed.
+        """
+        max_concurrency = max_concurrency or get_settings().call_batch_concurrency
+        results = [{"index": i, "status": "created", "call": None, "error": None} for i in range(len(calls))]
+
+        def reject(index: int, status_code: int, detail: str):
+            results[index].update(status="error", status_code=status_code, error=detail)
+
+        for i, call in enumerate(calls):
+            if not call.transcript.strip():
+                reject(i, 422, "Transcript must not be empty")
+            elif len(call.transcript) > get_settings().long_transcript_max_length:
+                reject(i, 422, "Transcript too long")
+
+        try:
+            existing = self._existing_ids(
+                {call.customer_id for call in calls},
+                {call.agent_id for call in calls}
+            )
+            for i, call in enumerate(calls):
+                if results[i]["status"] != "created":
+                    continue
+                if call.customer_id not in existing["customer"]:
+                    reject(i, 404, "Customer not found")
+                elif call.agent_id not in existing["agent"]:
+                    reject(i, 404, "Agent not found")
+
+            valid = [i for i in range(len(calls)) if results[i]["status"] == "created"]
+            analyses = self._analyze_many({i: calls[i].transcript for i in valid}, max_concurrency)
+
+            db_calls = {}
+            agent_calls = {}
+            for i in valid:
+                analysis = analyses[i]
+                if isinstance(analysis, GeminiUnavailableError):
+                    reject(i, 503, str(analysis))
+                    continue
+                if isinstance(analysis, Exception):
+                    reject(i, 500, f"Analysis failed: {str(analysis)}")
+                    continue
+                db_call = Call(
+                    customer_id=calls[i].customer_id,
+                    agent_id=calls[i].agent_id,
+                    transcript=calls[i].transcript,
+                    call_date=calls[i].call_date
+                )
+                self._set_analysis_fields(db_call, analysis)
+                db_calls[i] = db_call
+                agent_calls.setdefault(db_call.agent_id, []).append(db_call)
+
+            self.db.add_all(db_calls.values())
+            for agent_id, agent_call_list in agent_calls.items():
+                self._record_agent_calls(agent_id, agent_call_list)
+            self.db.commit()
+        except OperationalError:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail="Database error")
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail=str(e))
+
+        # Reload the committed calls in one query instead of one refresh per row
+        if db_calls:
+            self.db.query(Call).filter(Call.id.in_([db_call.id for db_call in db_calls.values()])).all()
+        for i, db_call in db_calls.items():
+            results[i]["call"] = db_call
+        return results
+
+    def _existing_ids(self, customer_ids: set, agent_ids: set) -> dict:
+        """Find which of the given customer and agent IDs exist, in a single query."""
+        query = union_all(
+            select(literal("customer").label("kind"), Customer.id).where(Customer.id.in_(customer_ids)),
+            select(literal("agent").label("kind"), Agent.id).where(Agent.id.in_(agent_ids))
+        )
+        existing = {"customer": set(), "agent": set()}
+        for kind, id_ in self.db.execute(query):
+            existing[kind].add(id_)
+        return existing
+
+    def _analyze_many(self, transcripts: dict, max_concurrency: int) -> dict:
+        """Analyse transcripts keyed by index, using the cache and running misses concurrently.
+
+        Returns the analysis, or the exception raised, for each index.
+        """
+        keys = {i: self._cache_key(transcript) for i, transcript in transcripts.items()}
+        by_key = self.analysis_cache.get_many(self.db, keys.values())
+        to_analyze = {}
+        for i, key in keys.items():
+            if key not in by_key:
+                to_analyze.setdefault(key, transcripts[i])
+
+        if to_analyze:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(to_analyze)))) as executor:
+                futures = {key: executor.submit(self.run_analysis, transcript)
+                           for key, transcript in to_analyze.items()}
+            for key, future in futures.items():
+                try:
+                    by_key[key] = future.result()
+                    self.analysis_cache.put(self.db, key, by_key[key])
+                except Exception as e:
+                    by_key[key] = e
+
+        return {i: copy.deepcopy(by_key[key]) if not isinstance(by_key[key], Exception) else by_key[key]
+                for i, key in keys.items()}
+
+    def _validate_call(self, call: CallCreate) -> Agent:
+        """Check the transcript and that the customer and agent exist. Returns the agent."""
+        # Validate transcript first
+        if not call.transcript.strip():
+            raise HTTPException(status_code=422, detail="Transcript must not be empty")
+        
+        if len(call.transcript) > get_settings().long_transcript_max_length:
+            raise HTTPException(status_code=422, detail="Transcript too long")
+
+        # Verify customer exists
+        customer = self.db.query(Customer).filter(Customer.id == call.customer_id).first()
+        if not customer:
+            raise HTTPException(status_code=404, detail="Customer not found")
+
+        # Verify agent exists
+        agent = self.db.query(Agent).filter(Agent.id == call.agent_id).first()
+        if not agent:
+            raise HTTPException(status_code=404, detail="Agent not found")
+        return agent
+
+    def validate_streaming_call(self, call: CallCreate):
+        """Check a call can be analysed with a single streamed prompt."""
+        self._validate_call(call)
+        if len(call.transcript) > MAX_TRANSCRIPT_LENGTH:
+            raise HTTPException(status_code=422, detail="Transcript too long for streaming analysis")
+
+    def get_cached_analysis(self, transcript: str) -> Optional[dict]:
+        """Get the cached analysis of a transcript, if any."""
+        return self.analysis_cache.get(self.db, self._cache_key(transcript))
+
+    def cache_analysis(self, transcript: str, analysis: dict):
+        """Store the analysis of a transcript for later calls with the same transcript."""
+        self.analysis_cache.put(self.db, self._cache_key(transcript), analysis)
+
+    def _analyze(self, transcript: str) -> dict:
+        """Analyse a transcript, going to the AI service only on a cache miss."""
+        analysis = self.get_cached_analysis(transcript)
+        if analysis is None:
+            analysis = self.run_analysis(transcript)
+            self.cache_analysis(transcript, analysis)
+        return analysis
+
+    def run_analysis(self, transcript: str) -> dict:
+        """Call the AI service, splitting transcripts too long for one prompt into chunks."""
+        if len(transcript) <= MAX_TRANSCRIPT_LENGTH:
+            return self.ai_service.analyze_call(transcript)
+        settings = get_settings()
+        return analyze_long_transcript(
+            self.ai_service,
+            transcript,
+            max_chunk_chars=MAX_TRANSCRIPT_LENGTH,
+            overlap_turns=settings.long_transcript_overlap_turns,
+            max_workers=settings.long_transcript_concurrency
+        )
+
+    def _cache_key(self, transcript: str) -> str:
+        return analysis_cache_key(transcript, analysis_namespace(self.ai_service))
+
+    def apply_analysis(self, db_call: Call, analysis: dict):
+        """Copy AI analysis results onto a call and update the agent's metrics."""
+        self._set_analysis_fields(db_call, analysis)
+        self._record_agent_calls(db_call.agent_id, [db_call])
+
+    def _set_analysis_fields(self, db_call: Call, analysis: dict):
+        """Copy AI analysis results onto a call."""
+        db_call.agent_performance_score = analysis.get("agent_performance_score")
+        db_call.agent_issues = analysis.get("agent_issues")
+        db_call.customer_interest_score = analysis.get("customer_interest_score")
+        db_call.customer_description = analysis.get("customer_description")
+        db_call.customer_preferences = analysis.get("customer_preferences")
+        db_call.test_drive_readiness = analysis.get("test_drive_readiness")
+        db_call.analysis_results = analysis
+        db_call.analysis_status = AnalysisStatus.COMPLETED
+        db_call.issues = IssueService(self.db).build_issues(db_call.agent_id, db_call.call_date, db_call.agent_issues)
+
+    def _record_agent_calls(self, agent_id: int, calls: List[Call]):
+        """Fold newly analysed calls into the daily rollup and the agent's metrics.
+
+        Every write is a single upsert or UPDATE so concurrent writers don't
+        lose updates. `total_calls_handled` counts all analysed calls, and the
+        average is over the same 30-day window `calculate_performance` reports.
+        """
+        if not calls:
+            return
+        AgentStatsService(self.db).record_calls(calls)
+        self.db.query(Agent).filter(Agent.id == agent_id).update({
+            Agent.average_performance_score: func.coalesce(self._window_average(agent_id), 0.0),
+            Agent.total_calls_handled: Agent.total_calls_handled + len(calls)
+        }, synchronize_session=False)
+
+    def _window_average(self, agent_id: int, days: int = 30):
+        """Scalar subquery for an agent's average performance over the last `days` days."""
+        return select(
+            func.sum(AgentDailyStats.performance_sum) / func.nullif(func.sum(AgentDailyStats.performance_count), 0)
+        ).where(
+            AgentDailyStats.agent_id == agent_id,
+            AgentDailyStats.day >= window_start(days)
+        ).scalar_subquery()
+
     def get_calls(
         self, 
         skip: int = 0, 
         limit: int = 100,
         customer_id: Optional[int] = None,
-        agent_id: Optional[int] = None
+        agent_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        view: str = "full"
     ) -> List[Call]:
         """Get filtered list of calls."""
-        query = self.db.query(Call)
-        if customer_id:
-            query = query.filter(Call.customer_id == customer_id)
-        if agent_id:
-            query = query.filter(Call.agent_id == agent_id)
-        return query.offset(skip).limit(limit).all()
+        query = filter_calls(self.db.query(Call), customer_id, agent_id, start_date, end_date)
+        return with_call_view(query, view).offset(skip).limit(limit).all()
+
+    def get_calls_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        customer_id: Optional[int] = None,
+        agent_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        view: str = "full"
+    ) -> Tuple[List[Call], Optional[str]]:
+        """Get a page of filtered calls ordered by (call_date, id), and the cursor of the next page."""
+        query = filter_calls(self.db.query(Call), customer_id, agent_id, start_date, end_date)
+        return keyset_page(with_call_view(query, view), (Call.call_date, Call.id), cursor, limit)
 
     def get_call(self, call_id: int) -> Optional[Call]:
         """Get a call by ID."""
         return self.db.query(Call).filter(Call.id == call_id).first()
 
-    def get_customer_calls(self, customer_id: int) -> List[Call]:
+    def get_customer_calls(self, customer_id: int, view: str = "full") -> List[Call]:
         """Get all calls for a customer."""
-        calls = self.db.query(Call).filter(Call.customer_id == customer_id).all()
-        # Ensure all fields have default values
-        for call in calls:
-            if call.agent_performance_score is None:
-                call.agent_performance_score = 0.0
-            if call.agent_issues is None:
-                call.agent_issues = ""
-            if call.customer_interest_score is None:
-                call.customer_interest_score = 0.0
-            if call.customer_description is None:
-                call.customer_description = ""
-            if call.customer_preferences is None:
-                call.customer_preferences = ""
-            if call.test_drive_readiness is None:
-                call.test_drive_readiness = 0.0
-            if call.analysis_results is None:
-                call.analysis_results = {}
-        return calls
-
-    def get_agent_calls(self, agent_id: int, days: int = 30) -> List[Call]:
+        query = self.db.query(Call).filter(Call.customer_id == customer_id)
+        return fill_call_defaults(with_call_view(query, view).all())
+
+    def get_agent_calls(self, agent_id: int, days: int = 30, view: str = "full") -> List[Call]:
         """Get recent calls for an agent."""
         cutoff_date = datetime.now(UTC) - timedelta(days=days)
-        return self.db.query(Call)\
+        query = self.db.query(Call)\
             .filter(Call.agent_id == agent_id)\
-            .filter(Call.call_date >= cutoff_date)\
-            .all()
+            .filter(Call.call_date >= cutoff_date)
+        return with_call_view(query, view).all()
 
     def _update_agent_metrics(self, agent_id: int):
-        """Update agent's performance metrics based on recent calls."""
+        """Recompute agent's performance metrics from the daily rollup."""
         try:
-            agent = self.db.query(Agent).filter(Agent.id == agent_id).first()
-            if not agent:
-                return
-
-            # Get recent calls (last 30 days)
-            recent_calls = self.get_agent_calls(agent_id, days=30)
-            if not recent_calls:
-                return
-
-            # Calculate new metrics
-            total_calls = len(recent_calls)
-            # Filter out None values and calculate average
-            valid_scores = [call.agent_performance_score for call in recent_calls if call.agent_performance_score is not None]
-            avg_performance = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
-
-            # Update agent record
-            agent.total_calls_handled = total_calls
-            agent.average_performance_score = avg_performance
+            stats = AgentStatsService(self.db)
+            self.db.query(Agent).filter(Agent.id == agent_id).update({
+                Agent.average_performance_score: func.coalesce(self._window_average(agent_id), 0.0),
+                Agent.total_calls_handled: stats.lifetime_calls(agent_id)
+            }, synchronize_session=False)
             self.db.commit()
         except Exception as e:
             self.db.rollback()
-            print(f"Failed to update agent metrics: {str(e)}") 
\ No newline at end of file
+            print(f"Failed to update agent metrics: {str(e)}")
@@ -1,8 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError, OperationalError
 from app.models import Customer
+from app.pagination import keyset_page
 from app.schemas import CustomerCreate, CustomerUpdate
 
 class CustomerService:
@@ -48,10 +49,18 @@ class CustomerService:
         """Get filtered list of customers."""
         return self.db.query(Customer).offset(skip).limit(limit).all()
 
+    def get_customers_page(self, cursor: Optional[str] = None, limit: int = 100) -> Tuple[List[Customer], Optional[str]]:
+        """Get a page of customers ordered by ID, and the cursor of the next page."""
+        return keyset_page(self.db.query(Customer), (Customer.id,), cursor, limit)
+
     def get_customer(self, customer_id: int) -> Customer:
         """Get a specific customer."""
         return self.db.query(Customer).filter(Customer.id == customer_id).first()
 
+    def get_customer_version(self, customer_id: int) -> Optional[int]:
+        """Get a customer's row version, for an ETag. None if there is no such customer."""
+        return self.db.query(Customer.version).filter(Customer.id == customer_id).scalar()
+
     def update_customer(self, customer_id: int, customer: CustomerUpdate) -> Customer:
         """Update a customer."""
         try:
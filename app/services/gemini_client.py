@@ -0,0 +1,361 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from google.api_core import exceptions as google_exceptions
+from app.config import get_settings
+
+# Upstream errors worth retrying: quota, overload and transient server failures
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+)
+
+class GeminiUnavailableError(Exception):
+    """The model could not be reached in time; the request may be retried later."""
+
+class CircuitOpenError(GeminiUnavailableError):
+    """Calls are being rejected because the upstream is unhealthy."""
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for rate limiting (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `rate_per_minute`. A rate of 0 disables it."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate_per_minute / 60.0)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1, timeout: Optional[float] = None):
+        """Take `amount` tokens, waiting for the bucket to refill if needed."""
+        if self.rate_per_minute <= 0:
+            return
+        amount = min(amount, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        async with self._lock:
+            self._refill()
+            if self.tokens < amount:
+                wait = (amount - self.tokens) * 60.0 / self.rate_per_minute
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    raise GeminiUnavailableError("Rate limit wait exceeds the request deadline")
+                self.waits += 1
+                self.wait_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= amount
+
+    def stats(self) -> Dict[str, Any]:
+        if self.rate_per_minute > 0:
+            self._refill()
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "available": round(self.tokens, 2),
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3)
+        }
+
+class CircuitBreaker:
+    """Stops calling an unhealthy upstream.
+
+    After `failure_threshold` consecutive failures the circuit opens for
+    `reset_timeout` seconds. In "fail_fast" mode calls made while open raise
+    CircuitOpenError; in "queue" mode they wait for the circuit to half-open.
+    When half-open, a single trial call decides whether it closes again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, mode: str = "fail_fast"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.mode = mode
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def _update_state(self):
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+    async def before_call(self, deadline: Optional[float] = None) -> bool:
+        """Wait for, or refuse, permission to call the upstream. Returns True for a half-open trial call."""
+        while True:
+            self._update_state()
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            retry_in = max(0.05, self.opened_at + self.reset_timeout - time.monotonic())
+            if self.mode != "queue" or (deadline is not None and time.monotonic() + retry_in > deadline):
+                self.rejected += 1
+                raise CircuitOpenError("Gemini is unavailable, try again later")
+            await asyncio.sleep(retry_in)
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Give up a half-open trial that ended without telling whether the upstream is back."""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        self._update_state()
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+class GeminiClient:
+    """Rate-limited, retrying async wrapper around a Gemini model.
+
+    All calls run on the client's own event loop thread, so the concurrency
+    semaphore, token buckets and circuit breaker are shared by async callers
+    and by sync callers going through `generate_sync`.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        attempt_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        settings = get_settings()
+        self.model = model
+        self.max_concurrency = max_concurrency or settings.gemini_max_concurrency
+        self.max_retries = max_retries if max_retries is not None else settings.gemini_max_retries
+        self.backoff_base = backoff_base if backoff_base is not None else settings.gemini_backoff_base
+        self.backoff_max = backoff_max if backoff_max is not None else settings.gemini_backoff_max
+        self.attempt_timeout = attempt_timeout or settings.gemini_attempt_timeout
+        self.deadline = deadline or settings.gemini_deadline
+        self.request_bucket = TokenBucket(
+            requests_per_minute if requests_per_minute is not None else settings.gemini_requests_per_minute)
+        self.token_bucket = TokenBucket(
+            tokens_per_minute if tokens_per_minute is not None else settings.gemini_tokens_per_minute)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=settings.gemini_breaker_threshold,
+            reset_timeout=settings.gemini_breaker_reset_seconds,
+            mode=settings.gemini_breaker_mode
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="gemini-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def generate(self, prompt: str, deadline: Optional[float] = None, **kwargs):
+        """Generate content, waiting for capacity and retrying transient errors.
+
+        `deadline` bounds the whole call in seconds, including queueing and
+        retries. Raises GeminiUnavailableError when it cannot be met.
+        """
+        loop = self._get_loop()
+        coro = self._generate(prompt, deadline or self.deadline, kwargs)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def generate_sync(self, prompt: str, deadline: Optional[float] = None, **kwargs):
+        """Blocking version of `generate` for code running outside the event loop."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._generate(prompt, deadline or self.deadline, kwargs), self._get_loop())
+        return future.result()
+
+    async def stream(self, prompt: str, deadline: Optional[float] = None, **kwargs) -> AsyncIterator[str]:
+        """Stream generated text as it arrives, under the same limits as `generate`.
+
+        Opening the stream is retried like a normal request; errors after the
+        first chunk are raised to the caller.
+        """
+        loop = self._get_loop()
+        caller_loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def emit(item):
+            caller_loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        async def produce():
+            try:
+                await self._stream(prompt, deadline or self.deadline, kwargs, emit)
+            except BaseException as e:
+                emit(e)
+            finally:
+                emit(done)
+
+        if caller_loop is loop:
+            producer = asyncio.ensure_future(produce())
+        else:
+            producer = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(produce(), loop))
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+
+    async def _generate(self, prompt: str, deadline_seconds: float, kwargs: dict):
+        deadline = time.monotonic() + deadline_seconds
+        async with self._slot(prompt, deadline):
+            return await self._with_retries(
+                deadline,
+                lambda timeout: asyncio.wait_for(self.model.generate_content_async(prompt, **kwargs), timeout)
+            )
+
+    async def _stream(self, prompt: str, deadline_seconds: float, kwargs: dict, emit: Callable[[Any], None]):
+        deadline = time.monotonic() + deadline_seconds
+        async with self._slot(prompt, deadline):
+            response = await self._with_retries(
+                deadline,
+                lambda timeout: asyncio.wait_for(
+                    self.model.generate_content_async(prompt, stream=True, **kwargs), timeout)
+            )
+            try:
+                async with asyncio.timeout(max(0.0, deadline - time.monotonic())):
+                    async for chunk in response:
+                        emit(chunk.text)
+            except RETRYABLE_ERRORS as e:
+                self.failures += 1
+                self.circuit_breaker.record_failure()
+                raise GeminiUnavailableError(f"Gemini stream interrupted: {str(e)}") from e
+
+    @asynccontextmanager
+    async def _slot(self, prompt: str, deadline: float):
+        """Wait for the circuit breaker, a concurrency slot and rate limit capacity."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.requests += 1
+
+        is_trial = await self.circuit_breaker.before_call(deadline)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            if is_trial:
+                self.circuit_breaker.release_trial()
+            raise GeminiUnavailableError("Timed out waiting for a free Gemini slot")
+        self.in_flight += 1
+        try:
+            await self.request_bucket.acquire(1, timeout=deadline - time.monotonic())
+            await self.token_bucket.acquire(estimate_tokens(prompt), timeout=deadline - time.monotonic())
+            yield
+        finally:
+            if is_trial:
+                self.circuit_breaker.release_trial()
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def _with_retries(self, deadline: float, attempt_call: Callable[[float], Awaitable[Any]]):
+        """Run `attempt_call(timeout)` with jittered exponential backoff on retryable errors."""
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.failures += 1
+                self.circuit_breaker.record_failure()
+                raise GeminiUnavailableError("Gemini request deadline exceeded")
+            try:
+                result = await attempt_call(min(self.attempt_timeout, remaining))
+                self.successes += 1
+                self.circuit_breaker.record_success()
+                return result
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.failures += 1
+                    self.circuit_breaker.record_failure()
+                    raise GeminiUnavailableError(f"Gemini request failed after {attempt + 1} attempts: {str(e)}") from e
+                attempt += 1
+                self.retries += 1
+                logging.warning(f"Retrying Gemini request in {delay:.2f}s (attempt {attempt}): {str(e)}")
+                await asyncio.sleep(delay)
+            except Exception:
+                # Not an availability problem (e.g. a bad request); leave the breaker as it was
+                self.failures += 1
+                self.circuit_breaker.release_trial()
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter state and retry counters for tuning."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "request_bucket": self.request_bucket.stats(),
+            "token_bucket": self.token_bucket.stats(),
+            "circuit_breaker": self.circuit_breaker.stats()
+        }
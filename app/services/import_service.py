@@ -0,0 +1,238 @@
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import logging
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models import (
+    Agent, AnalysisJob, AnalysisStatus, Call, CallContent, Customer, ImportJob, ImportReject, ImportStatus
+)
+from app.schemas import AgentCreate, CallCreate, CustomerCreate
+from app.search_index import index_transcripts
+
+# Table, row schema and unique fields of each kind of import
+IMPORT_KINDS = {
+    "agents": (Agent, AgentCreate, ("employee_id", "email", "phone_number")),
+    "customers": (Customer, CustomerCreate, ("email", "phone_number")),
+    "calls": (Call, CallCreate, ())
+}
+FIELD_LABELS = {"employee_id": "Employee ID", "email": "Email", "phone_number": "Phone number"}
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """Work out whether an upload is CSV or NDJSON from its name or content type."""
+    name, content_type = (filename or "").lower(), (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type.endswith(("ndjson", "jsonl")):
+        return "ndjson"
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    raise HTTPException(status_code=400, detail="Unknown import format, expected a .csv or .ndjson file")
+
+def read_rows(stream: BinaryIO, fmt: str) -> Iterator[Any]:
+    """Stream the rows of a CSV or NDJSON file without loading it into memory.
+
+    CSV rows are dicts without their empty cells, so schema defaults apply.
+    NDJSON rows are the raw lines, parsed when they are validated.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for row in csv.DictReader(text):
+                yield {key: value for key, value in row.items() if key and value not in (None, "")}
+        else:
+            for line in text:
+                if line.strip():
+                    yield line
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+def _error_message(error: ValueError) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+        )
+    if isinstance(error, json.JSONDecodeError):
+        return f"Invalid JSON: {error.msg}"
+    return str(error)
+
+class ImportService:
+    """Service for bulk importing agents, customers and historical calls."""
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or get_settings().import_batch_size
+        # Analysis jobs queued for imported calls, for the caller to hand to the worker pool
+        self.analysis_job_ids: List[int] = []
+
+    def start_job(self, kind: str, source: Optional[str] = None) -> ImportJob:
+        """Record a new import."""
+        if kind not in IMPORT_KINDS:
+            raise HTTPException(status_code=400, detail=f"Unknown import kind: {kind}")
+        job = ImportJob(kind=kind, source=source, status=ImportStatus.RUNNING)
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[ImportJob]:
+        """Get an import job."""
+        return self.db.query(ImportJob).filter(ImportJob.id == job_id).first()
+
+    def resume_job(self, job_id: int, kind: str) -> ImportJob:
+        """Reopen an interrupted or failed import so it can continue where it stopped."""
+        job = self.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        if job.kind != kind:
+            raise HTTPException(status_code=400, detail=f"Import job {job_id} imports {job.kind}, not {kind}")
+        if job.status == ImportStatus.COMPLETED:
+            raise HTTPException(status_code=409, detail="Import job already completed")
+        job.status = ImportStatus.RUNNING
+        job.error = None
+        self.db.commit()
+        return job
+
+    def get_rejects(self, job_id: int, skip: int = 0, limit: int = 100) -> List[ImportReject]:
+        """Get the rejected rows of an import in source order."""
+        return self.db.query(ImportReject)\
+            .filter(ImportReject.job_id == job_id)\
+            .order_by(ImportReject.row)\
+            .offset(skip)\
+            .limit(limit)\
+            .all()
+
+    def run(self, job: ImportJob, rows: Iterable[Any], progress: Optional[Callable[[ImportJob], None]] = None) -> ImportJob:
+        """Import `rows` (as produced by `read_rows`) for a job, one transaction per batch.
+
+        Each batch is validated with the create schema, deduplicated on its
+        unique fields within the batch and against the database with one
+        query per field, and inserted with executemany. A batch commits
+        together with the job's progress, so the first `rows_processed`
+        rows are skipped when the same source is run again for the job.
+        """
+        pending = islice(enumerate(rows, start=1), job.rows_processed, None)
+        try:
+            while True:
+                batch = list(islice(pending, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(job, batch)
+                if progress:
+                    progress(job)
+        except HTTPException:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            job.status = ImportStatus.FAILED
+            job.error = str(e)
+            self.db.commit()
+            logging.error(f"Import job {job.id} failed after row {job.rows_processed}: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Import failed after row {job.rows_processed}; resume it with job_id={job.id}"
+            )
+
+        job.status = ImportStatus.COMPLETED
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def _import_batch(self, job: ImportJob, batch: List[Tuple[int, Any]]):
+        model, schema, unique_fields = IMPORT_KINDS[job.kind]
+        rejects = []
+        valid = []
+        for row_number, raw in batch:
+            try:
+                data = json.loads(raw) if isinstance(raw, str) else raw
+                valid.append((row_number, data, schema.model_validate(data)))
+            except ValueError as e:
+                rejects.append((row_number, _error_message(e), raw))
+
+        if job.kind == "calls":
+            valid = self._check_calls(valid, rejects)
+        valid = self._dedupe(model, unique_fields, valid, rejects)
+
+        items = [item for _, _, item in valid]
+        analysis_job_ids = self._insert_calls(items) if job.kind == "calls" else self._insert(model, items)
+        if rejects:
+            self.db.execute(insert(ImportReject), [
+                {"job_id": job.id, "row": row_number, "error": error, "data": data}
+                for row_number, error, data in rejects
+            ])
+        job.rows_processed += len(batch)
+        job.inserted += len(items)
+        job.rejected += len(rejects)
+        self.db.commit()
+        self.analysis_job_ids.extend(analysis_job_ids)
+
+    def _existing_values(self, column, values: set) -> set:
+        if not values:
+            return set()
+        return set(self.db.scalars(select(column).where(column.in_(values))))
+
+    def _dedupe(self, model, fields: Tuple[str, ...], valid: list, rejects: list) -> list:
+        """Reject rows whose unique fields are already registered or repeat an earlier row."""
+        existing = {
+            field: self._existing_values(getattr(model, field), {getattr(item, field) for _, _, item in valid})
+            for field in fields
+        }
+        seen = {field: set() for field in fields}
+        kept = []
+        for row_number, data, item in valid:
+            error = next((f"{FIELD_LABELS[f]} already registered" for f in fields if getattr(item, f) in existing[f]), None)\
+                or next((f"Duplicate {FIELD_LABELS[f].lower()} in import" for f in fields if getattr(item, f) in seen[f]), None)
+            if error:
+                rejects.append((row_number, error, data))
+                continue
+            for field in fields:
+                seen[field].add(getattr(item, field))
+            kept.append((row_number, data, item))
+        return kept
+
+    def _check_calls(self, valid: list, rejects: list) -> list:
+        """Reject calls with an empty or oversized transcript or an unknown customer or agent."""
+        customer_ids = self._existing_values(Customer.id, {item.customer_id for _, _, item in valid})
+        agent_ids = self._existing_values(Agent.id, {item.agent_id for _, _, item in valid})
+        max_length = get_settings().long_transcript_max_length
+        kept = []
+        for row_number, data, item in valid:
+            if not item.transcript.strip():
+                rejects.append((row_number, "Transcript must not be empty", data))
+            elif len(item.transcript) > max_length:
+                rejects.append((row_number, "Transcript too long", data))
+            elif item.customer_id not in customer_ids:
+                rejects.append((row_number, "Customer not found", data))
+            elif item.agent_id not in agent_ids:
+                rejects.append((row_number, "Agent not found", data))
+            else:
+                kept.append((row_number, data, item))
+        return kept
+
+    def _insert(self, model, items: list) -> List[int]:
+        if items:
+            self.db.execute(insert(model), [item.model_dump() for item in items])
+        return []
+
+    def _insert_calls(self, items: List[CallCreate]) -> List[int]:
+        """Insert calls with a pending analysis and queue an analysis job for each. Returns the job IDs."""
+        if not items:
+            return []
+        call_ids = list(self.db.scalars(
+            insert(Call).returning(Call.id, sort_by_parameter_order=True),
+            [dict(item.model_dump(exclude={"transcript"}), analysis_status=AnalysisStatus.PENDING) for item in items]
+        ))
+        self.db.execute(insert(CallContent), [
+            {"call_id": call_id, "transcript": item.transcript} for call_id, item in zip(call_ids, items)
+        ])
+        # Bulk inserts skip the mapper events that maintain the transcript index
+        index_transcripts(self.db.connection(), zip(call_ids, [item.transcript for item in items]))
+        return list(self.db.scalars(
+            insert(AnalysisJob).returning(AnalysisJob.id, sort_by_parameter_order=True),
+            [{"call_id": call_id, "status": AnalysisStatus.PENDING, "attempts": 0} for call_id in call_ids]
+        ))
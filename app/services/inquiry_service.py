@@ -1,24 +1,57 @@
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.models import Customer, Inquiry, InquiryStatus
 from app.schemas import InquiryCreate, CustomerCreate, InquiryUpdate, CallCreate
 from app.services.customer_service import CustomerService
 from app.services.call_service import CallService
 from app.services.ai_service import AIService
+from app.services.outbox_service import BLAND_CALL, OutboxService
+from app.services.tiered_ai_service import get_analysis_service
 from fastapi import HTTPException
 from datetime import datetime, UTC
 from app.database import get_default_ai_agent_id
 from sqlalchemy.exc import OperationalError
 from pydantic import ValidationError
 import logging
-import requests
+
+def build_call_payload(phone_number: str, inquiry_id: int) -> dict:
+    """Build the body of the bland.ai request that calls the customer back."""
+    return {
+        "phone_number": phone_number,
+        "voice": "June",
+        "wait_for_greeting": False,
+        "record": True,
+        "answered_by_enabled": True,
+        "noise_cancellation": False,
+        "interruption_threshold": 100,
+        "block_interruptions": False,
+        "max_duration": 12,
+        "model": "base",
+        "language": "en",
+        "background_track": "none",
+        "endpoint": "https://api.bland.ai",
+        "voicemail_action": "hangup",
+        "pathway_id": "a560e8ab-ce88-440e-a722-308a09d2a9d5",
+        "pathway_version": 2,
+        "metadata": {
+            "inquiry_id": inquiry_id
+        }
+    }
 
 class InquiryService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, ai_service: AIService = None):
         self.db = db
         self.customer_service = CustomerService(db)
-        self.call_service = CallService(db, AIService())
+        self.call_service = CallService(db, ai_service or get_analysis_service())
+        # bland.ai call requests queued by create_inquiry, for the caller to hand to the outbox dispatcher
+        self.outbox_message_ids: List[int] = []
 
     def create_inquiry(self, inquiry_data: InquiryCreate) -> Inquiry:
+        """Find or create the customer and the inquiry.
+
+        A new inquiry is committed together with the outbox message that asks
+        bland.ai to call the customer, so every lead gets dialled.
+        """
         # First, try to find the customer by phone number
         customer = self.db.query(Customer).filter(
             Customer.phone_number == inquiry_data.phone_number
@@ -50,41 +83,55 @@ class InquiryService:
         )
         
         self.db.add(db_inquiry)
+        self.db.flush()
+
+        # Queue the bland.ai call in the inquiry's transaction; the dispatcher sends it after commit
+        message = OutboxService(self.db).enqueue(
+            BLAND_CALL, build_call_payload(inquiry_data.phone_number, db_inquiry.id), inquiry_id=db_inquiry.id
+        )
         self.db.commit()
         self.db.refresh(db_inquiry)
-        
-        # Call external API (bland.ai)
-        headers = {
-            'Authorization': 'org_5866470eb265da3e5a3fa9cbbd9d493243eb17b08d57dc5357ee4d1bc5d48bf1c68906990e2371be581069',  # TODO: Replace with your actual API key
-        }
-        data = {
-            "phone_number": inquiry_data.phone_number,
-            "voice": "June",
-            "wait_for_greeting": False,
-            "record": True,
-            "answered_by_enabled": True,
-            "noise_cancellation": False,
-            "interruption_threshold": 100,
-            "block_interruptions": False,
-            "max_duration": 12,
-            "model": "base",
-            "language": "en",
-            "background_track": "none",
-            "endpoint": "https://api.bland.ai",
-            "voicemail_action": "hangup",
-            "pathway_id": "a560e8ab-ce88-440e-a722-308a09d2a9d5",
-            "pathway_version": 2,
-            "webhook": "https://e9d8-94-206-192-223.ngrok-free.app/inquiries/webhook",
-            "metadata": {
-                "inquiry_id": db_inquiry.id
-            }
-        }
-        try:
-            response = requests.post('https://api.bland.ai/v1/calls', json=data, headers=headers)
-            response.raise_for_status()
-        except Exception as e:
-            print(f"Error calling external API: {e}")
-        return db_inquiry 
+        self.outbox_message_ids.append(message.id)
+        return db_inquiry
+
+    def build_call(self, db_inquiry: Inquiry, inquiry_update: InquiryUpdate) -> Optional[CallCreate]:
+        """The call record for a webhook's transcript, checked so it can be stored. None without a transcript."""
+        if not inquiry_update.concatenated_transcript:
+            return None
+
+        # Get the default AI agent ID
+        ai_agent_id = get_default_ai_agent_id(self.db)
+        if not ai_agent_id:
+            raise HTTPException(status_code=500, detail="Default AI agent not found")
+
+        call_data = CallCreate(
+            customer_id=db_inquiry.customer_id,
+            agent_id=ai_agent_id,
+            transcript=inquiry_update.concatenated_transcript
+        )
+        self.call_service._validate_call(call_data)
+        return call_data
+
+    def apply_update(self, db_inquiry: Inquiry, inquiry_update: InquiryUpdate, analysis: Optional[dict] = None) -> Inquiry:
+        """Apply a webhook update to an inquiry without committing.
+
+        A transcript is stored as a call by the default AI agent and moves the
+        inquiry to DEAL. Pass `analysis` to store the call with a result that
+        was already produced instead of calling the AI service.
+        """
+        # Update inquiry fields
+        for field, value in inquiry_update.model_dump(exclude_unset=True).items():
+            if field != 'inquiry_id':  # Skip inquiry_id as it's used for lookup
+                setattr(db_inquiry, field, value)
+
+        # If transcript is provided, create a call record
+        call_data = self.build_call(db_inquiry, inquiry_update)
+        if call_data:
+            self.call_service.add_call(call_data, analysis=analysis)
+
+            # Update inquiry status
+            db_inquiry.status = InquiryStatus.DEAL
+        return db_inquiry
 
     def update_inquiry(self, inquiry_id: int, inquiry_update: InquiryUpdate) -> Inquiry:
         """Update an inquiry by ID."""
@@ -94,29 +141,7 @@ class InquiryService:
             if not db_inquiry:
                 raise HTTPException(status_code=404, detail="Inquiry not found")
 
-            # Update inquiry fields
-            for field, value in inquiry_update.model_dump(exclude_unset=True).items():
-                if field != 'inquiry_id':  # Skip inquiry_id as it's used for lookup
-                    setattr(db_inquiry, field, value)
-
-            # If transcript is provided, create a call record
-            if inquiry_update.concatenated_transcript:
-                # Get the default AI agent ID
-                ai_agent_id = get_default_ai_agent_id(self.db)
-                if not ai_agent_id:
-                    raise HTTPException(status_code=500, detail="Default AI agent not found")
-
-                # Create call record with the concatenated transcript
-                call_data = CallCreate(
-                    customer_id=db_inquiry.customer_id,
-                    agent_id=ai_agent_id,
-                    transcript=inquiry_update.concatenated_transcript
-                )
-                self.call_service.create_call(call_data)
-
-                # Update inquiry status
-                db_inquiry.status = InquiryStatus.DEAL
-
+            self.apply_update(db_inquiry, inquiry_update)
             self.db.commit()
             self.db.refresh(db_inquiry)
             return db_inquiry
@@ -0,0 +1,63 @@
+from datetime import datetime, UTC
+from typing import List, Optional
+import re
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import CallIssue
+from app.services.agent_stats_service import window_start
+
+_WHITESPACE = re.compile(r"\s+")
+# Labels the model uses to say there was nothing wrong
+NO_ISSUE_LABELS = {"no issues", "no issue", "none", "n/a", "na", "nothing"}
+
+def canonical_issue(label: str) -> str:
+    """Normalise an issue label: lower case, single spaces, no surrounding punctuation."""
+    return _WHITESPACE.sub(" ", label).strip(" \t.;:-").casefold()
+
+def split_issues(agent_issues: Optional[str]) -> List[str]:
+    """Split comma-joined issue text into distinct canonical labels, in order of first mention."""
+    labels = []
+    for label in (agent_issues or "").split(","):
+        label = canonical_issue(label)
+        if label and label not in NO_ISSUE_LABELS and label not in labels:
+            labels.append(label)
+    return labels
+
+class IssueService:
+    """Service for ranking the issues reported on calls."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_issues(self, agent_id: int, call_date: Optional[datetime], agent_issues: Optional[str]) -> List[CallIssue]:
+        """Build the issue rows for a call's analysis."""
+        call_date = call_date or datetime.now(UTC)
+        return [CallIssue(agent_id=agent_id, issue=issue, call_date=call_date) for issue in split_issues(agent_issues)]
+
+    def agent_issues(self, agent_id: int, days: int = 30) -> List[str]:
+        """Get the distinct issues reported on an agent's calls in the last `days` days."""
+        rows = self.db.query(CallIssue.issue)\
+            .filter(CallIssue.agent_id == agent_id, CallIssue.call_date >= window_start(days))\
+            .distinct()\
+            .order_by(CallIssue.issue)\
+            .all()
+        return [row.issue for row in rows]
+
+    def agent_issue_counts(self, agent_id: int, days: int = 30, limit: int = 10) -> List[dict]:
+        """Rank an agent's issues by the number of calls they were reported on."""
+        query = self.db.query(CallIssue.issue, func.count().label("count"))\
+            .filter(CallIssue.agent_id == agent_id, CallIssue.call_date >= window_start(days))
+        return self._ranked(query, limit)
+
+    def top_issues(self, days: int = 7, limit: int = 10) -> List[dict]:
+        """Rank issues across all agents by the number of calls they were reported on."""
+        query = self.db.query(CallIssue.issue, func.count().label("count"))\
+            .filter(CallIssue.call_date >= window_start(days))
+        return self._ranked(query, limit)
+
+    def _ranked(self, query, limit: int) -> List[dict]:
+        rows = query.group_by(CallIssue.issue)\
+            .order_by(func.count().desc(), CallIssue.issue)\
+            .limit(limit)\
+            .all()
+        return [{"issue": row.issue, "count": row.count} for row in rows]
@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import re
+
+# Zero-width split points in front of a speaker label ("Agent: ", "user: ", ...)
+# at the start of a line or after the end of a sentence.
+_TURN_BOUNDARY = re.compile(r"(?m)(?:^|(?<=[.!?\"']\s))[ \t]*(?=[A-Za-z][\w .'-]{0,30}:\s)")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+MERGE_STRATEGY = {
+    "agent_performance_score": "mean weighted by chunk length",
+    "customer_interest_score": "mean weighted by chunk length",
+    "test_drive_readiness": "maximum over chunks",
+    "agent_issues": "union in order of first mention",
+    "customer_preferences": "union in order of first mention",
+    "customer_description": "from the chunk with the highest interest score"
+}
+
+def split_turns(transcript: str) -> List[str]:
+    """Split a transcript into speaker turns. Text without speaker labels is one turn."""
+    return [turn for turn in _TURN_BOUNDARY.split(transcript) if turn.strip()]
+
+def _split_long_turn(turn: str, max_chars: int) -> List[str]:
+    """Break a turn that doesn't fit in a chunk at sentence, then word, then character boundaries."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(turn):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_transcript(transcript: str, max_chars: int, overlap_turns: int = 1) -> List[str]:
+    """Pack speaker turns into chunks of at most `max_chars`.
+
+    Each chunk after the first repeats up to `overlap_turns` turns from the
+    end of the previous one so the model keeps some context.
+    """
+    turns = []
+    for turn in split_turns(transcript):
+        turns.extend(_split_long_turn(turn, max_chars) if len(turn) > max_chars else [turn])
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for turn in turns:
+        if current and size + len(turn) > max_chars:
+            chunks.append(current)
+            overlap = []
+            for previous in reversed(current[-overlap_turns:] if overlap_turns else []):
+                if sum(map(len, overlap)) + len(previous) + len(turn) > max_chars:
+                    break
+                overlap.insert(0, previous)
+            current = overlap
+            size = sum(map(len, current))
+        current.append(turn)
+        size += len(turn)
+    if current:
+        chunks.append(current)
+    return ["".join(chunk).strip() for chunk in chunks]
+
+def _split_list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in str(value or "").split(",") if item.strip()]
+
+def _union(values: List[Optional[str]]) -> str:
+    seen = {}
+    for value in values:
+        for item in _split_list(value):
+            seen.setdefault(item.lower(), item)
+    return ", ".join(seen.values())
+
+def _weighted_mean(values: List[Optional[float]], weights: List[int]) -> float:
+    pairs = [(value, weight) for value, weight in zip(values, weights) if value is not None]
+    total = sum(weight for _, weight in pairs)
+    return sum(value * weight for value, weight in pairs) / total if total else 0.0
+
+def merge_analyses(analyses: List[Dict[str, Any]], chunk_lengths: List[int]) -> Dict[str, Any]:
+    """Combine per-chunk analyses into one result with the same fields. See MERGE_STRATEGY."""
+    readiness = [a.get("test_drive_readiness") for a in analyses if a.get("test_drive_readiness") is not None]
+    most_interested = max(analyses, key=lambda a: a.get("customer_interest_score") or 0.0)
+    issues = _union([a.get("agent_issues") for a in analyses])
+    # "No issues" only holds if no chunk reported a real one
+    real_issues = [item for item in _split_list(issues) if item.lower() != "no issues"]
+    return {
+        "agent_performance_score": _weighted_mean([a.get("agent_performance_score") for a in analyses], chunk_lengths),
+        "customer_interest_score": _weighted_mean([a.get("customer_interest_score") for a in analyses], chunk_lengths),
+        "test_drive_readiness": max(readiness) if readiness else 0.0,
+        "agent_issues": ", ".join(real_issues) if real_issues else issues,
+        "customer_description": most_interested.get("customer_description") or "",
+        "customer_preferences": _union([a.get("customer_preferences") for a in analyses]),
+        "chunked": True,
+        "chunk_count": len(analyses),
+        "merge_strategy": MERGE_STRATEGY,
+        "chunks": analyses
+    }
+
+def analyze_long_transcript(
+    ai_service,
+    transcript: str,
+    max_chunk_chars: int,
+    overlap_turns: int = 1,
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """Analyse a transcript too long for one prompt by analysing its chunks in parallel and merging them."""
+    chunks = chunk_transcript(transcript, max_chunk_chars, overlap_turns)
+    if len(chunks) == 1:
+        return ai_service.analyze_call(chunks[0])
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        analyses = list(executor.map(ai_service.analyze_call, chunks))
+    return merge_analyses(analyses, [len(chunk) for chunk in chunks])
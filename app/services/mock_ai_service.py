@@ -1,23 +1,78 @@
 from datetime import datetime, UTC
+import asyncio
+import json
+import math
 import random
 import re
-from typing import Dict, Any
+import threading
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Type
+from google.api_core import exceptions as google_exceptions
+
+# Patterns in priority order: the first model that matches anywhere in the
+# transcript wins, then the first scenario.
+MODEL_PATTERNS = [
+    ('e-class', r'e-?class|e class'),
+    ('g-class', r'g-?class|g class'),
+    ('eqe', r'eqe|electric'),
+    ('cla', r'cla'),
+    ('amg', r'amg'),
+    ('s-class', r's-?class|s class'),
+    ('c-class', r'c-?class|c class'),
+    ('glc', r'glc')
+]
+SCENARIO_PATTERNS = [
+    ('pre-owned', r'pre-owned'),
+    ('service', r'service'),
+    ('showroom', r'showroom'),
+    ('price', r'price|negotiation'),
+    ('test_drive', r'test_drive')
+]
+
+# Errors Gemini returns under load, weighted by how often they show up
+DEFAULT_FAILURE_WEIGHTS = {
+    google_exceptions.ResourceExhausted: 0.7,
+    google_exceptions.ServiceUnavailable: 0.2,
+    google_exceptions.DeadlineExceeded: 0.1
+}
+
+def _compile_matcher(patterns: List[tuple]) -> re.Pattern:
+    # Each alternative sits in a lookahead so matches don't consume text: every
+    # position reports its highest-priority match and none hide one another.
+    alternatives = "|".join(f"(?P<p{i}>{pattern})" for i, (_, pattern) in enumerate(patterns))
+    return re.compile(f"(?=(?:{alternatives}))", re.IGNORECASE)
+
+_PATTERNS = MODEL_PATTERNS + SCENARIO_PATTERNS
+_MATCHER = _compile_matcher(_PATTERNS)
 
 class MockAIService:
-    """Mock service for AI-powered call analysis used in testing."""
+    """Mock service for AI-powered call analysis used in testing and load tests.
+
+    Transcripts are classified with one precompiled pattern in a single pass.
+    With a `seed` the generated scores, latencies and failures are
+    reproducible. Latency is log-normal around `latency_median` seconds and
+    `failure_rate` of requests raise the errors Gemini raises under load.
+    """
+
+    cache_namespace = "mock:v1"
     
-    def __init__(self):
-        self.model_patterns = {
-            'e-class': r'e-?class|e class',
-            'g-class': r'g-?class|g class',
-            'eqe': r'eqe|electric',
-            'cla': r'cla',
-            'amg': r'amg',
-            's-class': r's-?class|s class',
-            'c-class': r'c-?class|c class',
-            'glc': r'glc'
-        }
-        
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        latency_median: float = 0.0,
+        latency_sigma: float = 0.5,
+        failure_rate: float = 0.0,
+        failure_weights: Optional[Dict[Type[Exception], float]] = None
+    ):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.failure_rate = failure_rate
+        self.failure_weights = failure_weights or DEFAULT_FAILURE_WEIGHTS
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.model_patterns = dict(MODEL_PATTERNS)
+        self.scenario_patterns = dict(SCENARIO_PATTERNS)
+
         self.model_analysis = {
             'amg': {
                 'agent_performance_score': 96.0,
@@ -85,7 +140,7 @@ class MockAIService:
             }
         }
         
-        self.scenario_patterns = {
+        self.scenario_analysis = {
             'pre-owned': {
                 'agent_performance_score': 93.0,
                 'customer_interest_score': 90.0,
@@ -128,6 +183,17 @@ class MockAIService:
             }
         }
 
+    def classify(self, transcript: str) -> Optional[str]:
+        """Get the model or scenario a transcript is about, or None for a general inquiry."""
+        best = None
+        for match in _MATCHER.finditer(transcript):
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return _PATTERNS[best][0] if best is not None else None
+
     def analyze_call(self, transcript: str) -> Dict[str, Any]:
         """
         Analyze a call transcript and return metrics.
@@ -141,28 +207,70 @@ class MockAIService:
             
         Raises:
             ValueError: If transcript is empty
+            google.api_core.exceptions.GoogleAPICallError: On a simulated failure
         """
+        result = self._analyze(transcript)
+        self._simulate_request()
+        return result
+
+    def analyze_calls(self, transcripts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze several transcripts as one simulated request: one latency, one failure draw."""
+        results = [self._analyze(transcript) for transcript in transcripts]
+        self._simulate_request()
+        return results
+
+    async def stream_analysis(self, transcript: str) -> AsyncIterator[str]:
+        """Stream the mock analysis as JSON text in small pieces, like a streaming model."""
+        text = json.dumps(self._analyze(transcript))
+        delay, error = self._draw_request()
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        for start in range(0, len(text), 32):
+            await asyncio.sleep(0)
+            yield text[start:start + 32]
+
+    def _analyze(self, transcript: str) -> Dict[str, Any]:
         if not transcript or not transcript.strip():
             raise ValueError("Transcript cannot be empty")
 
-        transcript_lower = transcript.lower()
-        
-        # Check for model-specific analysis
-        for model, pattern in self.model_patterns.items():
-            if re.search(pattern, transcript_lower):
-                return self.model_analysis[model]
-        
-        # Check for scenario-specific analysis
-        for scenario, pattern in self.scenario_patterns.items():
-            if scenario in transcript_lower or (scenario == 'price' and 'negotiation' in transcript_lower):
-                return pattern
-        
+        key = self.classify(transcript)
+        if key in self.model_analysis:
+            return dict(self.model_analysis[key])
+        if key in self.scenario_analysis:
+            return dict(self.scenario_analysis[key])
+
         # Default analysis for general inquiries
-        return {
-            'agent_performance_score': random.uniform(70, 95),
-            'customer_interest_score': random.uniform(60, 90),
-            'customer_description': 'General inquiry',
-            'customer_preferences': 'Luxury vehicles',
-            'test_drive_readiness': random.uniform(50, 100),
-            'agent_issues': 'No issues'
-        } 
\ No newline at end of file
+        with self._random_lock:
+            return {
+                'agent_performance_score': self._random.uniform(70, 95),
+                'customer_interest_score': self._random.uniform(60, 90),
+                'customer_description': 'General inquiry',
+                'customer_preferences': 'Luxury vehicles',
+                'test_drive_readiness': self._random.uniform(50, 100),
+                'agent_issues': 'No issues'
+            }
+
+    def _draw_request(self) -> tuple:
+        """Draw the latency and the error, if any, of one simulated request."""
+        with self._random_lock:
+            delay = 0.0
+            if self.latency_median > 0:
+                delay = self._random.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+            error = None
+            if self.failure_rate > 0 and self._random.random() < self.failure_rate:
+                kinds = list(self.failure_weights)
+                kind = self._random.choices(kinds, weights=[self.failure_weights[k] for k in kinds])[0]
+                error = kind("Simulated Gemini failure")
+        return delay, error
+
+    def _simulate_request(self):
+        delay, error = self._draw_request()
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+
+    def parse_analysis(self, response_text: str) -> Dict[str, Any]:
+        """Parse the streamed mock output."""
+        return json.loads(response_text)
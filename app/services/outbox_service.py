@@ -0,0 +1,257 @@
+from datetime import datetime, UTC, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import httpx
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models import OutboxMessage, OutboxStatus
+from app.services.worker_pool import WorkerPool
+
+# Kinds of outbound request
+BLAND_CALL = "bland_call"
+
+# Answers worth trying again later; other 4xx answers will not change
+RETRYABLE_STATUS_CODES = {408, 425, 429}
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+class OutboxService:
+    """Service for the transactional outbox of outbound requests.
+
+    Messages are added in the caller's transaction, so a request is sent if
+    and only if the change that needs it commits.
+    """
+
+    def __init__(self, db: Session, max_attempts: Optional[int] = None, retry_base_seconds: Optional[float] = None):
+        settings = get_settings()
+        self.db = db
+        self.max_attempts = max_attempts or settings.outbox_max_attempts
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else settings.outbox_retry_base_seconds
+        self.retry_max_seconds = settings.outbox_retry_max_seconds
+        self.lease_seconds = settings.outbox_lease_seconds
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], inquiry_id: Optional[int] = None) -> OutboxMessage:
+        """Add a message to the caller's transaction without committing."""
+        message = OutboxMessage(kind=kind, payload=payload, inquiry_id=inquiry_id, status=OutboxStatus.PENDING, attempts=0)
+        self.db.add(message)
+        self.db.flush()
+        return message
+
+    def get_message(self, message_id: int) -> Optional[OutboxMessage]:
+        """Get an outbox message."""
+        return self.db.query(OutboxMessage).filter(OutboxMessage.id == message_id).first()
+
+    def get_messages(self, status: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[OutboxMessage]:
+        """Get outbox messages, oldest first, optionally only those with a status."""
+        query = self.db.query(OutboxMessage)
+        if status:
+            query = query.filter(OutboxMessage.status == status)
+        return query.order_by(OutboxMessage.id).offset(skip).limit(limit).all()
+
+    def get_due_message_ids(self, limit: int = 1000) -> List[int]:
+        """Get the IDs of pending messages whose next attempt is due, longest waiting first."""
+        rows = self.db.query(OutboxMessage.id)\
+            .filter(OutboxMessage.status == OutboxStatus.PENDING, OutboxMessage.next_attempt_at <= datetime.now(UTC))\
+            .order_by(OutboxMessage.next_attempt_at)\
+            .limit(limit)\
+            .all()
+        return [row.id for row in rows]
+
+    def requeue_expired_messages(self) -> int:
+        """Put messages whose lease has expired while sending back in the queue.
+
+        A message is leased to the worker that claims it for `outbox_lease_seconds`,
+        so messages held by workers in other running processes are left alone.
+        Whether an expired request reached the other side is unknown, so it is
+        sent again: delivery is at least once.
+        """
+        expired = datetime.now(UTC) - timedelta(seconds=self.lease_seconds)
+        count = self.db.query(OutboxMessage)\
+            .filter(
+                OutboxMessage.status == OutboxStatus.SENDING,
+                or_(OutboxMessage.locked_at.is_(None), OutboxMessage.locked_at <= expired)
+            )\
+            .update({OutboxMessage.status: OutboxStatus.PENDING}, synchronize_session=False)
+        self.db.commit()
+        return count
+
+    def claim_message(self, message_id: int) -> bool:
+        """Mark a due message as sending and lease it. Returns False if it is not due or another worker got it first."""
+        now = datetime.now(UTC)
+        claimed = self.db.query(OutboxMessage)\
+            .filter(
+                OutboxMessage.id == message_id,
+                OutboxMessage.status == OutboxStatus.PENDING,
+                OutboxMessage.next_attempt_at <= now
+            )\
+            .update({
+                OutboxMessage.status: OutboxStatus.SENDING,
+                OutboxMessage.attempts: OutboxMessage.attempts + 1,
+                OutboxMessage.locked_at: now,
+                OutboxMessage.updated_at: now
+            }, synchronize_session=False)
+        self.db.commit()
+        return claimed == 1
+
+    def record_success(self, message_id: int, response_code: int) -> OutboxMessage:
+        """Mark a message as sent."""
+        message = self.get_message(message_id)
+        message.status = OutboxStatus.SENT
+        message.response_code = response_code
+        message.error = None
+        message.sent_at = datetime.now(UTC)
+        self.db.commit()
+        self.db.refresh(message)
+        return message
+
+    def record_failure(
+        self,
+        message_id: int,
+        error: str,
+        response_code: Optional[int] = None,
+        retry: bool = True,
+        retry_after: Optional[float] = None
+    ) -> OutboxMessage:
+        """Record a failed attempt, scheduling a retry with exponential backoff until attempts run out."""
+        message = self.get_message(message_id)
+        message.error = error
+        message.response_code = response_code
+        if retry and message.attempts < self.max_attempts:
+            delay = retry_after if retry_after is not None else self.retry_base_seconds * 2 ** (message.attempts - 1)
+            message.status = OutboxStatus.PENDING
+            message.next_attempt_at = datetime.now(UTC) + timedelta(seconds=min(delay, self.retry_max_seconds))
+        else:
+            message.status = OutboxStatus.FAILED
+        self.db.commit()
+        self.db.refresh(message)
+        return message
+
+    def replay_message(self, message_id: int) -> OutboxMessage:
+        """Queue a failed message again, with a fresh set of attempts."""
+        message = self.get_message(message_id)
+        if not message:
+            raise HTTPException(status_code=404, detail="Outbox message not found")
+        if message.status != OutboxStatus.FAILED:
+            raise HTTPException(status_code=409, detail=f"Only failed messages can be replayed, this one is {message.status}")
+        message.status = OutboxStatus.PENDING
+        message.attempts = 0
+        message.error = None
+        message.next_attempt_at = datetime.now(UTC)
+        self.db.commit()
+        self.db.refresh(message)
+        return message
+
+class OutboxDispatcher(WorkerPool):
+    """Sends outbox messages over one pooled keep-alive HTTP client.
+
+    Concurrency is bounded by the worker count, which also caps the
+    connection pool. New messages are submitted when they commit; a poller
+    picks up retries when they fall due and anything written by other
+    processes.
+    """
+
+    name = "outbox"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        poll_seconds: Optional[float] = None,
+        bland_api_url: Optional[str] = None,
+        bland_api_key: Optional[str] = None,
+        bland_webhook_url: Optional[str] = None
+    ):
+        settings = get_settings()
+        super().__init__(
+            session_factory, max_workers or settings.outbox_concurrency, poll_seconds or settings.outbox_poll_seconds
+        )
+        self.timeout = timeout or settings.outbox_timeout_seconds
+        self.bland_api_url = bland_api_url or settings.bland_api_url
+        self.bland_api_key = bland_api_key or settings.bland_api_key
+        self.bland_webhook_url = bland_webhook_url or settings.bland_webhook_url
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared HTTP client. Its connections are kept alive between requests."""
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.max_workers, max_keepalive_connections=self.max_workers)
+                )
+            return self._client
+
+    def shutdown(self, wait: bool = True):
+        """Stop the poller and the workers and close the HTTP client. Unsent messages stay in the outbox."""
+        super().shutdown(wait)
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    def resume_job_ids(self, db: Session) -> List[int]:
+        return self.due_job_ids(db)
+
+    def due_job_ids(self, db: Session) -> List[int]:
+        service = OutboxService(db)
+        service.requeue_expired_messages()
+        return service.get_due_message_ids()
+
+    def run_job(self, db: Session, job_id: int):
+        self.dispatch(db, job_id)
+
+    def dispatch(self, db: Session, message_id: int) -> Optional[OutboxMessage]:
+        """Claim a due message and send it. Returns the message, or None if it was not due."""
+        service = OutboxService(db)
+        if not service.claim_message(message_id):
+            return None
+        message = service.get_message(message_id)
+        try:
+            url, headers, payload = self._request(message)
+        except ValueError as e:
+            logging.error(f"Outbox message {message_id} cannot be sent: {str(e)}")
+            return service.record_failure(message_id, str(e), retry=False)
+        # Hold no transaction while waiting on the network
+        db.commit()
+
+        try:
+            response = self.client.post(url, json=payload, headers=headers)
+        except httpx.HTTPError as e:
+            logging.warning(f"Outbox message {message_id} failed: {type(e).__name__}: {e}")
+            return service.record_failure(message_id, f"{type(e).__name__}: {e}")
+
+        if response.is_success:
+            return service.record_success(message_id, response.status_code)
+        logging.warning(f"Outbox message {message_id} was answered with {response.status_code}")
+        return service.record_failure(
+            message_id,
+            f"HTTP {response.status_code}: {response.text[:500]}",
+            response_code=response.status_code,
+            retry=response.status_code in RETRYABLE_STATUS_CODES or response.status_code >= 500,
+            retry_after=_retry_after(response)
+        )
+
+    def _request(self, message: OutboxMessage) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """URL, headers and body for a message. Credentials and URLs come from settings, not the stored message."""
+        if message.kind == BLAND_CALL:
+            if not self.bland_api_key or not self.bland_webhook_url:
+                raise ValueError("BLAND_API_KEY and BLAND_WEBHOOK_URL must be set to send bland.ai calls")
+            payload = {**message.payload, "webhook": self.bland_webhook_url}
+            return self.bland_api_url, {"Authorization": self.bland_api_key}, payload
+        raise ValueError(f"Unknown outbox message kind: {message.kind}")
+
+_outbox_dispatcher = OutboxDispatcher()
+
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """Get the process-wide outbox dispatcher."""
+    return _outbox_dispatcher
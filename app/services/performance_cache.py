@@ -0,0 +1,114 @@
+from typing import Any, Dict, Hashable, Optional
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.cache import LRUCache
+from app.config import get_settings
+from app.schemas import AgentPerformance
+
+# Session.info key of the agents whose performance the open transaction changes
+_CHANGED_AGENTS = "performance_cache.changed_agents"
+
+class PerformanceCache:
+    """In-process cache of `AgentService.calculate_performance` results, keyed by agent and window.
+
+    Writes that change an agent's numbers mark the agent on their session
+    (`mark_agent_changed`), and its entries are dropped when that session
+    commits. Each agent has a generation that is part of the key, so a
+    result computed while a write was committing is stored under the old
+    generation and never served. Writes by other processes are only seen
+    once entries reach `max_staleness_seconds`.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        max_staleness_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        settings = get_settings()
+        self.enabled = settings.performance_cache_enabled if enabled is None else enabled
+        self.max_staleness_seconds = max_staleness_seconds if max_staleness_seconds is not None \
+            else settings.performance_cache_max_staleness_seconds
+        self.memory = LRUCache(
+            max_size=max_size if max_size is not None else settings.performance_cache_size,
+            ttl_seconds=self.max_staleness_seconds
+        )
+        self._lock = threading.Lock()
+        self._generations: Dict[int, int] = {}
+        self.invalidations = 0
+
+    def key(self, agent_id: int, days: int) -> Hashable:
+        """The key to look a result up and store it under. Take it before reading the database."""
+        with self._lock:
+            return agent_id, days, self._generations.get(agent_id, 0)
+
+    def get(self, key: Hashable) -> Optional[AgentPerformance]:
+        """Get a copy of a cached result, or None on a miss."""
+        if not self.enabled:
+            return None
+        result = self.memory.get(key)
+        return result.model_copy(deep=True) if result is not None else None
+
+    def put(self, key: Hashable, result: AgentPerformance):
+        """Store a result."""
+        if self.enabled:
+            self.memory.set(key, result.model_copy(deep=True))
+
+    def invalidate(self, agent_id: int):
+        """Stop serving an agent's cached results. Old entries age out of the LRU."""
+        with self._lock:
+            self._generations[agent_id] = self._generations.get(agent_id, 0) + 1
+            self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self.memory.clear()
+            self._generations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for sizing the cache."""
+        memory = self.memory.stats()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": memory["size"],
+                "max_size": memory["max_size"],
+                "max_staleness_seconds": self.max_staleness_seconds,
+                "hits": memory["hits"],
+                "misses": memory["misses"],
+                "evictions": memory["evictions"],
+                "invalidations": self.invalidations,
+                "hit_rate": memory["hit_rate"]
+            }
+
+_performance_cache: Optional[PerformanceCache] = None
+_performance_cache_lock = threading.Lock()
+
+def get_performance_cache() -> PerformanceCache:
+    """Get the process-wide agent performance cache."""
+    global _performance_cache
+    if _performance_cache is None:
+        with _performance_cache_lock:
+            if _performance_cache is None:
+                _performance_cache = PerformanceCache()
+    return _performance_cache
+
+def mark_agent_changed(db: Session, agent_id: int):
+    """Invalidate an agent's cached performance once the session's transaction commits."""
+    db.info.setdefault(_CHANGED_AGENTS, set()).add(agent_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_agents(session):
+    agent_ids = session.info.pop(_CHANGED_AGENTS, None)
+    if agent_ids:
+        cache = get_performance_cache()
+        for agent_id in agent_ids:
+            cache.invalidate(agent_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_agents(session, previous_transaction):
+    # A savepoint rolling back leaves the outer transaction's changes to commit
+    if previous_transaction.parent is None:
+        session.info.pop(_CHANGED_AGENTS, None)
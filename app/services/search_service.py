@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import List, Optional
+import re
+from fastapi import HTTPException
+from sqlalchemy import Float, Integer, column, func, literal_column, table
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.models import Call
+from app.search_index import FTS_TABLE
+from app.services.call_service import CALL_SUMMARY_COLUMNS
+
+# A quoted phrase (optionally followed by * for a prefix) or a bare word
+_TERM = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+SNIPPET_TOKENS = 12
+
+def build_match_query(q: str) -> str:
+    """Translate a search box query into an FTS5 MATCH expression.
+
+    Words and "quoted phrases" must all match, `word*` matches a prefix and
+    a bare `OR` between terms matches either. Every term is quoted, so
+    punctuation such as the hyphen in trade-in is never read as FTS5 syntax.
+    """
+    terms = []
+    for phrase, phrase_prefix, word in _TERM.findall(q):
+        if word == "OR":
+            if terms and terms[-1] != "OR":
+                terms.append("OR")
+            continue
+        if word:
+            phrase, phrase_prefix = word.rstrip("*").replace('"', " "), "*" if word.endswith("*") else ""
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"' + phrase_prefix)
+    if terms and terms[-1] == "OR":
+        terms.pop()
+    return " ".join(terms)
+
+class SearchService:
+    """Service for full-text search over call transcripts."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search_calls(
+        self,
+        q: str,
+        agent_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[dict]:
+        """Find calls whose transcript matches `q`, best match (lowest bm25 rank) first.
+
+        Each result has the call summary fields, a `snippet` of the transcript
+        with matches wrapped in <mark> tags and the `rank`.
+        """
+        if self.db.get_bind().dialect.name != "sqlite":
+            raise HTTPException(status_code=501, detail="Transcript search needs SQLite FTS5")
+        match = build_match_query(q)
+        if not match:
+            raise HTTPException(status_code=400, detail="Search query is empty")
+
+        fts = table(FTS_TABLE, column("rowid", Integer), column("rank", Float))
+        fts_column = literal_column(FTS_TABLE)
+        query = self.db.query(
+            *CALL_SUMMARY_COLUMNS,
+            func.snippet(fts_column, 0, "<mark>", "</mark>", "…", SNIPPET_TOKENS).label("snippet"),
+            fts.c.rank.label("rank")
+        ).select_from(fts).join(Call, Call.id == fts.c.rowid).filter(fts_column.op("MATCH")(match))
+        if agent_id is not None:
+            query = query.filter(Call.agent_id == agent_id)
+        if start_date:
+            query = query.filter(Call.call_date >= start_date)
+        if end_date:
+            query = query.filter(Call.call_date < end_date)
+
+        try:
+            rows = query.order_by(fts.c.rank, Call.id).offset(offset).limit(limit).all()
+        except OperationalError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid search query: {e.orig}")
+        return [row._asdict() for row in rows]
@@ -0,0 +1,185 @@
+from typing import Any, AsyncIterator, Dict, Optional
+import json
+import re
+import threading
+from app.config import get_settings
+from app.services.ai_service import get_shared_ai_service
+from app.services.analysis_cache import analysis_namespace
+
+# Weighted keywords per call type. Scores are the summed weights of all
+# keyword occurrences in a transcript.
+CALL_TYPE_KEYWORDS = {
+    "service": {
+        "annual service": 2.0, "oil change": 2.0, "maintenance": 1.5, "service": 1.0,
+        "appointment": 1.0, "book you in": 1.0, "brake": 1.0, "pickup": 0.5
+    },
+    "warranty": {"warranty": 2.0, "recall": 1.5, "vin": 1.0, "covered": 1.0, "claim": 0.5},
+    "roadside": {
+        "roadside": 2.0, "flat tire": 2.0, "flat tyre": 2.0, "breakdown": 2.0,
+        "tow": 1.5, "battery": 1.0
+    },
+    "accessories": {
+        "accessories": 2.0, "accessory": 2.0, "floor mats": 1.5, "roof rack": 1.5, "all-weather": 1.0
+    },
+    "sales": {
+        "test drive": 2.0, "test_drive": 2.0, "financing": 2.0, "trade-in": 2.0, "trade in": 2.0,
+        "interested in": 1.5, "finance": 1.5, "lease": 1.5, "price": 1.5, "negotiation": 1.5,
+        "buy": 1.5, "purchase": 1.5, "showroom": 1.0, "brochure": 1.0, "advertisement": 1.0,
+        "offer": 1.0, "new": 0.5
+    }
+}
+
+# Call types the local tier may analyse on its own; anything else is a
+# potential sale and goes to the model.
+ROUTINE_ANALYSIS = {
+    "service": {
+        "agent_performance_score": 85.0,
+        "customer_interest_score": 40.0,
+        "customer_description": "Service booking",
+        "customer_preferences": "service, maintenance",
+        "test_drive_readiness": 20.0,
+        "agent_issues": "No issues"
+    },
+    "warranty": {
+        "agent_performance_score": 84.0,
+        "customer_interest_score": 35.0,
+        "customer_description": "Warranty question",
+        "customer_preferences": "warranty, service",
+        "test_drive_readiness": 15.0,
+        "agent_issues": "No issues"
+    },
+    "roadside": {
+        "agent_performance_score": 82.0,
+        "customer_interest_score": 20.0,
+        "customer_description": "Roadside assistance",
+        "customer_preferences": "roadside assistance",
+        "test_drive_readiness": 5.0,
+        "agent_issues": "No issues"
+    },
+    "accessories": {
+        "agent_performance_score": 85.0,
+        "customer_interest_score": 55.0,
+        "customer_description": "Accessories inquiry",
+        "customer_preferences": "accessories",
+        "test_drive_readiness": 25.0,
+        "agent_issues": "No issues"
+    }
+}
+
+class CallTypeClassifier:
+    """Rules-based call type classifier.
+
+    All keywords are compiled into one alternation (longest first) and
+    counted in a single pass. Confidence is the winning type's share of the
+    total score, smoothed by `prior` so a lone weak keyword is not trusted.
+    """
+
+    def __init__(self, keywords: Dict[str, Dict[str, float]] = None, prior: float = 1.0):
+        self.keywords = keywords or CALL_TYPE_KEYWORDS
+        self.prior = prior
+        entries = sorted(
+            ((keyword, call_type, weight) for call_type, words in self.keywords.items() for keyword, weight in words.items()),
+            key=lambda entry: len(entry[0]),
+            reverse=True
+        )
+        self._entries = [(call_type, weight) for _, call_type, weight in entries]
+        alternatives = "|".join(f"(?P<k{i}>{re.escape(keyword)})" for i, (keyword, _, _) in enumerate(entries))
+        self._matcher = re.compile(rf"\b(?:{alternatives})\b", re.IGNORECASE)
+
+    def score(self, transcript: str) -> Dict[str, float]:
+        """Get the keyword score of each call type."""
+        scores = dict.fromkeys(self.keywords, 0.0)
+        for match in self._matcher.finditer(transcript):
+            call_type, weight = self._entries[int(match.lastgroup[1:])]
+            scores[call_type] += weight
+        return scores
+
+    def classify(self, transcript: str) -> Dict[str, Any]:
+        """Get the most likely call type and the confidence in it."""
+        scores = self.score(transcript)
+        call_type, best = max(scores.items(), key=lambda item: item[1])
+        if best == 0:
+            return {"call_type": "general", "confidence": 0.0}
+        return {"call_type": call_type, "confidence": round(best / (sum(scores.values()) + self.prior), 3)}
+
+class TieredAIService:
+    """Analyse routine calls locally and send the rest to the model.
+
+    Calls classified as a routine type with at least `confidence_threshold`
+    confidence get baseline scores without a model request. Likely sales and
+    uncertain calls are analysed by `llm_service`. Either way the routing
+    decision is stored under `analysis_results["routing"]`.
+    """
+
+    def __init__(
+        self,
+        llm_service=None,
+        classifier: Optional[CallTypeClassifier] = None,
+        confidence_threshold: Optional[float] = None
+    ):
+        self.llm_service = llm_service or get_shared_ai_service()
+        self.classifier = classifier or CallTypeClassifier()
+        self.confidence_threshold = (
+            confidence_threshold if confidence_threshold is not None
+            else get_settings().tiered_confidence_threshold
+        )
+
+    @property
+    def cache_namespace(self) -> str:
+        return f"tiered-v1:{self.confidence_threshold}:{analysis_namespace(self.llm_service)}"
+
+    def route(self, transcript: str) -> Dict[str, Any]:
+        """Decide which tier analyses a transcript."""
+        decision = self.classifier.classify(transcript)
+        local = decision["call_type"] in ROUTINE_ANALYSIS and decision["confidence"] >= self.confidence_threshold
+        return {"tier": "local" if local else "llm", **decision}
+
+    def analyze_call(self, transcript: str) -> Dict[str, Any]:
+        """Analyze a call transcript in the cheapest tier that can handle it."""
+        if not transcript or not transcript.strip():
+            raise ValueError("Transcript cannot be empty")
+        routing = self.route(transcript)
+        if routing["tier"] == "local":
+            return self._local_analysis(routing)
+        return self._with_routing(self.llm_service.analyze_call(transcript), routing)
+
+    async def stream_analysis(self, transcript: str) -> AsyncIterator[str]:
+        """Stream the analysis. Locally analysed calls arrive as one piece."""
+        routing = self.route(transcript)
+        if routing["tier"] == "local":
+            yield json.dumps(self._local_analysis(routing))
+            return
+        async for text in self.llm_service.stream_analysis(transcript):
+            yield text
+
+    def parse_analysis(self, response_text: str) -> Dict[str, Any]:
+        """Parse streamed output from either tier."""
+        try:
+            analysis = json.loads(response_text)
+            if analysis["analysis_results"]["routing"]["tier"] == "local":
+                return analysis
+        except (ValueError, KeyError, TypeError):
+            pass
+        return self._with_routing(self.llm_service.parse_analysis(response_text), {"tier": "llm"})
+
+    def _local_analysis(self, routing: Dict[str, Any]) -> Dict[str, Any]:
+        return {**ROUTINE_ANALYSIS[routing["call_type"]], "analysis_results": {"routing": routing}}
+
+    def _with_routing(self, analysis: Dict[str, Any], routing: Dict[str, Any]) -> Dict[str, Any]:
+        results = analysis.get("analysis_results")
+        results = dict(results) if isinstance(results, dict) else {}
+        results["routing"] = routing
+        return {**analysis, "analysis_results": results}
+
+_analysis_service = None
+_analysis_service_lock = threading.Lock()
+
+def get_analysis_service():
+    """Get the process-wide analysis service: the shared AI service, tiered if enabled."""
+    global _analysis_service
+    if _analysis_service is None:
+        with _analysis_service_lock:
+            if _analysis_service is None:
+                shared = get_shared_ai_service()
+                _analysis_service = TieredAIService(shared) if get_settings().tiered_analysis_enabled else shared
+    return _analysis_service
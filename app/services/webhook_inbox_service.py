@@ -0,0 +1,236 @@
+from datetime import datetime, UTC, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models import InboxStatus, Inquiry, WebhookInboxItem
+from app.schemas import InquiryUpdate
+from app.services.ai_service import AIService
+from app.services.call_service import CallService
+from app.services.inquiry_service import InquiryService
+from app.services.tiered_ai_service import get_analysis_service
+from app.services.worker_pool import WorkerPool
+
+def webhook_dedupe_key(payload: Dict[str, Any]) -> str:
+    """Identify a webhook delivery by bland.ai's call ID, or by a hash of the payload without one."""
+    if payload.get("call_id"):
+        return f"call:{payload['call_id']}"
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class WebhookInboxService:
+    """Service for the inbox of inquiry webhooks.
+
+    Webhooks are stored as delivered and acknowledged straight away. A worker
+    later applies each one with the same rules as `InquiryService.update_inquiry`.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        ai_service: AIService = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None
+    ):
+        settings = get_settings()
+        self.db = db
+        self.ai_service = ai_service or get_analysis_service()
+        self.max_attempts = max_attempts or settings.webhook_max_attempts
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None \
+            else settings.webhook_retry_base_seconds
+        self.retry_max_seconds = settings.webhook_retry_max_seconds
+        self.lease_seconds = settings.webhook_lease_seconds
+
+    def receive(self, inquiry_update: InquiryUpdate) -> Tuple[WebhookInboxItem, bool]:
+        """Store a webhook unless it was already received. Returns the item and whether it is new."""
+        inquiry_id = inquiry_update.metadata.inquiry_id
+        if not self.db.get(Inquiry, inquiry_id):
+            raise HTTPException(status_code=404, detail="Inquiry not found")
+
+        payload = inquiry_update.model_dump(mode="json")
+        dedupe_key = webhook_dedupe_key(payload)
+        item = WebhookInboxItem(
+            dedupe_key=dedupe_key,
+            inquiry_id=inquiry_id,
+            payload=payload,
+            status=InboxStatus.PENDING,
+            attempts=0
+        )
+        self.db.add(item)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Redelivered, possibly concurrently: the unique key keeps one copy
+            self.db.rollback()
+            existing = self.db.query(WebhookInboxItem).filter(WebhookInboxItem.dedupe_key == dedupe_key).first()
+            if existing is None:
+                raise
+            return existing, False
+        return item, True
+
+    def get_item(self, item_id: int) -> Optional[WebhookInboxItem]:
+        """Get a stored webhook."""
+        return self.db.query(WebhookInboxItem).filter(WebhookInboxItem.id == item_id).first()
+
+    def get_items(self, status: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[WebhookInboxItem]:
+        """Get stored webhooks, oldest first, optionally only those with a status."""
+        query = self.db.query(WebhookInboxItem)
+        if status:
+            query = query.filter(WebhookInboxItem.status == status)
+        return query.order_by(WebhookInboxItem.id).offset(skip).limit(limit).all()
+
+    def get_due_item_ids(self, limit: int = 1000) -> List[int]:
+        """Get the IDs of pending webhooks whose next attempt is due, longest waiting first."""
+        rows = self.db.query(WebhookInboxItem.id)\
+            .filter(WebhookInboxItem.status == InboxStatus.PENDING, WebhookInboxItem.next_attempt_at <= datetime.now(UTC))\
+            .order_by(WebhookInboxItem.next_attempt_at)\
+            .limit(limit)\
+            .all()
+        return [row.id for row in rows]
+
+    def requeue_expired_items(self) -> int:
+        """Put webhooks whose lease has expired while processing back in the queue.
+
+        A webhook is leased to the worker that claims it for `webhook_lease_seconds`,
+        so webhooks held by workers in other running processes are left alone.
+        """
+        expired = datetime.now(UTC) - timedelta(seconds=self.lease_seconds)
+        count = self.db.query(WebhookInboxItem)\
+            .filter(
+                WebhookInboxItem.status == InboxStatus.PROCESSING,
+                or_(WebhookInboxItem.locked_at.is_(None), WebhookInboxItem.locked_at <= expired)
+            )\
+            .update({WebhookInboxItem.status: InboxStatus.PENDING}, synchronize_session=False)
+        self.db.commit()
+        return count
+
+    def replay_item(self, item_id: int) -> WebhookInboxItem:
+        """Queue a failed webhook again, with a fresh set of attempts."""
+        item = self.get_item(item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Webhook not found")
+        if item.status != InboxStatus.FAILED:
+            raise HTTPException(status_code=409, detail=f"Only failed webhooks can be replayed, this one is {item.status}")
+        item.status = InboxStatus.PENDING
+        item.attempts = 0
+        item.error = None
+        item.next_attempt_at = datetime.now(UTC)
+        self.db.commit()
+        self.db.refresh(item)
+        return item
+
+    def claim_item(self, item_id: int) -> bool:
+        """Mark a due webhook as processing and lease it. Returns False if it is not due or another worker got it first."""
+        now = datetime.now(UTC)
+        claimed = self.db.query(WebhookInboxItem)\
+            .filter(
+                WebhookInboxItem.id == item_id,
+                WebhookInboxItem.status == InboxStatus.PENDING,
+                WebhookInboxItem.next_attempt_at <= now
+            )\
+            .update({
+                WebhookInboxItem.status: InboxStatus.PROCESSING,
+                WebhookInboxItem.attempts: WebhookInboxItem.attempts + 1,
+                WebhookInboxItem.locked_at: now,
+                WebhookInboxItem.updated_at: now
+            }, synchronize_session=False)
+        self.db.commit()
+        return claimed == 1
+
+    def process_item(self, item_id: int) -> Optional[WebhookInboxItem]:
+        """Claim a webhook and apply it to its inquiry.
+
+        The transcript is analysed with no transaction open. The inquiry
+        update, the call and the item's COMPLETED status then commit together,
+        so a webhook takes effect exactly once. Webhooks that can never apply
+        (unknown inquiry, invalid transcript) fail at once, others are retried
+        until they run out of attempts. Returns the item, or None if it was
+        not pending.
+        """
+        if not self.claim_item(item_id):
+            return None
+
+        inquiry_service = InquiryService(self.db, self.ai_service)
+        try:
+            item = self.get_item(item_id)
+            inquiry_update = InquiryUpdate.model_validate(item.payload)
+            db_inquiry = self.db.get(Inquiry, item.inquiry_id)
+            if not db_inquiry:
+                raise HTTPException(status_code=404, detail="Inquiry not found")
+            call_data = inquiry_service.build_call(db_inquiry, inquiry_update)
+            analysis = self._analyze(inquiry_service.call_service, call_data.transcript) if call_data else None
+
+            inquiry_service.apply_update(db_inquiry, inquiry_update, analysis=analysis)
+            item.status = InboxStatus.COMPLETED
+            item.error = None
+            self.db.commit()
+            self.db.refresh(item)
+            return item
+        except HTTPException as e:
+            self.db.rollback()
+            logging.warning(f"Webhook {item_id} failed: {e.detail}")
+            return self._fail_item(item_id, str(e.detail), retry=e.status_code >= 500)
+        except Exception as e:
+            self.db.rollback()
+            logging.warning(f"Webhook {item_id} failed: {str(e)}")
+            return self._fail_item(item_id, str(e))
+
+    def _analyze(self, call_service: CallService, transcript: str) -> dict:
+        """Get the analysis of a transcript from the cache or the AI service, committing before the model runs."""
+        analysis = call_service.get_cached_analysis(transcript)
+        self.db.commit()
+        return analysis if analysis is not None else call_service.run_analysis(transcript)
+
+    def _fail_item(self, item_id: int, error: str, retry: bool = True) -> WebhookInboxItem:
+        """Record a failed attempt, scheduling a retry with exponential backoff until attempts run out."""
+        item = self.get_item(item_id)
+        if retry and item.attempts < self.max_attempts:
+            delay = min(self.retry_base_seconds * 2 ** (item.attempts - 1), self.retry_max_seconds)
+            item.status = InboxStatus.PENDING
+            item.next_attempt_at = datetime.now(UTC) + timedelta(seconds=delay)
+        else:
+            item.status = InboxStatus.FAILED
+        item.error = error
+        self.db.commit()
+        self.db.refresh(item)
+        return item
+
+class WebhookInboxWorkerPool(WorkerPool):
+    """Bounded pool of background threads that process stored webhooks."""
+
+    name = "webhook"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = None,
+        ai_service_factory: Callable[[], AIService] = None,
+        max_workers: Optional[int] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        settings = get_settings()
+        super().__init__(
+            session_factory, max_workers or settings.webhook_worker_count, poll_seconds or settings.webhook_poll_seconds
+        )
+        self.ai_service_factory = ai_service_factory or get_analysis_service
+
+    def resume_job_ids(self, db: Session) -> List[int]:
+        return self.due_job_ids(db)
+
+    def due_job_ids(self, db: Session) -> List[int]:
+        service = WebhookInboxService(db, self.ai_service_factory())
+        service.requeue_expired_items()
+        return service.get_due_item_ids()
+
+    def run_job(self, db: Session, job_id: int):
+        WebhookInboxService(db, self.ai_service_factory()).process_item(job_id)
+
+_webhook_inbox_worker_pool = WebhookInboxWorkerPool()
+
+def get_webhook_inbox_worker_pool() -> WebhookInboxWorkerPool:
+    """Get the process-wide webhook inbox worker pool."""
+    return _webhook_inbox_worker_pool
@@ -0,0 +1,106 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+import logging
+import threading
+from sqlalchemy.orm import Session
+from app import database
+
+class WorkerPool(ABC):
+    """Bounded pool of background threads that process jobs stored in the database.
+
+    Subclasses say which jobs to resume on start, which are due and how to
+    run one. Each job runs with its own session. New jobs are submitted when
+    they commit; a poller picks up retries when their backoff has passed and
+    jobs written by other processes.
+    """
+
+    name = "worker"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = None,
+        max_workers: int = 1,
+        poll_seconds: Optional[float] = None
+    ):
+        self.session_factory = session_factory or (lambda: database.SessionLocal())
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stop_polling: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> int:
+        """Start the workers and the poller, and resume any jobs stored in the database. Returns the number resumed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            if self.poll_seconds and self._stop_polling is None:
+                self._stop_polling = threading.Event()
+                threading.Thread(
+                    target=self._poll, args=(self._stop_polling,), name=f"{self.name}-poller", daemon=True
+                ).start()
+        db = self.session_factory()
+        try:
+            job_ids = self.resume_job_ids(db)
+        finally:
+            db.close()
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def submit(self, job_id: int) -> bool:
+        """Queue a job for processing. Jobs submitted while stopped stay pending in the database."""
+        with self._lock:
+            if self._executor is None:
+                return False
+            self._executor.submit(self._run, job_id)
+            return True
+
+    def shutdown(self, wait: bool = True):
+        """Stop the poller and the workers. Jobs not yet run stay pending and are resumed on the next start."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            stop, self._stop_polling = self._stop_polling, None
+        if stop is not None:
+            stop.set()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    @abstractmethod
+    def resume_job_ids(self, db: Session) -> List[int]:
+        """Requeue jobs whose worker was lost, such as by a crash or a restart, and return the IDs of the jobs that are due."""
+
+    @abstractmethod
+    def due_job_ids(self, db: Session) -> List[int]:
+        """Get the IDs of pending jobs whose next attempt is due."""
+
+    @abstractmethod
+    def run_job(self, db: Session, job_id: int):
+        """Run one job. A job left pending for a retry is picked up by the poller once it is due."""
+
+    def _run(self, job_id: int):
+        db = self.session_factory()
+        try:
+            self.run_job(db, job_id)
+        except Exception as e:
+            logging.error(f"{self.name.capitalize()} worker crashed on job {job_id}: {str(e)}")
+        finally:
+            db.close()
+
+    def _poll(self, stop: threading.Event):
+        while not stop.wait(self.poll_seconds):
+            db = self.session_factory()
+            try:
+                job_ids = self.due_job_ids(db)
+            except Exception as e:
+                logging.error(f"{self.name.capitalize()} poll failed: {str(e)}")
+                job_ids = []
+            finally:
+                db.close()
+            for job_id in job_ids:
+                self.submit(job_id)
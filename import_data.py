@@ -0,0 +1,44 @@
+import argparse
+import sys
+from fastapi import HTTPException
+from app.database import SessionLocal
+from app.services.import_service import IMPORT_KINDS, ImportService, detect_format, read_rows
+
+def import_file(kind, path, job_id=None, fmt=None, batch_size=None):
+    """Import a CSV or NDJSON file, or resume the import job `job_id` with it."""
+    db = SessionLocal()
+    try:
+        service = ImportService(db, batch_size)
+        fmt = fmt or detect_format(path)
+        job = service.resume_job(job_id, kind) if job_id else service.start_job(kind, path)
+        print(f"Import job {job.id}: importing {kind} from {path}")
+
+        def report(job):
+            print(f"  {job.rows_processed} rows read, {job.inserted} inserted, {job.rejected} rejected")
+
+        with open(path, "rb") as stream:
+            job = service.run(job, read_rows(stream, fmt), progress=report)
+
+        for reject in service.get_rejects(job.id, limit=20):
+            print(f"  row {reject.row}: {reject.error}", file=sys.stderr)
+        if job.rejected > 20:
+            print(f"  ... and {job.rejected - 20} more, see /imports/{job.id}/rejects", file=sys.stderr)
+        if service.analysis_job_ids:
+            print(f"{len(service.analysis_job_ids)} calls queued for analysis when the app next starts")
+        print(f"Import job {job.id} completed: {job.inserted} inserted, {job.rejected} rejected")
+        return job
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import agents, customers or historical calls.")
+    parser.add_argument("kind", choices=sorted(IMPORT_KINDS))
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--resume", type=int, metavar="JOB_ID", help="continue an interrupted import")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="file format (default: from the file name)")
+    parser.add_argument("--batch-size", type=int, help="rows per transaction")
+    args = parser.parse_args()
+    try:
+        import_file(args.kind, args.path, args.resume, args.format, args.batch_size)
+    except HTTPException as e:
+        sys.exit(f"Import failed: {e.detail}")
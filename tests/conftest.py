@@ -1,8 +1,10 @@
 import os
 import sys
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 # Set testing environment and add app directory to path
@@ -11,31 +13,55 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 TEST_DB_URL = "sqlite:///./test.db"
 
+def _remove_test_db():
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"./test.db{suffix}"):
+            os.remove(f"./test.db{suffix}")
+
 @pytest.fixture(scope="session")
 def db_engine():
     """Session-wide test database engine."""
-    if os.path.exists("./test.db"):
-        os.remove("./test.db")
-    engine = create_engine(
-        TEST_DB_URL,
-        connect_args={"check_same_thread": False},
-    )
+    _remove_test_db()
     import app.database as app_db
+    engine = app_db.create_db_engine(TEST_DB_URL)
     app_db.engine = engine
     app_db.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Each TestClient runs its own event loop, so async connections aren't pooled across tests
+    async_engine = app_db.create_async_db_engine(TEST_DB_URL, poolclass=NullPool)
+    app_db.async_engine = async_engine
+    app_db.AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
     from app.models import Base
     Base.metadata.create_all(bind=engine)
     yield engine
     engine.dispose()
-    if os.path.exists("./test.db"):
-        os.remove("./test.db")
+    _remove_test_db()
+
+@pytest.fixture(scope="function")
+def async_db_engine(db_engine):
+    """Sync facade of the async test engine, for event listeners on the async endpoints' queries."""
+    import app.database as app_db
+    return app_db.async_engine.sync_engine
+
+def _clear_tables(engine):
+    from app.models import Base
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        connection.execute(text("DELETE FROM calls_fts"))
+    # Row IDs are reused once the tables are empty, and cached analyses would outlive their rows
+    from app.services.analysis_cache import get_analysis_cache
+    from app.services.performance_cache import get_performance_cache
+    get_analysis_cache().clear()
+    get_performance_cache().clear()
 
 @pytest.fixture(scope="function")
 def db_session(db_engine):
-    """Creates a new database session for a test."""
-    connection = db_engine.connect()
-    transaction = connection.begin()
-    Session = sessionmaker(bind=connection)
+    """Creates a new database session for a test.
+
+    The session commits for real, so the async endpoints see its data on
+    their own connections. Every table is emptied after the test.
+    """
+    Session = sessionmaker(bind=db_engine)
     db = Session()
     # Ensure default AI agent exists in this session
     from app.database import get_default_ai_agent_id
@@ -44,9 +70,7 @@ def db_session(db_engine):
         yield db
     finally:
         db.close()
-        if transaction.is_active:
-            transaction.rollback()
-        connection.close()
+        _clear_tables(db_engine)
 
 @pytest.fixture(scope="function")
 def client(db_session):
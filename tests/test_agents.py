@@ -1,5 +1,10 @@
 import pytest
+from datetime import date, datetime, timedelta, UTC
 from fastapi import status
+from sqlalchemy import null
+from app.models import Agent, AgentDailyStats, Call, Customer
+from app.services.agent_stats_service import AgentStatsService
+from app.services.issue_service import IssueService
 
 def test_create_agent(client):
     agent_data = {
@@ -103,4 +108,72 @@ def test_update_agent(client):
     assert data["email"] == update_data["email"]
     assert data["phone_number"] == update_data["phone_number"]
     assert data["specialization"] == update_data["specialization"]
-    assert data["is_active"] == update_data["is_active"] 
\ No newline at end of file
+    assert data["is_active"] == update_data["is_active"] 
+
+
+def test_agent_performance_aggregates_recent_calls(client, db_session):
+
+    customer = Customer(name="Perf Customer", email="perf.customer@example.com", phone_number="+971501130001")
+    agent = Agent(name="Perf Agent", employee_id="PERF001", email="perf.agent@example.com",
+                  phone_number="+971501130002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.flush()
+    now = datetime.now(UTC)
+    calls = [
+        Call(customer_id=customer.id, agent_id=agent.id, transcript="a", call_date=now,
+             agent_performance_score=80.0, customer_interest_score=60.0, test_drive_readiness=40.0,
+             agent_issues="Late, Rushed"),
+        Call(customer_id=customer.id, agent_id=agent.id, transcript="b", call_date=now,
+             agent_performance_score=null(), customer_interest_score=90.0, test_drive_readiness=null(),
+             agent_issues="Rushed"),
+        # Outside the 30 day window
+        Call(customer_id=customer.id, agent_id=agent.id, transcript="c", call_date=now - timedelta(days=45),
+             agent_performance_score=0.0, customer_interest_score=0.0, test_drive_readiness=0.0,
+             agent_issues="Rude")
+    ]
+    for call in calls:
+        call.issues = IssueService(db_session).build_issues(call.agent_id, call.call_date, call.agent_issues)
+    db_session.add_all(calls)
+    db_session.flush()
+    AgentStatsService(db_session).record_calls(calls)
+    db_session.commit()
+
+    response = client.get(f"/agents/{agent.id}/performance")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total_calls_handled"] == 2
+    assert data["average_performance_score"] == 80.0
+    assert data["average_customer_interest"] == 75.0
+    assert data["average_test_drive_readiness"] == 40.0
+    assert data["agent_issues"] == ["late", "rushed"]
+    assert data["specialization"] == ""
+
+def test_agent_metrics_follow_daily_rollup(client, db_session):
+    customer = Customer(name="Rollup Customer", email="rollup.customer@example.com", phone_number="+971501130003")
+    agent = Agent(name="Rollup Agent", employee_id="ROLL001", email="rollup.agent@example.com",
+                  phone_number="+971501130004", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+
+    today = datetime.now(UTC).replace(microsecond=0)
+    for days_ago, transcript in [(0, "Interested in an AMG"), (0, "Booking a service"), (40, "AMG please")]:
+        response = client.post("/calls/", json={
+            "customer_id": customer.id,
+            "agent_id": agent.id,
+            "transcript": transcript,
+            "call_date": (today - timedelta(days=days_ago)).isoformat()
+        })
+        assert response.status_code == 200
+
+    rows = db_session.query(AgentDailyStats).filter(AgentDailyStats.agent_id == agent.id).order_by(AgentDailyStats.day).all()
+    assert [(row.day, row.call_count) for row in rows] == [((today - timedelta(days=40)).date(), 1), (today.date(), 2)]
+    assert rows[1].performance_sum == 96.0 + 87.0
+
+    db_session.expire_all()
+    agent = db_session.get(Agent, agent.id)
+    assert agent.total_calls_handled == 3
+    assert agent.average_performance_score == (96.0 + 87.0) / 2
+
+    data = client.get(f"/agents/{agent.id}/performance").json()
+    assert data["total_calls_handled"] == 2
+    assert data["average_performance_score"] == (96.0 + 87.0) / 2
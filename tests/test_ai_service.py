@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+import google.generativeai as genai
+from fastapi.testclient import TestClient
+from app import main
+from app.config import get_settings
+from app.services import ai_service as ai_module
+from app.services.ai_service import AIService, get_shared_ai_service
+from app.services.gemini_client import GeminiClient
+from app.services.tiered_ai_service import get_analysis_service
+
+def test_shared_ai_service_is_reused():
+    assert get_shared_ai_service() is get_shared_ai_service()
+
+def test_available_models_loaded_lazily_and_cached(monkeypatch):
+    calls = []
+
+    def fake_list_models():
+        calls.append(1)
+        return [SimpleNamespace(name="models/gemini-1.5-flash-latest")]
+
+    monkeypatch.setattr(genai, "list_models", fake_list_models)
+    service = AIService(models_refresh_seconds=3600)
+    assert calls == []
+
+    assert service.available_models() == ["models/gemini-1.5-flash-latest"]
+    service.available_models()
+    assert len(calls) == 1
+
+    service.available_models(force_refresh=True)
+    assert len(calls) == 2
+
+def test_available_models_refresh_interval(monkeypatch):
+    calls = []
+    monkeypatch.setattr(genai, "list_models", lambda: calls.append(1) or [])
+    service = AIService(models_refresh_seconds=0)
+    service.available_models()
+    service.available_models()
+    assert len(calls) == 2
+
+def test_warm_up_failure_is_not_fatal(monkeypatch):
+    def failing_list_models():
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(genai, "list_models", failing_list_models)
+    ai_module.warm_up_shared_ai_service(background=False)
+
+def test_app_dependency_returns_the_shared_service():
+    assert main.get_ai_service() is main.get_ai_service() is get_analysis_service()
+
+def test_app_startup_warms_up_the_shared_service(monkeypatch):
+    warm_ups = []
+    monkeypatch.setattr(get_settings(), "ai_warmup_on_startup", True)
+    monkeypatch.setattr(main, "warm_up_shared_ai_service", lambda: warm_ups.append(1))
+    with TestClient(main.app):
+        assert warm_ups == [1]
+
+def test_analyze_call_goes_through_the_gemini_client():
+    class FakeModel:
+        async def generate_content_async(self, prompt, **kwargs):
+            return SimpleNamespace(text='{"agent_performance": {"score": 70, "issues": ["late"]}, '
+                                        '"customer_analysis": {"interest_score": 80, "description": "Keen", '
+                                        '"preferences": "GLE"}, "test_drive": {"readiness_score": 60}}')
+
+    service = AIService()
+    service.client = GeminiClient(FakeModel(), requests_per_minute=0, tokens_per_minute=0)
+    analysis = service.analyze_call("Customer: I'd like a GLE")
+    assert analysis["agent_performance_score"] == 70.0
+    assert analysis["customer_description"] == "Keen"
+    assert service.client.stats()["requests"] == 1
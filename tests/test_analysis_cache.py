@@ -0,0 +1,89 @@
+from sqlalchemy import event
+from app.models import Agent, AnalysisCacheEntry, Customer
+from app.schemas import CallCreate
+from app.services.analysis_cache import AnalysisCache, analysis_cache_key
+from app.services.call_service import CallService
+from app.services.mock_ai_service import MockAIService
+
+class CountingAIService(MockAIService):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def analyze_call(self, transcript):
+        self.calls += 1
+        return super().analyze_call(transcript)
+
+def _create_customer_and_agent(db_session):
+    customer = Customer(name="Cache Customer", email="cache.customer@example.com", phone_number="+971501120001")
+    agent = Agent(name="Cache Agent", employee_id="CACHE001", email="cache.agent@example.com",
+                  phone_number="+971501120002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+    return customer, agent
+
+def test_cache_key_ignores_whitespace_and_case():
+    key = analysis_cache_key("Agent: Hello\n  Customer: I want an AMG", "mock:v1")
+    assert key == analysis_cache_key("agent: hello customer:   i want an amg ", "mock:v1")
+    assert key != analysis_cache_key("Agent: Hello Customer: I want an AMG", "gemini:other:prompt-v2")
+
+def test_repeated_transcript_is_served_from_cache(db_session):
+    customer, agent = _create_customer_and_agent(db_session)
+    ai_service = CountingAIService()
+    cache = AnalysisCache(memory_size=10, ttl_seconds=3600, max_entries=100, enabled=True)
+    service = CallService(db_session, ai_service, cache)
+
+    first = service.create_call(CallCreate(customer_id=customer.id, agent_id=agent.id, transcript="I love the AMG GT"))
+    second = service.create_call(CallCreate(customer_id=customer.id, agent_id=agent.id, transcript="  i LOVE the amg gt"))
+    assert ai_service.calls == 1
+    assert second.customer_description == first.customer_description
+    assert cache.stats()["memory_hits"] == 1
+
+    # A fresh process still finds the result in the database tier
+    cold_cache = AnalysisCache(memory_size=10, ttl_seconds=3600, max_entries=100, enabled=True)
+    CallService(db_session, ai_service, cold_cache).create_call(
+        CallCreate(customer_id=customer.id, agent_id=agent.id, transcript="I love the AMG GT"))
+    assert ai_service.calls == 1
+    assert cold_cache.stats()["persistent_hits"] == 1
+
+def test_expired_entries_are_missed_and_evicted(db_session):
+    cache = AnalysisCache(memory_size=10, ttl_seconds=-1, max_entries=100, enabled=True)
+    cache.put(db_session, "expired", {"agent_performance_score": 1.0})
+    cache.memory.clear()
+    assert cache.get(db_session, "expired") is None
+    assert cache.evict(db_session) == 1
+
+def test_persistent_tier_is_trimmed_to_max_entries(db_session):
+    cache = AnalysisCache(memory_size=10, ttl_seconds=3600, max_entries=2, enabled=True, eviction_interval=1000)
+    for i in range(5):
+        cache.put(db_session, f"key-{i}", {"agent_performance_score": float(i)})
+    db_session.flush()
+    assert cache.evict(db_session) == 3
+    assert db_session.query(AnalysisCacheEntry).count() == 2
+
+def test_cache_stats_endpoint(client):
+    response = client.get("/analysis/cache/stats")
+    assert response.status_code == 200
+    assert "hit_rate" in response.json()
+
+def test_concurrent_write_of_the_same_key_does_not_fail(db_session, db_engine):
+    cache = AnalysisCache(memory_size=10, ttl_seconds=3600, max_entries=100, enabled=True)
+    raced = []
+
+    def store_first(conn, cursor, statement, *args):
+        # Another request stores the same transcript's result just before this one writes
+        if statement.startswith("INSERT INTO analysis_cache") and not raced:
+            raced.append(statement)
+            with db_engine.begin() as other:
+                other.execute(AnalysisCacheEntry.__table__.insert().values(
+                    key="shared", result={"agent_performance_score": 1.0}))
+
+    event.listen(db_engine, "before_cursor_execute", store_first)
+    try:
+        cache.put(db_session, "shared", {"agent_performance_score": 2.0})
+        db_session.commit()
+    finally:
+        event.remove(db_engine, "before_cursor_execute", store_first)
+    assert raced
+    cache.memory.clear()
+    assert cache.get(db_session, "shared") == {"agent_performance_score": 2.0}
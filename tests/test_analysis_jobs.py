@@ -0,0 +1,134 @@
+import time
+import pytest
+from datetime import datetime, UTC, timedelta
+from fastapi import status
+from fastapi.testclient import TestClient
+from app.config import get_settings
+from app.main import app
+from app.models import Agent, AnalysisJob, AnalysisStatus, Customer
+from app.services.analysis_job_service import AnalysisJobService, get_analysis_worker_pool
+from app.services.mock_ai_service import MockAIService
+from app.services.worker_pool import WorkerPool
+
+def _create_customer_and_agent(db_session):
+    customer = Customer(name="Job Customer", email="job.customer@example.com", phone_number="+971501110001")
+    agent = Agent(name="Job Agent", employee_id="JOB001", email="job.agent@example.com",
+                  phone_number="+971501110002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+    return customer, agent
+
+class FailingAIService:
+    def analyze_call(self, transcript):
+        raise RuntimeError("quota exceeded")
+
+def test_async_call_returns_accepted_and_completes(client, db_session):
+    customer, agent = _create_customer_and_agent(db_session)
+    response = client.post("/calls/?async_analysis=true", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": "I'm interested in the E-Class model"
+    })
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    call_id = response.json()["id"]
+    assert response.json()["analysis_status"] == "pending"
+
+    pending = client.get(f"/calls/{call_id}/analysis").json()
+    assert pending["analysis_status"] == "pending"
+    assert pending["analysis_results"] is None
+
+    service = AnalysisJobService(db_session, MockAIService())
+    job_ids = service.get_due_job_ids()
+    assert len(job_ids) == 1
+    job = service.run_job(job_ids[0])
+    assert job.status == AnalysisStatus.COMPLETED
+
+    done = client.get(f"/calls/{call_id}/analysis").json()
+    assert done["analysis_status"] == "completed"
+    assert done["attempts"] == 1
+    call = client.get(f"/calls/{call_id}").json()
+    assert call["customer_description"] == "Very interested in E-Class"
+
+def test_failed_job_is_retried_then_marked_failed(client, db_session):
+    customer, agent = _create_customer_and_agent(db_session)
+    response = client.post("/calls/?async_analysis=true", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": "Hello"
+    })
+    call_id = response.json()["id"]
+
+    service = AnalysisJobService(db_session, FailingAIService(), max_attempts=2)
+    job_id = service.get_job_for_call(call_id).id
+    retried = service.run_job(job_id)
+    assert retried.status == AnalysisStatus.PENDING
+    # The retry waits for its backoff instead of running straight away
+    assert retried.next_attempt_at > datetime.now(UTC).replace(tzinfo=None)
+    assert service.get_due_job_ids() == []
+    assert service.run_job(job_id) is None
+
+    retried.next_attempt_at = datetime.now(UTC) - timedelta(seconds=1)
+    db_session.commit()
+    job = service.run_job(job_id)
+    assert job.status == AnalysisStatus.FAILED
+    assert "quota exceeded" in job.error
+    assert service.run_job(job_id) is None
+
+    data = client.get(f"/calls/{call_id}/analysis").json()
+    assert data["analysis_status"] == "failed"
+    assert data["attempts"] == 2
+
+def test_only_jobs_whose_lease_expired_are_requeued(client, db_session):
+    customer, agent = _create_customer_and_agent(db_session)
+    service = AnalysisJobService(db_session, MockAIService())
+    job_ids = []
+    for i in range(2):
+        call_id = client.post("/calls/?async_analysis=true", json={
+            "customer_id": customer.id,
+            "agent_id": agent.id,
+            "transcript": f"Lease {i}"
+        }).json()["id"]
+        job_ids.append(service.get_job_for_call(call_id).id)
+    assert all(service.claim_job(job_id) for job_id in job_ids)
+
+    # The first job's worker went away; the second is still held by a running process
+    lost = db_session.get(AnalysisJob, job_ids[0])
+    lost.locked_at = datetime.now(UTC) - timedelta(seconds=service.lease_seconds + 1)
+    db_session.commit()
+
+    assert service.requeue_expired_jobs() == 1
+    db_session.expire_all()
+    assert [db_session.get(AnalysisJob, job_id).status for job_id in job_ids] == [
+        AnalysisStatus.PENDING, AnalysisStatus.PROCESSING
+    ]
+    assert service.get_due_job_ids() == [job_ids[0]]
+
+def test_app_runs_queued_jobs_in_the_background(db_session, monkeypatch):
+    customer, agent = _create_customer_and_agent(db_session)
+    monkeypatch.setattr(get_settings(), "analysis_workers_enabled", True)
+    monkeypatch.setattr(get_analysis_worker_pool(), "ai_service_factory", MockAIService)
+
+    with TestClient(app) as client:
+        assert get_analysis_worker_pool().running
+        response = client.post("/calls/?async_analysis=true", json={
+            "customer_id": customer.id,
+            "agent_id": agent.id,
+            "transcript": "Background worker: I'm interested in the E-Class model"
+        })
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        call_id = response.json()["id"]
+
+        deadline = time.monotonic() + 5
+        while client.get(f"/calls/{call_id}/analysis").json()["analysis_status"] != "completed":
+            assert time.monotonic() < deadline, "analysis job did not complete"
+            time.sleep(0.05)
+        assert client.get(f"/calls/{call_id}").json()["customer_description"] == "Very interested in E-Class"
+    assert not get_analysis_worker_pool().running
+
+def test_worker_pool_must_implement_every_hook():
+    class IncompletePool(WorkerPool):
+        def due_job_ids(self, db):
+            return []
+
+    with pytest.raises(TypeError):
+        IncompletePool()
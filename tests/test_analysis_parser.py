@@ -0,0 +1,53 @@
+import pytest
+from app.services.analysis_parser import AnalysisParseError, extract_json, parse_analysis_text, to_call_analysis
+
+FENCED = """Here is the analysis:
+```json
+{
+    "agent_performance": {"score": 0.8, "issues": ["Talked over the customer", "No follow-up",]},
+    "customer_analysis": {"interest_score": 0.9, "description": "Wants a {family} SUV", "preferences": "GLE, 7 seats"},
+    "test_drive": {"readiness_score": 0.5,},
+}
+```
+Let me know if you need anything else."""
+
+def test_extract_json_skips_fences_and_text_and_drops_trailing_commas():
+    payload, repairs = extract_json(FENCED)
+    assert payload.startswith("{") and payload.endswith("}")
+    assert "trailing comma" in repairs
+    assert "surrounding text" in repairs
+
+def test_parse_rescales_fractional_scores_and_flattens():
+    analysis = to_call_analysis(parse_analysis_text(FENCED))
+    assert analysis["agent_performance_score"] == pytest.approx(80.0)
+    assert analysis["customer_interest_score"] == pytest.approx(90.0)
+    assert analysis["test_drive_readiness"] == pytest.approx(50.0)
+    assert analysis["agent_issues"] == "Talked over the customer, No follow-up"
+    assert analysis["customer_description"] == "Wants a {family} SUV"
+    assert analysis["analysis_results"]["agent_performance"]["score"] == pytest.approx(80.0)
+
+def test_parse_keeps_percentage_scores_and_coerces_types():
+    result = parse_analysis_text(
+        '{"agent_performance": {"score": "75%", "issues": "Late, Rushed"},'
+        ' "customer_analysis": {"interest_score": 1, "preferences": ["AMG", "Black"]},'
+        ' "test_drive": {"readiness_score": 40}}'
+    )
+    assert result.agent_performance.score == 75.0
+    assert result.agent_performance.issues == ["Late", "Rushed"]
+    assert result.customer_analysis.interest_score == 1.0
+    assert result.customer_analysis.preferences == "AMG, Black"
+    assert result.test_drive.readiness_score == 40.0
+
+def test_parse_fills_missing_sections_with_defaults():
+    result = parse_analysis_text('{"customer_analysis": {"description": "Browsing"}}')
+    assert result.agent_performance.score == 0.0
+    assert result.customer_analysis.description == "Browsing"
+
+@pytest.mark.parametrize("text", ["", "I could not analyse this call.", '{"agent_performance": {"score": 0.5', '{"a": [1}'])
+def test_parse_rejects_unusable_output(text):
+    with pytest.raises(AnalysisParseError):
+        parse_analysis_text(text)
+
+def test_parse_does_not_print(capsys):
+    parse_analysis_text(FENCED)
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,26 @@
+import pytest
+from app.database import async_database_url
+from app.models import Agent, Call, Customer
+
+def test_async_database_url_switches_driver():
+    assert async_database_url("sqlite:///./gargash.db") == "sqlite+aiosqlite:///./gargash.db"
+    assert async_database_url("postgresql://u:p@db/gargash") == "postgresql+asyncpg://u:p@db/gargash"
+    assert async_database_url("sqlite+aiosqlite:///./gargash.db") == "sqlite+aiosqlite:///./gargash.db"
+    with pytest.raises(ValueError):
+        async_database_url("oracle://db/gargash")
+
+def test_call_reads_use_async_session(client, db_session):
+    customer = Customer(name="Async Reader", email="async.reader@example.com", phone_number="+971501180001")
+    agent = Agent(name="Async Agent", employee_id="ASYNC001", email="async.agent@example.com",
+                  phone_number="+971501180002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.flush()
+    call = Call(customer_id=customer.id, agent_id=agent.id, transcript="Customer: is the EQE in stock?")
+    db_session.add(call)
+    db_session.commit()
+
+    assert client.get(f"/calls/{call.id}").json()["transcript"] == "Customer: is the EQE in stock?"
+    assert [item["id"] for item in client.get(f"/customers/{customer.id}/calls/").json()] == [call.id]
+    assert client.get("/calls/", params={"pagination": "cursor"}).json()["items"][0]["id"] == call.id
+    assert client.get(f"/calls/{call.id}/analysis").json()["attempts"] == 0
+    assert client.get("/calls/999999").status_code == 404
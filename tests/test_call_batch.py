@@ -0,0 +1,67 @@
+from sqlalchemy import event
+from app.models import Agent, Call, Customer
+
+def _create_customer_and_agents(db_session):
+    customer = Customer(name="Batch Customer", email="batch.customer@example.com", phone_number="+971501130001")
+    agents = [
+        Agent(name=f"Batch Agent {i}", employee_id=f"BATCH00{i}", email=f"batch.agent{i}@example.com",
+              phone_number=f"+97150113001{i}", total_calls_handled=0, average_performance_score=0.0)
+        for i in range(2)
+    ]
+    db_session.add(customer)
+    db_session.add_all(agents)
+    db_session.commit()
+    return customer, agents
+
+def test_batch_creates_calls_and_reports_item_errors(client, db_session):
+    customer, agents = _create_customer_and_agents(db_session)
+    payload = [
+        {"customer_id": customer.id, "agent_id": agents[0].id, "transcript": "Tell me about the AMG GT"},
+        {"customer_id": customer.id, "agent_id": agents[0].id, "transcript": "I need service for my car"},
+        {"customer_id": customer.id, "agent_id": agents[1].id, "transcript": "I'm interested in the E-Class"},
+        {"customer_id": 999999, "agent_id": agents[1].id, "transcript": "Unknown customer"},
+        {"customer_id": customer.id, "agent_id": 999999, "transcript": "Unknown agent"},
+        {"customer_id": customer.id, "agent_id": agents[1].id, "transcript": "   "},
+    ]
+    response = client.post("/calls/batch?concurrency=4", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 3
+
+    results = data["results"]
+    assert [r["index"] for r in results] == list(range(6))
+    assert results[0]["call"]["customer_description"] == "AMG enthusiast"
+    assert results[2]["call"]["customer_description"] == "Very interested in E-Class"
+    assert results[3]["error"] == "Customer not found"
+    assert results[3]["status_code"] == 404
+    assert results[4]["error"] == "Agent not found"
+    assert results[5]["status_code"] == 422
+
+    db_session.expire_all()
+    assert db_session.query(Call).filter(Call.customer_id == customer.id).count() == 3
+    agent = db_session.get(Agent, agents[0].id)
+    assert agent.total_calls_handled == 2
+    assert agent.average_performance_score == (96.0 + 87.0) / 2
+
+def test_batch_too_large(client, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "call_batch_max_size", 1)
+    call = {"customer_id": 1, "agent_id": 1, "transcript": "Hello"}
+    response = client.post("/calls/batch", json=[call, call])
+    assert response.status_code == 413
+
+def test_batch_looks_the_cache_up_with_one_query(client, db_session, db_engine):
+    customer, agents = _create_customer_and_agents(db_session)
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    for size in (2, 8):
+        payload = [{"customer_id": customer.id, "agent_id": agents[0].id, "transcript": f"Batch {size} call {i}: AMG GT"}
+                   for i in range(size)]
+        statements.clear()
+        event.listen(db_engine, "before_cursor_execute", capture)
+        try:
+            assert client.post("/calls/batch", json=payload).json()["created"] == size
+        finally:
+            event.remove(db_engine, "before_cursor_execute", capture)
+        assert len([s for s in statements if s.startswith("SELECT") and "FROM analysis_cache" in s]) == 1
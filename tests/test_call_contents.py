@@ -0,0 +1,58 @@
+from sqlalchemy import event, text
+from app.db_types import CompressedJSON, CompressedText
+from app.models import Agent, Call, CallContent, Customer
+
+TRANSCRIPT = "Agent: Welcome to Mercedes-Benz. Customer: I'd like to test drive the EQS. " * 40
+
+def _create_call(db_session, count=1):
+    customer = Customer(name="Content Customer", email="content.customer@example.com", phone_number="+971501200001")
+    agent = Agent(name="Content Agent", employee_id="CONTENT001", email="content.agent@example.com",
+                  phone_number="+971501200002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.flush()
+    calls = [
+        Call(customer_id=customer.id, agent_id=agent.id, transcript=TRANSCRIPT, analysis_results={"summary": "EQS test drive"})
+        for _ in range(count)
+    ]
+    db_session.add_all(calls)
+    db_session.commit()
+    return calls
+
+def test_compressed_types_round_trip():
+    text_type, json_type = CompressedText(), CompressedJSON()
+    stored = text_type.process_bind_param(TRANSCRIPT, None)
+    assert len(stored) * 10 < len(TRANSCRIPT.encode())
+    assert text_type.process_result_value(stored, None) == TRANSCRIPT
+    value = {"scores": [1, 2.5], "note": "ü"}
+    assert json_type.process_result_value(json_type.process_bind_param(value, None), None) == value
+    assert text_type.process_bind_param(None, None) is None
+
+def test_transcript_is_stored_compressed_out_of_row(client, db_session):
+    call = _create_call(db_session)[0]
+    stored = db_session.execute(
+        text("SELECT length(transcript) FROM call_contents WHERE call_id = :id"), {"id": call.id}
+    ).scalar()
+    assert stored * 10 < len(TRANSCRIPT)
+    assert "transcript" not in {row[1] for row in db_session.execute(text("PRAGMA table_info(calls)"))}
+
+    data = client.get(f"/calls/{call.id}").json()
+    assert data["transcript"] == TRANSCRIPT
+    assert data["analysis_results"] == {"summary": "EQS test drive"}
+
+def test_full_call_list_loads_contents_in_one_query(client, db_session, async_db_engine):
+    calls = _create_call(db_session, count=5)
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_db_engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(f"/agents/{calls[0].agent_id}/calls/")
+    finally:
+        event.remove(async_db_engine, "before_cursor_execute", capture)
+    assert [item["transcript"] for item in response.json()] == [TRANSCRIPT] * 5
+    assert len([s for s in statements if "FROM call_contents" in s]) == 1
+
+def test_deleting_a_call_deletes_its_contents(db_session):
+    call = _create_call(db_session)[0]
+    db_session.delete(call)
+    db_session.commit()
+    assert db_session.query(CallContent).filter(CallContent.call_id == call.id).count() == 0
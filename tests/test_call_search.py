@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, UTC
+from app.models import Agent, Call, Customer
+from app.services.search_service import build_match_query
+from tests.test_query_plans import captured_plans
+
+TRANSCRIPTS = [
+    "Customer: I'd like to book a test drive in the AMG C63. Agent: Of course.",
+    "Customer: What would my trade-in be worth against a new GLC? Agent: Let me check.",
+    "Customer: The BMW X5 is cheaper. Agent: Our GLE comes with a better warranty.",
+    "Customer: Is the AMG GT available in red? Agent: It is, with a long wait."
+]
+
+def _setup(db_session):
+    customer = Customer(name="Search Customer", email="search.customer@example.com", phone_number="+971501180001")
+    agents = [
+        Agent(name=f"Search Agent {i}", employee_id=f"SEARCH00{i}", email=f"search.agent{i}@example.com",
+              phone_number=f"+97150118001{i}", total_calls_handled=0, average_performance_score=0.0)
+        for i in range(2)
+    ]
+    db_session.add_all([customer, *agents])
+    db_session.commit()
+    return customer, agents
+
+def _post(client, customer, agent, transcript, days_ago=0):
+    response = client.post("/calls/", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": transcript,
+        "call_date": (datetime.now(UTC) - timedelta(days=days_ago)).isoformat()
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def _search(client, **params):
+    response = client.get("/calls/search", params=params)
+    assert response.status_code == 200, response.json()
+    return response.json()
+
+def _create_calls(client, db_session):
+    customer, agents = _setup(db_session)
+    ids = [
+        _post(client, customer, agents[i % 2], transcript, days_ago=i * 10)
+        for i, transcript in enumerate(TRANSCRIPTS)
+    ]
+    return agents, ids
+
+def test_build_match_query_quotes_every_term():
+    assert build_match_query("trade-in") == '"trade-in"'
+    assert build_match_query('"test drive" AMG*') == '"test drive" "AMG"*'
+    assert build_match_query("OR BMW OR Audi OR") == '"BMW" OR "Audi"'
+    assert build_match_query('  " " ') == ""
+
+def test_search_words_phrases_and_prefixes(client, db_session):
+    _, ids = _create_calls(client, db_session)
+    assert {r["id"] for r in _search(client, q="amg")} == {ids[0], ids[3]}
+    assert [r["id"] for r in _search(client, q="trade-in")] == [ids[1]]
+    assert [r["id"] for r in _search(client, q='"test drive" amg')] == [ids[0]]
+    assert [r["id"] for r in _search(client, q='"drive test"')] == []
+    assert {r["id"] for r in _search(client, q="warrant*")} == {ids[2]}
+    assert {r["id"] for r in _search(client, q="BMW OR GLC")} == {ids[1], ids[2]}
+
+def test_search_results_have_snippets_and_ranks(client, db_session):
+    _create_calls(client, db_session)
+    results = _search(client, q="amg")
+    assert all("<mark>AMG</mark>" in r["snippet"] for r in results)
+    assert [r["rank"] for r in results] == sorted(r["rank"] for r in results)
+    assert "transcript" not in results[0]
+
+def test_search_filters_by_agent_and_date(client, db_session):
+    agents, ids = _create_calls(client, db_session)
+    assert [r["id"] for r in _search(client, q="amg", agent_id=agents[1].id)] == [ids[3]]
+    start = (datetime.now(UTC) - timedelta(days=5)).isoformat()
+    assert [r["id"] for r in _search(client, q="amg", start_date=start)] == [ids[0]]
+    end = (datetime.now(UTC) - timedelta(days=25)).isoformat()
+    assert [r["id"] for r in _search(client, q="amg", end_date=end)] == [ids[3]]
+    # The end bound is exclusive, as in the call list filters
+    call_date = db_session.get(Call, ids[3]).call_date.isoformat()
+    assert _search(client, q="amg", end_date=call_date) == []
+
+def test_index_follows_transcript_updates_and_deletes(client, db_session):
+    _, ids = _create_calls(client, db_session)
+    call = db_session.query(Call).filter(Call.id == ids[1]).first()
+    call.transcript = "Customer: Can I see the AMG SL?"
+    db_session.commit()
+    assert _search(client, q="trade-in") == []
+    assert ids[1] in {r["id"] for r in _search(client, q="amg")}
+
+    db_session.delete(db_session.query(Call).filter(Call.id == ids[0]).first())
+    db_session.commit()
+    assert {r["id"] for r in _search(client, q="amg")} == {ids[1], ids[3]}
+
+def test_search_rejects_empty_query(client):
+    assert client.get("/calls/search", params={"q": '""'}).status_code == 400
+    assert client.get("/calls/search").status_code == 422
+
+def test_search_uses_full_text_index(client, db_session, db_engine):
+    _create_calls(client, db_session)
+    with captured_plans(db_engine, "calls_fts") as plans:
+        _search(client, q="amg", agent_id=1)
+    assert plans and "VIRTUAL TABLE INDEX" in plans[0] and "USING INTEGER PRIMARY KEY" in plans[0], plans
@@ -0,0 +1,64 @@
+import json
+from app.models import Agent, Call, Customer
+
+def _parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def _create_customer_and_agent(db_session):
+    customer = Customer(name="Stream Customer", email="stream.customer@example.com", phone_number="+971501150001")
+    agent = Agent(name="Stream Agent", employee_id="STREAM001", email="stream.agent@example.com",
+                  phone_number="+971501150002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+    return customer, agent
+
+def test_stream_emits_partials_then_result(client, db_session):
+    customer, agent = _create_customer_and_agent(db_session)
+    response = client.post("/calls/analyze/stream", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": "Customer: I'd like to see the G-Class in the showroom"
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_events(response.text)
+    assert [name for name, _ in events[:-1]] == ["partial"] * (len(events) - 1)
+    assert len(events) > 2
+    name, result = events[-1]
+    assert name == "result"
+    assert result["analysis"]["customer_description"] == "Luxury SUV customer"
+    assert json.loads("".join(data["text"] for _, data in events[:-1])) == result["analysis"]
+
+    call = client.get(f"/calls/{result['call_id']}").json()
+    assert call["customer_description"] == "Luxury SUV customer"
+
+def test_stream_validates_before_streaming(client, db_session):
+    customer, _ = _create_customer_and_agent(db_session)
+    response = client.post("/calls/analyze/stream", json={
+        "customer_id": customer.id,
+        "agent_id": 999999,
+        "transcript": "Hello"
+    })
+    assert response.status_code == 404
+
+def test_stream_stores_the_call_with_its_own_session(client, db_session, monkeypatch):
+    customer, agent = _create_customer_and_agent(db_session)
+    def closed(*args, **kwargs):
+        raise AssertionError("the request's session was used after the endpoint returned")
+
+    # The request's session may be torn down before the body is sent
+    monkeypatch.setattr(db_session, "add", closed)
+    response = client.post("/calls/analyze/stream", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": "Customer: Is the EQS available for a test drive?"
+    })
+    name, result = _parse_events(response.text)[-1]
+    assert name == "result"
+    db_session.expire_all()
+    assert db_session.get(Call, result["call_id"]).customer_id == customer.id
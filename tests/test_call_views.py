@@ -0,0 +1,55 @@
+from sqlalchemy import event
+from app.models import Agent, Call, Customer
+
+def _create_calls(db_session, count=20):
+    customer = Customer(name="View Customer", email="view.customer@example.com", phone_number="+971501150101")
+    agent = Agent(name="View Agent", employee_id="VIEW001", email="view.agent@example.com",
+                  phone_number="+971501150102", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.flush()
+    db_session.add_all([
+        Call(customer_id=customer.id, agent_id=agent.id, transcript="Customer: tell me about the G-Class. " * 50,
+             agent_performance_score=90.0, analysis_results={"raw": "x" * 500})
+        for _ in range(count)
+    ])
+    db_session.commit()
+    return customer, agent
+
+def _selects(db_engine, action):
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine, "before_cursor_execute", capture)
+    try:
+        response = action()
+    finally:
+        event.remove(db_engine, "before_cursor_execute", capture)
+    return response, [s for s in statements if "FROM calls" in s]
+
+def test_summary_view_skips_heavy_columns(client, db_session, async_db_engine):
+    customer, agent = _create_calls(db_session)
+    for url in ["/calls/", f"/customers/{customer.id}/calls/", f"/agents/{agent.id}/calls/"]:
+        full = client.get(url)
+        summary, statements = _selects(async_db_engine, lambda: client.get(url, params={"view": "summary"}))
+        assert summary.status_code == 200
+        # Besides the ETag's id/version probe, one query reads the calls
+        statements = [s for s in statements if not s.startswith("SELECT calls.id, calls.version \nFROM")]
+        assert len(statements) == 1
+        assert "transcript" not in statements[0] and "analysis_results" not in statements[0]
+
+        item = summary.json()[0]
+        assert "transcript" not in item and "analysis_results" not in item
+        assert item["agent_performance_score"] == 90.0
+        assert len(summary.content) * 10 < len(full.content)
+
+def test_full_view_is_the_default(client, db_session):
+    customer, _ = _create_calls(db_session, count=1)
+    item = client.get(f"/customers/{customer.id}/calls/").json()[0]
+    assert item["transcript"].startswith("Customer: tell me about the G-Class.")
+    assert item["analysis_results"] == {"raw": "x" * 500}
+
+def test_summary_view_with_cursor_pagination(client, db_session):
+    _create_calls(db_session, count=3)
+    page = client.get("/calls/?pagination=cursor&view=summary&limit=2").json()
+    assert len(page["items"]) == 2
+    assert "transcript" not in page["items"][0]
+    assert page["next_cursor"]
@@ -0,0 +1,44 @@
+import threading
+from sqlalchemy import text
+from app.config import Settings
+from app.database import create_db_engine
+
+def test_sqlite_engine_applies_pragmas(db_engine):
+    with db_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -65536
+
+def test_readers_are_not_blocked_by_a_committing_writer(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        connection.execute(text("INSERT INTO items (name) VALUES ('first')"))
+
+    writer = engine.connect()
+    writer.exec_driver_sql("BEGIN EXCLUSIVE")
+    writer.execute(text("INSERT INTO items (name) VALUES ('second')"))
+    counts = []
+    reader = threading.Thread(target=lambda: counts.append(
+        engine.connect().execute(text("SELECT COUNT(*) FROM items")).scalar()
+    ))
+    reader.start()
+    reader.join(timeout=2)
+    writer.rollback()
+    writer.close()
+    engine.dispose()
+    assert counts == [1]
+
+def test_server_databases_get_a_sized_pool(monkeypatch):
+    import app.database as app_db
+    captured = {}
+    monkeypatch.setattr(app_db, "create_engine", lambda url, **kwargs: captured.update(url=url, **kwargs))
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("DB_POOL_RECYCLE_SECONDS", "600")
+    create_db_engine("postgresql://user@localhost/gargash", Settings())
+    assert captured["pool_size"] == 3
+    assert captured["max_overflow"] == 2
+    assert captured["pool_recycle"] == 600
+    assert captured["pool_pre_ping"] is True
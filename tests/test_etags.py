@@ -0,0 +1,90 @@
+from sqlalchemy import event
+from fastapi import status
+from app.etags import etag_matches, versions_etag
+from app.models import Agent, Call, Customer
+
+def _create_rows(db_session):
+    customer = Customer(name="ETag Customer", email="etag.customer@example.com", phone_number="+971501230001")
+    agent = Agent(name="ETag Agent", employee_id="ETAG001", email="etag.agent@example.com",
+                  phone_number="+971501230002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.flush()
+    db_session.add(Call(customer_id=customer.id, agent_id=agent.id, transcript="Customer: is the EQS available?"))
+    db_session.commit()
+    return customer, agent
+
+def _statements(db_engine, action):
+    statements = []
+    capture = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_engine, "before_cursor_execute", capture)
+    try:
+        response = action()
+    finally:
+        event.remove(db_engine, "before_cursor_execute", capture)
+    return response, statements
+
+def test_etag_matching():
+    etag = versions_etag("agents", [(1, 1), (2, 3)], "offset", 0, 100)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == versions_etag("agents", [(1, 1), (2, 3)], "offset", 0, 100)
+    assert etag != versions_etag("agents", [(1, 1), (2, 4)], "offset", 0, 100)
+    assert etag != versions_etag("agents", [(1, 1), (2, 3)], "offset", 0, 50)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"other"', etag)
+
+def test_unchanged_agent_list_is_not_modified(client, db_session, db_engine):
+    _, agent = _create_rows(db_session)
+    first = client.get("/agents/")
+    etag = first.headers["ETag"]
+
+    response, statements = _statements(db_engine, lambda: client.get("/agents/", headers={"If-None-Match": etag}))
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b"" and response.headers["ETag"] == etag
+    # Only the ids and versions were read
+    agent_reads = [s for s in statements if "FROM agents" in s]
+    assert len(agent_reads) == 1 and "agents.version" in agent_reads[0] and "agents.name" not in agent_reads[0]
+
+    assert client.get("/agents/", params={"pagination": "cursor"}).headers["ETag"] != etag
+    assert client.put(f"/agents/{agent.id}", json={"name": "Renamed Agent"}).status_code == status.HTTP_200_OK
+    changed = client.get("/agents/", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK and changed.headers["ETag"] != etag
+    assert any(item["name"] == "Renamed Agent" for item in changed.json())
+
+def test_bulk_updates_bump_the_version(client, db_session):
+    customer, agent = _create_rows(db_session)
+    etag = client.get("/agents/").headers["ETag"]
+    # Storing an analysed call updates the agent's metrics with a bulk UPDATE
+    response = client.post("/calls/", json={"customer_id": customer.id, "agent_id": agent.id,
+                                            "transcript": "Customer: I'd like to book an etag GLA test drive"})
+    assert response.status_code == status.HTTP_200_OK
+    db_session.expire_all()
+    assert db_session.get(Agent, agent.id).version == 2
+    assert client.get("/agents/", headers={"If-None-Match": etag}).status_code == status.HTTP_200_OK
+
+def test_customer_etag_follows_updates(client, db_session):
+    customer, _ = _create_rows(db_session)
+    etag = client.get(f"/customers/{customer.id}").headers["ETag"]
+    assert client.get(f"/customers/{customer.id}", headers={"If-None-Match": etag}).status_code == \
+        status.HTTP_304_NOT_MODIFIED
+
+    client.put(f"/customers/{customer.id}", json={"name": "Renamed Customer"})
+    changed = client.get(f"/customers/{customer.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK and changed.json()["name"] == "Renamed Customer"
+    assert client.get("/customers/999999", headers={"If-None-Match": etag}).status_code == \
+        status.HTTP_404_NOT_FOUND
+
+def test_customer_calls_etag_skips_loading_calls(client, db_session, async_db_engine):
+    customer, agent = _create_rows(db_session)
+    url = f"/customers/{customer.id}/calls/"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, params={"view": "summary"}).headers["ETag"] != etag
+
+    response, statements = _statements(async_db_engine, lambda: client.get(url, headers={"If-None-Match": etag}))
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert statements == ["SELECT calls.id, calls.version \nFROM calls \nWHERE calls.customer_id = ? ORDER BY calls.id"]
+
+    db_session.add(Call(customer_id=customer.id, agent_id=agent.id, transcript="Customer: and the EQE?"))
+    db_session.commit()
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK and len(changed.json()) == 2
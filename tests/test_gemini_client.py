@@ -0,0 +1,125 @@
+import asyncio
+import time
+import pytest
+from google.api_core import exceptions as google_exceptions
+from app.services.gemini_client import (
+    CircuitBreaker, CircuitOpenError, GeminiClient, GeminiUnavailableError, TokenBucket
+)
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel, failing the first `failures` calls."""
+
+    def __init__(self, failures=0, error=None, delay=0.0):
+        self.failures = failures
+        self.error = error or google_exceptions.ResourceExhausted("quota exceeded")
+        self.delay = delay
+        self.calls = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if self.calls <= self.failures:
+                raise self.error
+            return f"response to {prompt}"
+        finally:
+            self._in_flight -= 1
+
+def _client(model, **kwargs):
+    options = dict(max_concurrency=4, requests_per_minute=0, tokens_per_minute=0, max_retries=3,
+                   backoff_base=0.01, backoff_max=0.02, attempt_timeout=1.0, deadline=5.0,
+                   circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    options.update(kwargs)
+    return GeminiClient(model, **options)
+
+def test_retries_retryable_errors():
+    model = FakeModel(failures=2)
+    client = _client(model)
+    assert client.generate_sync("hi") == "response to hi"
+    assert model.calls == 3
+    assert client.stats()["retries"] == 2
+    assert client.stats()["circuit_breaker"]["state"] == "closed"
+
+def test_gives_up_and_opens_circuit():
+    model = FakeModel(failures=100)
+    client = _client(model, max_retries=1)
+    for _ in range(2):
+        with pytest.raises(GeminiUnavailableError):
+            client.generate_sync("hi")
+    assert client.stats()["circuit_breaker"]["state"] == "open"
+
+    calls = model.calls
+    with pytest.raises(CircuitOpenError):
+        client.generate_sync("hi")
+    assert model.calls == calls
+    assert client.stats()["circuit_breaker"]["rejected"] == 1
+
+def test_non_retryable_error_is_raised_immediately():
+    model = FakeModel(failures=1, error=google_exceptions.InvalidArgument("bad prompt"))
+    client = _client(model)
+    with pytest.raises(google_exceptions.InvalidArgument):
+        client.generate_sync("hi")
+    assert model.calls == 1
+    assert client.stats()["circuit_breaker"]["consecutive_failures"] == 0
+
+def test_non_retryable_error_leaves_the_breaker_unchanged():
+    client = _client(FakeModel(failures=100), max_retries=0)
+    with pytest.raises(GeminiUnavailableError):
+        client.generate_sync("hi")
+    client.model = FakeModel(failures=1, error=google_exceptions.InvalidArgument("bad prompt"))
+    with pytest.raises(google_exceptions.InvalidArgument):
+        client.generate_sync("hi")
+    assert client.stats()["circuit_breaker"]["consecutive_failures"] == 1
+    assert client.stats()["circuit_breaker"]["state"] == "closed"
+
+def test_attempt_timeout_is_retried_within_deadline():
+    model = FakeModel(delay=0.5)
+    client = _client(model, attempt_timeout=0.05, deadline=0.3, max_retries=10)
+    with pytest.raises(GeminiUnavailableError):
+        client.generate_sync("hi")
+    assert client.stats()["timeouts"] >= 1
+
+def test_concurrency_is_bounded():
+    model = FakeModel(delay=0.05)
+    client = _client(model, max_concurrency=2)
+
+    async def run_many():
+        return await asyncio.gather(*(client.generate(f"p{i}") for i in range(6)))
+
+    assert len(asyncio.run(run_many())) == 6
+    assert model.max_in_flight == 2
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)
+
+    async def take_two():
+        await bucket.acquire()
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(take_two()) >= 0.08
+    assert bucket.stats()["waits"] == 1
+
+def test_token_bucket_respects_deadline():
+    bucket = TokenBucket(rate_per_minute=1, capacity=1)
+
+    async def take_two():
+        await bucket.acquire()
+        await bucket.acquire(timeout=0.01)
+
+    with pytest.raises(GeminiUnavailableError):
+        asyncio.run(take_two())
+
+def test_queue_mode_waits_for_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05, mode="queue")
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert asyncio.run(breaker.before_call()) is True
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,127 @@
+import json
+import pytest
+from sqlalchemy import event
+from app.models import Agent, AnalysisJob, AnalysisStatus, Call, Customer, ImportStatus
+from app.services.import_service import ImportService
+
+def _upload(client, kind, name, content, **params):
+    return client.post(f"/imports/{kind}", params=params, files={"file": (name, content.encode())})
+
+def _ndjson(rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+def test_customer_csv_import_rejects_invalid_and_duplicate_rows(client, db_session):
+    db_session.add(Customer(name="Existing", email="existing@example.com", phone_number="+971501190000"))
+    db_session.commit()
+    content = "\n".join([
+        "name,email,phone_number",
+        "Amal,amal@example.com,+971501190001",
+        "Badr,badr@example.com,12345",
+        "Chadi,existing@example.com,+971501190003",
+        "Dana,amal@example.com,+971501190004",
+        "Eman,eman@example.com,+971501190005",
+        "Fadi,fadi@example.com,+971501190005"
+    ])
+    response = _upload(client, "customers", "crm.csv", content)
+    assert response.status_code == 200, response.json()
+    job = response.json()
+    assert (job["status"], job["rows_processed"], job["inserted"], job["rejected"]) == ("completed", 6, 2, 4)
+
+    emails = {c.email for c in db_session.query(Customer).filter(Customer.phone_number.like("+97150119%"))}
+    assert emails == {"existing@example.com", "amal@example.com", "eman@example.com"}
+
+    rejects = client.get(f"/imports/{job['id']}/rejects").json()
+    assert [(r["row"], r["error"]) for r in rejects] == [
+        (2, "phone_number: Value error, Phone must be +971XXXXXXXXX"),
+        (3, "Email already registered"),
+        (4, "Duplicate email in import"),
+        (6, "Duplicate phone number in import")
+    ]
+    assert rejects[0]["data"]["name"] == "Badr"
+    assert client.get(f"/imports/{job['id']}").json() == job
+
+def test_agent_ndjson_import_reports_bad_lines(client, db_session):
+    content = _ndjson([
+        {"name": "Agent One", "employee_id": "IMP001", "email": "imp1@example.com",
+         "phone_number": "+971501191001", "specialization": "AMG Specialist"},
+        "{not json",
+        {"name": "Agent Two", "employee_id": "IMP001", "email": "imp2@example.com", "phone_number": "+971501191002"}
+    ])
+    job = _upload(client, "agents", "agents.ndjson", content).json()
+    assert (job["inserted"], job["rejected"]) == (1, 2)
+    rejects = client.get(f"/imports/{job['id']}/rejects").json()
+    assert rejects[0]["row"] == 2 and rejects[0]["error"].startswith("Invalid JSON")
+    assert rejects[1]["error"] == "Duplicate employee id in import"
+    agent = db_session.query(Agent).filter(Agent.employee_id == "IMP001").one()
+    assert (agent.specialization, agent.is_active, agent.total_calls_handled) == ("AMG Specialist", True, 0)
+
+def test_call_import_queues_analysis_and_indexes_transcripts(client, db_session):
+    customer = Customer(name="Call Import", email="call.import@example.com", phone_number="+971501192001")
+    db_session.add(customer)
+    db_session.commit()
+    agent_id = db_session.query(Agent.id).first().id
+    content = _ndjson([
+        {"customer_id": customer.id, "agent_id": agent_id, "transcript": "Customer asked about an AMG trade-in.",
+         "call_date": "2024-03-01T10:00:00"},
+        {"customer_id": 999999, "agent_id": agent_id, "transcript": "Unknown customer."},
+        {"customer_id": customer.id, "agent_id": agent_id, "transcript": "   "}
+    ])
+    job = _upload(client, "calls", "history.jsonl", content).json()
+    assert (job["inserted"], job["rejected"]) == (1, 2)
+    assert [r["error"] for r in client.get(f"/imports/{job['id']}/rejects").json()] == [
+        "Customer not found", "Transcript must not be empty"
+    ]
+
+    call = db_session.query(Call).filter(Call.customer_id == customer.id).one()
+    assert call.analysis_status == AnalysisStatus.PENDING
+    assert db_session.query(AnalysisJob).filter(AnalysisJob.call_id == call.id).one().status == AnalysisStatus.PENDING
+    assert [r["id"] for r in client.get("/calls/search", params={"q": "trade-in"}).json()] == [call.id]
+
+def test_import_rejects_unknown_format_and_kind(client):
+    assert _upload(client, "customers", "crm.xlsx", "x").status_code == 400
+    assert _upload(client, "customers", "crm.txt", "name\n", format="csv").status_code == 200
+    assert _upload(client, "invoices", "crm.csv", "x").status_code == 422
+
+def test_interrupted_import_resumes_after_last_batch(client, db_session):
+    rows = [
+        {"name": f"Resume {i}", "email": f"resume{i}@example.com", "phone_number": f"+97150119300{i}"}
+        for i in range(5)
+    ]
+
+    def interrupted():
+        yield from rows[:3]
+        raise KeyboardInterrupt
+
+    service = ImportService(db_session, batch_size=2)
+    job = service.start_job("customers", "crm.csv")
+    with pytest.raises(KeyboardInterrupt):
+        service.run(job, interrupted())
+    assert (job.status, job.rows_processed, job.inserted) == (ImportStatus.RUNNING, 2, 2)
+
+    response = _upload(client, "customers", "crm.ndjson", _ndjson(rows), job_id=job.id)
+    assert response.status_code == 200, response.json()
+    assert (response.json()["rows_processed"], response.json()["inserted"], response.json()["rejected"]) == (5, 5, 0)
+    assert db_session.query(Customer).filter(Customer.email.like("resume%")).count() == 5
+    assert _upload(client, "customers", "crm.ndjson", _ndjson(rows), job_id=job.id).status_code == 409
+    assert _upload(client, "agents", "crm.ndjson", _ndjson(rows), job_id=job.id).status_code == 400
+
+def test_import_checks_uniqueness_with_one_query_per_field(db_session, db_engine):
+    rows = [
+        {"name": f"Bulk {i}", "email": f"bulk{i}@example.com", "phone_number": f"+9715011940{i:02d}"}
+        for i in range(50)
+    ]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split()[0].upper())
+
+    service = ImportService(db_session)
+    job = service.start_job("customers")
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        service.run(job, iter(rows))
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
+    assert job.inserted == 50
+    assert statements.count("INSERT") == 1
+    assert statements.count("SELECT") <= 4
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, UTC
+from app.models import Agent, CallIssue, Customer
+from app.services.issue_service import split_issues
+from tests.test_query_plans import captured_plans
+
+class IssueAIService:
+    """Reports the transcript itself as the agent's issues."""
+    cache_namespace = "issues:test"
+
+    def analyze_call(self, transcript):
+        return {
+            "agent_performance_score": 70.0,
+            "agent_issues": transcript,
+            "customer_interest_score": 50.0,
+            "customer_description": "",
+            "customer_preferences": "",
+            "test_drive_readiness": 10.0
+        }
+
+def _setup(client, db_session):
+    from app.main import app, get_ai_service
+    app.dependency_overrides[get_ai_service] = lambda: IssueAIService()
+    customer = Customer(name="Issue Customer", email="issue.customer@example.com", phone_number="+971501160001")
+    agents = [
+        Agent(name=f"Issue Agent {i}", employee_id=f"ISSUE00{i}", email=f"issue.agent{i}@example.com",
+              phone_number=f"+97150116001{i}", total_calls_handled=0, average_performance_score=0.0)
+        for i in range(2)
+    ]
+    db_session.add_all([customer, *agents])
+    db_session.commit()
+    return customer, agents
+
+def _post(client, customer, agent, issues, days_ago=0):
+    response = client.post("/calls/", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": issues,
+        "call_date": (datetime.now(UTC) - timedelta(days=days_ago)).isoformat()
+    })
+    assert response.status_code == 200
+    return response.json()
+
+def test_split_issues_canonicalises_labels():
+    assert split_issues(" Late ,  talked  over customer., late, No issues") == ["late", "talked over customer"]
+    assert split_issues("No issues") == []
+    assert split_issues(None) == []
+
+def test_issues_are_stored_at_analysis_time(client, db_session):
+    customer, agents = _setup(client, db_session)
+    call = _post(client, customer, agents[0], "Late, Rushed the customer")
+    issues = db_session.query(CallIssue).filter(CallIssue.call_id == call["id"]).order_by(CallIssue.id).all()
+    assert [(i.agent_id, i.issue) for i in issues] == [(agents[0].id, "late"), (agents[0].id, "rushed the customer")]
+
+def test_agent_and_fleet_issue_rankings(client, db_session):
+    customer, agents = _setup(client, db_session)
+    _post(client, customer, agents[0], "Late, Rushed")
+    _post(client, customer, agents[0], "late")
+    _post(client, customer, agents[0], "Rude", days_ago=20)
+    _post(client, customer, agents[1], "Rushed")
+    _post(client, customer, agents[1], "rushed, no follow-up")
+
+    assert client.get(f"/agents/{agents[0].id}/issues").json() == [
+        {"issue": "late", "count": 2}, {"issue": "rude", "count": 1}, {"issue": "rushed", "count": 1}
+    ]
+    assert client.get(f"/agents/{agents[0].id}/issues?days=7&limit=1").json() == [{"issue": "late", "count": 2}]
+    assert client.get("/issues/top?days=7").json() == [
+        {"issue": "rushed", "count": 3}, {"issue": "late", "count": 2}, {"issue": "no follow-up", "count": 1}
+    ]
+    assert client.get("/agents/999999/issues").status_code == 404
+
+def test_issue_rankings_read_from_covering_indexes(client, db_session, db_engine):
+    customer, agents = _setup(client, db_session)
+    with captured_plans(db_engine, "call_issues") as plans:
+        client.get(f"/agents/{agents[0].id}/issues")
+        client.get("/issues/top")
+    assert "COVERING INDEX ix_call_issues_agent_id_issue_call_date" in plans[0], plans
+    assert "COVERING INDEX ix_call_issues_call_date_issue" in plans[1], plans
@@ -0,0 +1,63 @@
+from app.services.long_transcript import chunk_transcript, merge_analyses, split_turns
+
+TURNS = [
+    "Agent: Good morning, thank you for calling Mercedes-Benz. ",
+    "Customer: Hi, I'm interested in the GLE for my family. ",
+    "Agent: The GLE is very spacious and safe. ",
+    "Customer: Can I book a test drive on Saturday? ",
+]
+
+def test_split_turns_on_speaker_labels():
+    assert split_turns("".join(TURNS)) == TURNS
+    assert split_turns("assistant: Hello\nuser: I want a C-Class") == ["assistant: Hello\n", "user: I want a C-Class"]
+
+def test_chunks_respect_limit_and_overlap():
+    transcript = "".join(TURNS * 10)
+    chunks = chunk_transcript(transcript, max_chars=200, overlap_turns=1)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    # The last turn of each chunk is repeated at the start of the next one
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.startswith(split_turns(previous)[-1].strip())
+
+def test_turn_longer_than_limit_is_split():
+    chunks = chunk_transcript("x" * 2500, max_chars=1000)
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+
+def test_merge_strategy():
+    merged = merge_analyses([
+        {"agent_performance_score": 80.0, "customer_interest_score": 50.0, "test_drive_readiness": 40.0,
+         "agent_issues": "No issues", "customer_description": "Browsing", "customer_preferences": "SUV, safety"},
+        {"agent_performance_score": 90.0, "customer_interest_score": 95.0, "test_drive_readiness": 90.0,
+         "agent_issues": "Did not confirm budget", "customer_description": "Ready to buy",
+         "customer_preferences": "safety, AMG"},
+    ], chunk_lengths=[100, 300])
+    assert merged["agent_performance_score"] == 87.5
+    assert merged["customer_interest_score"] == 83.75
+    assert merged["test_drive_readiness"] == 90.0
+    assert merged["agent_issues"] == "Did not confirm budget"
+    assert merged["customer_description"] == "Ready to buy"
+    assert merged["customer_preferences"] == "SUV, safety, AMG"
+    assert merged["chunk_count"] == 2
+
+def test_long_transcript_is_analysed_in_chunks(client, db_session):
+    from app.models import Agent, Customer
+    customer = Customer(name="Long Customer", email="long.customer@example.com", phone_number="+971501140001")
+    agent = Agent(name="Long Agent", employee_id="LONG001", email="long.agent@example.com",
+                  phone_number="+971501140002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+
+    transcript = "".join(TURNS * 150) + "Customer: Actually, tell me about the AMG GT. "
+    assert len(transcript) > 10000
+    response = client.post("/calls/", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": transcript
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["transcript"] == transcript
+    assert data["analysis_results"]["chunked"] is True
+    assert data["analysis_results"]["chunk_count"] >= 2
+    assert data["customer_description"] == "AMG enthusiast"
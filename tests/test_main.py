@@ -2,7 +2,9 @@ import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 from app.database import Base, get_db, get_default_ai_agent_id
-from app.models import Customer, Agent, Call
+from app.models import Customer, Agent, Call, InboxStatus, Inquiry, InquiryStatus
+from app.services.mock_ai_service import MockAIService
+from app.services.webhook_inbox_service import WebhookInboxService
 from datetime import datetime, UTC, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -376,7 +378,7 @@ def test_update_inquiry_with_transcripts(client, db):
     
     # Update the inquiry with transcript
     update_data = {
-        "inquiry_id": inquiry_id,
+        "metadata": {"inquiry_id": inquiry_id},
         "variables": {
             "model": "C-Class",
             "color": "Black"
@@ -384,15 +386,23 @@ def test_update_inquiry_with_transcripts(client, db):
         "concatenated_transcript": "assistant: Hello, how can I help you today?\nuser: I'm interested in a C-Class"
     }
     
+    # The webhook is acknowledged at once and applied by the inbox workers
     response = client.post("/inquiries/webhook", json=update_data)
-    assert response.status_code == 200
-    data = response.json()
+    assert response.status_code == 202
+    receipt = response.json()
+    assert receipt["inquiry_id"] == inquiry_id
+    assert receipt["duplicate"] is False
+    item = WebhookInboxService(db, MockAIService()).process_item(receipt["id"])
+    assert item.status == InboxStatus.COMPLETED
     
     # Verify the inquiry was updated
-    assert data["id"] == inquiry_id
+    inquiry = db.get(Inquiry, inquiry_id)
+    db.refresh(inquiry)
+    assert inquiry.status == InquiryStatus.DEAL
+    assert inquiry.variables == update_data["variables"]
     
     # Verify a call was created
-    calls_response = client.get(f"/customers/{data['customer_id']}/calls/")
+    calls_response = client.get(f"/customers/{inquiry.customer_id}/calls/")
     assert calls_response.status_code == 200
     calls = calls_response.json()
     assert len(calls) == 1
@@ -402,7 +412,7 @@ def test_update_inquiry_with_transcripts(client, db):
 def test_update_inquiry_not_found(client, db):
     """Test updating a non-existent inquiry."""
     update_data = {
-        "inquiry_id": 999999,  # Non-existent ID
+        "metadata": {"inquiry_id": 999999},  # Non-existent ID
         "variables": {"test": "value"},
         "concatenated_transcript": "assistant: Test message"
     }
@@ -426,7 +436,7 @@ def test_update_inquiry_invalid_data(client, db):
     
     # Try to update with invalid data
     invalid_data = {
-        "inquiry_id": inquiry_id,
+        "metadata": {"inquiry_id": inquiry_id},
         "variables": "not a dict",  # Should be a dict
         "concatenated_transcript": "assistant: Test message"
     }
@@ -450,16 +460,22 @@ def test_update_inquiry_empty_transcripts(client, db):
     
     # Update with empty transcript
     update_data = {
-        "inquiry_id": inquiry_id,
+        "metadata": {"inquiry_id": inquiry_id},
         "variables": {"test": "value"},
         "concatenated_transcript": ""
     }
     
     response = client.post("/inquiries/webhook", json=update_data)
-    assert response.status_code == 200
+    assert response.status_code == 202
+    assert response.json()["duplicate"] is False
+    item = WebhookInboxService(db, MockAIService()).process_item(response.json()["id"])
+    assert item.status == InboxStatus.COMPLETED
     
-    # Verify no call was created
-    calls_response = client.get(f"/customers/{response.json()['customer_id']}/calls/")
+    # Verify no call was created and the inquiry kept its status
+    inquiry = db.get(Inquiry, inquiry_id)
+    db.refresh(inquiry)
+    assert inquiry.status != InquiryStatus.DEAL
+    calls_response = client.get(f"/customers/{inquiry.customer_id}/calls/")
     assert calls_response.status_code == 200
     calls = calls_response.json()
     assert len(calls) == 0
@@ -510,14 +526,23 @@ def test_inquiry_status_transitions(client, db):
     
     # Update inquiry with transcript (should change status)
     update_data = {
-        "inquiry_id": inquiry_id,
+        "metadata": {"inquiry_id": inquiry_id},
         "variables": {"test": "value"},
         "concatenated_transcript": "assistant: Test message"
     }
     
     response = client.post("/inquiries/webhook", json=update_data)
-    assert response.status_code == 200
-    assert response.json()["status"] == "deal"
+    assert response.status_code == 202
+    WebhookInboxService(db, MockAIService()).process_item(response.json()["id"])
+    inquiry = db.get(Inquiry, inquiry_id)
+    db.refresh(inquiry)
+    assert inquiry.status == InquiryStatus.DEAL
+    
+    # A redelivery is acknowledged without being applied again
+    response = client.post("/inquiries/webhook", json=update_data)
+    assert response.status_code == 202
+    assert response.json()["duplicate"] is True
+    assert db.query(Call).filter(Call.customer_id == inquiry.customer_id).count() == 1
 
 def test_concurrent_access(client, db):
     """Test handling of concurrent access to the same resource."""
@@ -538,8 +563,9 @@ def test_concurrent_access(client, db):
 
 def test_transcript_length_validation(client, test_customer, test_agent):
     """Test validation of transcript length."""
-    # Create a call with very long transcript
-    long_transcript = "x" * 10001  # Assuming max length is 10000
+    # Create a call with a transcript too long even for chunked analysis
+    from app.config import get_settings
+    long_transcript = "x" * (get_settings().long_transcript_max_length + 1)
     response = client.post(
         "/calls/",
         json={
@@ -0,0 +1,51 @@
+import random
+import re
+import pytest
+from google.api_core import exceptions as google_exceptions
+from app.services.mock_ai_service import MODEL_PATTERNS, SCENARIO_PATTERNS, MockAIService
+
+def _classify_by_scanning(transcript):
+    lower = transcript.lower()
+    for key, pattern in MODEL_PATTERNS + SCENARIO_PATTERNS:
+        if re.search(pattern, lower):
+            return key
+    return None
+
+def test_single_pass_matcher_agrees_with_scanning_each_pattern():
+    words = ["e-class", "G class", "eqe", "electric", "cla", "AMG", "s-class", "c class", "glc",
+             "pre-owned", "service", "showroom", "price", "negotiation", "test_drive", "hello", "car"]
+    rng = random.Random(7)
+    mock = MockAIService()
+    for _ in range(500):
+        transcript = " ".join(rng.choices(words, k=rng.randint(1, 6)))
+        assert mock.classify(transcript) == _classify_by_scanning(transcript)
+
+def test_seeded_mock_is_reproducible():
+    first = MockAIService(seed=42)
+    second = MockAIService(seed=42)
+    transcripts = ["Just browsing", "Any offers?", "Hello"]
+    assert first.analyze_calls(transcripts) == second.analyze_calls(transcripts)
+
+def test_results_are_copies():
+    mock = MockAIService()
+    mock.analyze_call("AMG")["agent_performance_score"] = 0
+    assert mock.analyze_call("AMG")["agent_performance_score"] == 96.0
+
+def test_failure_rate_raises_gemini_errors():
+    mock = MockAIService(seed=1, failure_rate=1.0, failure_weights={google_exceptions.ResourceExhausted: 1.0})
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        mock.analyze_call("AMG")
+
+def test_latency_is_drawn_from_distribution():
+    mock = MockAIService(seed=3, latency_median=0.2)
+    delays = [mock._draw_request()[0] for _ in range(200)]
+    assert all(delay > 0 for delay in delays)
+    assert 0.1 < sorted(delays)[100] < 0.4
+
+def test_batch_analyses_each_transcript():
+    results = MockAIService().analyze_calls(["G-Class", "service visit"])
+    assert [r["customer_description"] for r in results] == ["Luxury SUV customer", "Service inquiry"]
+
+def test_empty_transcript_rejected():
+    with pytest.raises(ValueError):
+        MockAIService().analyze_call("  ")
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from datetime import datetime, UTC, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fastapi import status
+from app.config import get_settings
+from app.models import Inquiry, OutboxMessage, OutboxStatus
+from app.services.outbox_service import BLAND_CALL, OutboxDispatcher, OutboxService
+
+class StubBland(ThreadingHTTPServer):
+    """Local stand-in for the bland.ai calls endpoint.
+
+    Answers with the scripted status codes in turn, then 200, and records
+    each request and the client port it came from.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.statuses = []
+        self.delay = 0.0
+        self.requests = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/calls"
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append({"body": body, "headers": dict(self.headers), "port": self.client_address[1]})
+        time.sleep(self.server.delay)
+        code = self.server.statuses.pop(0) if self.server.statuses else 200
+        answer = json.dumps({"status": "success" if code == 200 else "error"}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def bland():
+    server = StubBland()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def dispatcher(bland, db_engine):
+    dispatcher = OutboxDispatcher(max_workers=2, timeout=0.5, poll_seconds=0.05, bland_api_url=bland.url,
+                                  bland_api_key="test-key", bland_webhook_url="https://example.com/inquiries/webhook")
+    yield dispatcher
+    dispatcher.shutdown()
+
+def _create_inquiry(client, i=0):
+    response = client.post("/inquiries/", json={
+        "name": f"Outbox Customer {i}",
+        "email": f"outbox.customer{i}@example.com",
+        "phone_number": f"+97150121{i:04d}",
+        "referral_nr": f"OUTBOX{i}"
+    })
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+def _make_due(db_session, message_id):
+    db_session.query(OutboxMessage).filter(OutboxMessage.id == message_id)\
+        .update({OutboxMessage.next_attempt_at: datetime.now(UTC) - timedelta(seconds=1)})
+    db_session.commit()
+
+def test_inquiry_is_stored_with_its_call_request(client, db_session, bland):
+    inquiry = _create_inquiry(client)
+    [message] = client.get("/outbox").json()
+    assert message["kind"] == BLAND_CALL and message["status"] == "pending"
+    assert message["inquiry_id"] == inquiry["id"]
+    assert message["payload"]["phone_number"] == inquiry["phone_number"]
+    assert message["payload"]["metadata"] == {"inquiry_id": inquiry["id"]}
+    # Nothing is sent on the request path, and a duplicate inquiry queues no second call
+    _create_inquiry(client)
+    assert len(client.get("/outbox").json()) == 1
+    assert bland.requests == []
+
+def test_dispatcher_sends_over_one_kept_alive_connection(client, db_session, bland, dispatcher):
+    for i in range(3):
+        _create_inquiry(client, i)
+    for message in client.get("/outbox").json():
+        sent = dispatcher.dispatch(db_session, message["id"])
+        assert sent.status == OutboxStatus.SENT and sent.response_code == 200 and sent.attempts == 1
+    assert len(bland.requests) == 3
+    assert len({request["port"] for request in bland.requests}) == 1
+    assert bland.requests[0]["headers"]["Authorization"] == "test-key"
+    assert bland.requests[0]["body"]["webhook"] == "https://example.com/inquiries/webhook"
+    # A message that was sent is not claimed again
+    assert dispatcher.dispatch(db_session, sent.id) is None
+
+def test_message_fails_without_bland_credentials(client, db_session, bland, monkeypatch):
+    monkeypatch.setattr(get_settings(), "bland_api_key", None)
+    monkeypatch.setattr(get_settings(), "bland_webhook_url", None)
+    _create_inquiry(client)
+    [message] = client.get("/outbox").json()
+    # The stored payload carries no credentials or deployment URL
+    assert "webhook" not in message["payload"]
+
+    dispatcher = OutboxDispatcher(max_workers=1, timeout=0.5, bland_api_url=bland.url)
+    failed = dispatcher.dispatch(db_session, message["id"])
+    assert failed.status == OutboxStatus.FAILED and "BLAND_API_KEY" in failed.error
+    assert bland.requests == []
+
+def test_server_error_is_retried_after_backoff(client, db_session, bland, dispatcher):
+    _create_inquiry(client)
+    [message] = client.get("/outbox").json()
+    bland.statuses = [503]
+    retried = dispatcher.dispatch(db_session, message["id"])
+    assert retried.status == OutboxStatus.PENDING and retried.response_code == 503
+    assert retried.next_attempt_at > datetime.now(UTC).replace(tzinfo=None)
+    assert OutboxService(db_session).get_due_message_ids() == []
+    assert dispatcher.dispatch(db_session, message["id"]) is None
+
+    _make_due(db_session, message["id"])
+    sent = dispatcher.dispatch(db_session, message["id"])
+    assert sent.status == OutboxStatus.SENT and sent.attempts == 2
+    assert len(bland.requests) == 2
+
+def test_timeout_is_retried(client, db_session, bland, dispatcher):
+    _create_inquiry(client)
+    [message] = client.get("/outbox").json()
+    bland.delay = 1.0
+    retried = dispatcher.dispatch(db_session, message["id"])
+    assert retried.status == OutboxStatus.PENDING and "Timeout" in retried.error
+
+def test_rejected_request_fails_then_is_replayed(client, db_session, bland, dispatcher):
+    _create_inquiry(client)
+    [message] = client.get("/outbox").json()
+    bland.statuses = [400]
+    failed = dispatcher.dispatch(db_session, message["id"])
+    assert failed.status == OutboxStatus.FAILED and failed.response_code == 400
+    assert [m["id"] for m in client.get("/outbox", params={"status": "failed"}).json()] == [message["id"]]
+
+    replayed = client.post(f"/outbox/{message['id']}/replay").json()
+    assert replayed["status"] == "pending" and replayed["attempts"] == 0
+    assert dispatcher.dispatch(db_session, message["id"]).status == OutboxStatus.SENT
+    assert client.post(f"/outbox/{message['id']}/replay").status_code == status.HTTP_409_CONFLICT
+    assert client.get("/outbox/999999").status_code == status.HTTP_404_NOT_FOUND
+
+def test_only_messages_whose_lease_expired_are_requeued(client, db_session):
+    for i in range(2):
+        _create_inquiry(client, i)
+    service = OutboxService(db_session)
+    message_ids = [message.id for message in service.get_messages()]
+    assert all(service.claim_message(message_id) for message_id in message_ids)
+
+    # The first message's worker went away; the second is still being sent by a running process
+    service.get_message(message_ids[0]).locked_at = datetime.now(UTC) - timedelta(seconds=service.lease_seconds + 1)
+    db_session.commit()
+
+    assert service.requeue_expired_messages() == 1
+    db_session.expire_all()
+    assert [service.get_message(message_id).status for message_id in message_ids] == [
+        OutboxStatus.PENDING, OutboxStatus.SENDING
+    ]
+    assert service.get_due_message_ids() == [message_ids[0]]
+
+def test_running_dispatcher_drains_the_outbox(client, db_session, bland, dispatcher):
+    for i in range(4):
+        _create_inquiry(client, i)
+    # One message is interrupted mid-send and one is due for a retry
+    messages = db_session.query(OutboxMessage).order_by(OutboxMessage.id).all()
+    messages[0].status = OutboxStatus.SENDING
+    messages[1].next_attempt_at = datetime.now(UTC) + timedelta(seconds=0.2)
+    db_session.commit()
+
+    dispatcher.start()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        db_session.expire_all()
+        if db_session.query(OutboxMessage).filter(OutboxMessage.status != OutboxStatus.SENT).count() == 0:
+            break
+        time.sleep(0.05)
+    assert db_session.query(OutboxMessage).filter(OutboxMessage.status == OutboxStatus.SENT).count() == 4
+    inquiry_ids = sorted(row.id for row in db_session.query(Inquiry.id))
+    assert sorted(request["body"]["metadata"]["inquiry_id"] for request in bland.requests) == inquiry_ids
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from app.models import Agent, Call, Customer
+from tests.test_query_plans import captured_plans
+
+def _create_calls(db_session, count=25):
+    customer = Customer(name="Page Customer", email="page.customer@example.com", phone_number="+971501140001")
+    agents = [
+        Agent(name=f"Page Agent {i}", employee_id=f"PAGE00{i}", email=f"page.agent{i}@example.com",
+              phone_number=f"+97150114001{i}", total_calls_handled=0, average_performance_score=0.0)
+        for i in range(2)
+    ]
+    db_session.add_all([customer, *agents])
+    db_session.flush()
+    start = datetime(2026, 1, 1, 9, 0)
+    # Every other pair of calls shares a timestamp, so ordering relies on the id tie-breaker
+    calls = [
+        Call(customer_id=customer.id, agent_id=agents[i % 2].id, transcript=f"Call {i}",
+             call_date=start + timedelta(hours=i // 2))
+        for i in range(count)
+    ]
+    db_session.add_all(calls)
+    db_session.commit()
+    return customer, agents, calls
+
+def _walk(client, url, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        response = client.get(url, params={"pagination": "cursor", "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+def test_cursor_walk_returns_every_call_once_in_order(client, db_session):
+    _, _, calls = _create_calls(db_session)
+    items, pages = _walk(client, "/calls/", limit=10)
+    assert pages == 3
+    expected = sorted(calls, key=lambda call: (call.call_date, call.id))
+    assert [item["id"] for item in items] == [call.id for call in expected]
+
+def test_cursor_pagination_with_filters(client, db_session):
+    _, agents, calls = _create_calls(db_session)
+    url = f"/calls/?agent_id={agents[1].id}&start_date=2026-01-01T10:00:00&end_date=2026-01-01T15:00:00"
+    items, _ = _walk(client, url, limit=2)
+    expected = [call.id for call in calls
+                if call.agent_id == agents[1].id and datetime(2026, 1, 1, 10) <= call.call_date < datetime(2026, 1, 1, 15)]
+    assert [item["id"] for item in items] == expected
+
+def test_offset_pagination_still_returns_a_list(client, db_session):
+    _create_calls(db_session)
+    response = client.get("/calls/?skip=5&limit=5")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+    assert len(response.json()) == 5
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/calls/?cursor=not-a-cursor").status_code == 400
+
+def test_customers_cursor_pagination(client, db_session):
+    for i in range(3):
+        db_session.add(Customer(name=f"C{i}", email=f"cursor{i}@example.com", phone_number=f"+97150114100{i}"))
+    db_session.commit()
+    items, _ = _walk(client, "/customers/", limit=1)
+    ids = [item["id"] for item in items]
+    assert ids == sorted(ids) and len(ids) >= 3
+
+def test_deep_page_seeks_with_index(client, db_session, async_db_engine):
+    _create_calls(db_session)
+    first = client.get("/calls/?pagination=cursor&limit=20").json()
+    with captured_plans(async_db_engine, "calls") as plans:
+        assert client.get(f"/calls/?cursor={first['next_cursor']}&limit=20").status_code == 200
+    assert "ix_calls_call_date" in plans[0], plans
+    assert "TEMP B-TREE" not in plans[0], plans
@@ -0,0 +1,82 @@
+from datetime import datetime, UTC
+from app.models import Agent, Customer
+from app.schemas import AgentPerformance, AgentUpdate
+from app.services.agent_service import AgentService
+from app.services.performance_cache import PerformanceCache, get_performance_cache, mark_agent_changed
+
+def _create_agent(db_session):
+    customer = Customer(name="Wallboard Customer", email="wallboard.customer@example.com", phone_number="+971501220001")
+    agent = Agent(name="Wallboard Agent", employee_id="WALL001", email="wallboard.agent@example.com",
+                  phone_number="+971501220002", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+    return customer, agent
+
+def _performance(agent_id, total_calls=0):
+    return AgentPerformance(agent_id=agent_id, agent_name="Agent", total_calls_handled=total_calls,
+                            average_performance_score=0.0, average_customer_interest=0.0,
+                            average_test_drive_readiness=0.0, agent_issues=[], specialization="", is_active=True)
+
+def _stats_change(client, before):
+    after = client.get("/agents/performance/cache/stats").json()
+    return {name: after[name] - before[name] for name in ("hits", "misses", "invalidations")}
+
+def test_polling_is_served_from_cache_until_a_call_commits(client, db_session):
+    customer, agent = _create_agent(db_session)
+    before = client.get("/agents/performance/cache/stats").json()
+    for _ in range(3):
+        assert client.get(f"/agents/{agent.id}/performance").json()["total_calls_handled"] == 0
+    assert _stats_change(client, before) == {"hits": 2, "misses": 1, "invalidations": 0}
+
+    response = client.post("/calls/", json={
+        "customer_id": customer.id,
+        "agent_id": agent.id,
+        "transcript": "Customer: I'd like to test drive the wallboard GLE",
+        "call_date": datetime.now(UTC).isoformat()
+    })
+    assert response.status_code == 200
+    assert client.get(f"/agents/{agent.id}/performance").json()["total_calls_handled"] == 1
+    assert _stats_change(client, before) == {"hits": 2, "misses": 2, "invalidations": 1}
+
+def test_agent_update_invalidates_on_commit_only(db_session):
+    _, agent = _create_agent(db_session)
+    service = AgentService(db_session)
+    assert service.calculate_performance(agent.id).agent_name == "Wallboard Agent"
+
+    invalidations = get_performance_cache().invalidations
+    mark_agent_changed(db_session, agent.id)
+    db_session.rollback()
+    db_session.commit()
+    assert get_performance_cache().invalidations == invalidations
+
+    service.update_agent(agent.id, AgentUpdate(name="Renamed Agent"))
+    assert get_performance_cache().invalidations == invalidations + 1
+    assert service.calculate_performance(agent.id).agent_name == "Renamed Agent"
+
+def test_result_computed_during_a_write_is_not_served():
+    cache = PerformanceCache(max_size=10, max_staleness_seconds=60, enabled=True)
+    key = cache.key(1, 30)
+    # A call for agent 1 commits while the result is being computed
+    cache.invalidate(1)
+    cache.put(key, _performance(1))
+    assert cache.get(cache.key(1, 30)) is None
+
+def test_cache_is_bounded_and_entries_go_stale():
+    cache = PerformanceCache(max_size=2, max_staleness_seconds=60, enabled=True)
+    for agent_id in (1, 2, 3):
+        cache.put(cache.key(agent_id, 30), _performance(agent_id))
+    assert cache.get(cache.key(1, 30)) is None
+    assert cache.get(cache.key(3, 30)).agent_id == 3
+    assert cache.stats()["evictions"] == 1
+
+    stale = PerformanceCache(max_size=2, max_staleness_seconds=0, enabled=True)
+    stale.put(stale.key(1, 30), _performance(1))
+    assert stale.get(stale.key(1, 30)) is None
+
+def test_cached_results_are_copies():
+    cache = PerformanceCache(max_size=2, max_staleness_seconds=60, enabled=True)
+    key = cache.key(1, 7)
+    cache.put(key, _performance(1))
+    cache.get(key).agent_issues.append("mutated")
+    assert cache.get(key).agent_issues == []
+    assert cache.get(cache.key(1, 30)) is None
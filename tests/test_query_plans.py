@@ -0,0 +1,51 @@
+import contextlib
+from sqlalchemy import event
+from app.models import Agent, Customer, Inquiry
+
+@contextlib.contextmanager
+def captured_plans(db_engine, table):
+    """Collect the SQLite query plan of every statement that reads `table`."""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {table}" in statement:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append(" | ".join(row[-1] for row in rows))
+
+    event.listen(db_engine, "before_cursor_execute", explain)
+    try:
+        yield plans
+    finally:
+        event.remove(db_engine, "before_cursor_execute", explain)
+
+def _create_customer_and_agent(db_session):
+    customer = Customer(name="Plan Customer", email="plan.customer@example.com", phone_number="+971501120001")
+    agent = Agent(name="Plan Agent", employee_id="PLAN001", email="plan.agent@example.com",
+                  phone_number="+971501120002", specialization="Sales", total_calls_handled=0, average_performance_score=0.0)
+    db_session.add_all([customer, agent])
+    db_session.commit()
+    return customer, agent
+
+def test_agent_call_query_uses_composite_index(client, db_session, async_db_engine):
+    _, agent = _create_customer_and_agent(db_session)
+    with captured_plans(async_db_engine, "calls") as plans:
+        assert client.get(f"/agents/{agent.id}/calls/").status_code == 200
+    assert plans and all("ix_calls_agent_id_call_date" in plan for plan in plans), plans
+
+def test_agent_performance_reads_daily_rollup_by_key(client, db_session, db_engine):
+    _, agent = _create_customer_and_agent(db_session)
+    with captured_plans(db_engine, "agent_daily_stats") as plans:
+        assert client.get(f"/agents/{agent.id}/performance").status_code == 200
+    assert len(plans) == 1
+    assert "USING PRIMARY KEY" in plans[0] or "sqlite_autoindex_agent_daily_stats" in plans[0], plans
+
+def test_customer_call_query_uses_composite_index(client, db_session, async_db_engine):
+    customer, _ = _create_customer_and_agent(db_session)
+    with captured_plans(async_db_engine, "calls") as plans:
+        assert client.get(f"/customers/{customer.id}/calls/").status_code == 200
+    assert plans and all("ix_calls_customer_id_call_date" in plan for plan in plans), plans
+
+def test_inquiry_status_filter_uses_index(db_session, db_engine):
+    with captured_plans(db_engine, "inquiries") as plans:
+        db_session.query(Inquiry).filter(Inquiry.status == "calling").all()
+    assert plans and "ix_inquiries_status" in plans[0], plans
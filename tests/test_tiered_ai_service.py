@@ -0,0 +1,59 @@
+from app.services.mock_ai_service import MockAIService
+from app.services.tiered_ai_service import CallTypeClassifier, TieredAIService
+
+SERVICE_CALL = (
+    "Agent: Mercedes-Benz service, how can I help? Customer: I need the annual service for my A-Class. "
+    "Agent: We can book you in for a maintenance appointment on Thursday."
+)
+SALES_CALL = "Customer: I'm interested in the new E-Class and would like a test drive. What financing do you offer?"
+
+class CountingAIService(MockAIService):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def analyze_call(self, transcript):
+        self.calls += 1
+        return {**super().analyze_call(transcript), "analysis_results": {"model": "counting"}}
+
+def test_classifier_scores_call_types():
+    classifier = CallTypeClassifier()
+    assert classifier.classify(SERVICE_CALL)["call_type"] == "service"
+    assert classifier.classify(SALES_CALL)["call_type"] == "sales"
+    assert classifier.classify("Hello there") == {"call_type": "general", "confidence": 0.0}
+
+def test_classifier_is_unsure_about_a_single_weak_keyword():
+    assert CallTypeClassifier().classify("Customer: Is the service good?")["confidence"] < 0.75
+
+def test_routine_call_is_analysed_locally():
+    llm = CountingAIService()
+    analysis = TieredAIService(llm, confidence_threshold=0.75).analyze_call(SERVICE_CALL)
+    assert llm.calls == 0
+    assert analysis["customer_description"] == "Service booking"
+    routing = analysis["analysis_results"]["routing"]
+    assert routing["tier"] == "local"
+    assert routing["call_type"] == "service"
+    assert routing["confidence"] >= 0.75
+
+def test_sales_and_unsure_calls_go_to_the_model():
+    llm = CountingAIService()
+    service = TieredAIService(llm, confidence_threshold=0.75)
+
+    analysis = service.analyze_call(SALES_CALL)
+    assert analysis["analysis_results"]["model"] == "counting"
+    assert analysis["analysis_results"]["routing"]["tier"] == "llm"
+    assert analysis["analysis_results"]["routing"]["call_type"] == "sales"
+
+    service.analyze_call("Customer: Is the service good?")
+    assert llm.calls == 2
+
+def test_streamed_local_analysis_round_trips():
+    import asyncio
+
+    service = TieredAIService(CountingAIService(), confidence_threshold=0.75)
+
+    async def collect():
+        return "".join([text async for text in service.stream_analysis(SERVICE_CALL)])
+
+    analysis = service.parse_analysis(asyncio.run(collect()))
+    assert analysis["analysis_results"]["routing"]["tier"] == "local"
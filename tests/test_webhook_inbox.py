@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, UTC, timedelta
+import httpx
+from fastapi import status
+from app.main import app
+from app.models import Call, Customer, InboxStatus, Inquiry, InquiryStatus
+from app.services.mock_ai_service import MockAIService
+from app.services.webhook_inbox_service import WebhookInboxService, webhook_dedupe_key
+
+class CountingAIService(MockAIService):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def analyze_call(self, transcript):
+        self.calls += 1
+        return super().analyze_call(transcript)
+
+class FailingAIService:
+    def analyze_call(self, transcript):
+        raise RuntimeError("quota exceeded")
+
+def _create_inquiries(db_session, count=1):
+    customers = [
+        Customer(name=f"Inbox Customer {i}", email=f"inbox.customer{i}@example.com", phone_number=f"+97150119{i:04d}")
+        for i in range(count)
+    ]
+    db_session.add_all(customers)
+    db_session.flush()
+    inquiries = [
+        Inquiry(customer_id=customer.id, referral_nr=f"INBOX{i}", status=InquiryStatus.CALLING)
+        for i, customer in enumerate(customers)
+    ]
+    db_session.add_all(inquiries)
+    db_session.commit()
+    return inquiries
+
+def _webhook(inquiry, transcript="user: I'd like to book a GLC test drive", **extra):
+    return {"metadata": {"inquiry_id": inquiry.id}, "variables": {"model": "GLC"},
+            "concatenated_transcript": transcript, **extra}
+
+def test_dedupe_key_prefers_call_id():
+    assert webhook_dedupe_key({"call_id": "abc", "variables": {}}) == "call:abc"
+    assert webhook_dedupe_key({"b": 1, "a": 2}) == webhook_dedupe_key({"a": 2, "b": 1})
+    assert webhook_dedupe_key({"a": 1}) != webhook_dedupe_key({"a": 2})
+
+def test_webhook_is_acknowledged_then_processed(client, db_session):
+    [inquiry] = _create_inquiries(db_session)
+    response = client.post("/inquiries/webhook", json=_webhook(inquiry, call_id="bland-1"))
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    receipt = response.json()
+    assert receipt["status"] == "pending" and receipt["duplicate"] is False
+    assert db_session.query(Call).count() == 0
+
+    item = WebhookInboxService(db_session, MockAIService()).process_item(receipt["id"])
+    assert item.status == InboxStatus.COMPLETED
+    db_session.refresh(inquiry)
+    assert inquiry.status == InquiryStatus.DEAL
+    assert inquiry.variables == {"model": "GLC"}
+    assert db_session.query(Call).filter(Call.customer_id == inquiry.customer_id).count() == 1
+    assert client.get(f"/inquiries/webhook/inbox/{item.id}").json()["attempts"] == 1
+
+def test_redelivered_webhook_is_applied_once(client, db_session):
+    [inquiry] = _create_inquiries(db_session)
+    transcript = "user: can I trade in my C-Class for an EQE?"
+    first = client.post("/inquiries/webhook", json=_webhook(inquiry, transcript, call_id="bland-2")).json()
+    # bland.ai retries after a timeout, sometimes with a changed body
+    again = client.post("/inquiries/webhook", json=_webhook(inquiry, "user: retried", call_id="bland-2")).json()
+    assert again["id"] == first["id"] and again["duplicate"] is True
+    # Without a call ID, an identical payload is the same delivery
+    hashed = client.post("/inquiries/webhook", json=_webhook(inquiry)).json()
+    assert client.post("/inquiries/webhook", json=_webhook(inquiry)).json()["id"] == hashed["id"]
+
+    ai_service = CountingAIService()
+    service = WebhookInboxService(db_session, ai_service)
+    assert service.process_item(first["id"]).status == InboxStatus.COMPLETED
+    assert service.process_item(first["id"]) is None
+    assert ai_service.calls == 1
+    assert db_session.query(Call).filter(Call.customer_id == inquiry.customer_id).count() == 1
+
+def test_failed_webhook_is_retried_then_replayed(client, db_session):
+    [inquiry] = _create_inquiries(db_session)
+    item_id = client.post("/inquiries/webhook", json=_webhook(inquiry)).json()["id"]
+
+    failing = WebhookInboxService(db_session, FailingAIService(), max_attempts=2)
+    retried = failing.process_item(item_id)
+    assert retried.status == InboxStatus.PENDING
+    # The retry waits for its backoff instead of running straight away
+    assert retried.next_attempt_at > datetime.now(UTC).replace(tzinfo=None)
+    assert failing.get_due_item_ids() == [] and failing.process_item(item_id) is None
+
+    retried.next_attempt_at = datetime.now(UTC) - timedelta(seconds=1)
+    db_session.commit()
+    item = failing.process_item(item_id)
+    assert item.status == InboxStatus.FAILED and "quota exceeded" in item.error
+    assert db_session.query(Call).count() == 0
+    assert [i["id"] for i in client.get("/inquiries/webhook/inbox", params={"status": "failed"}).json()] == [item_id]
+
+    replayed = client.post(f"/inquiries/webhook/inbox/{item_id}/replay").json()
+    assert replayed["status"] == "pending" and replayed["attempts"] == 0
+    assert WebhookInboxService(db_session, MockAIService()).process_item(item_id).status == InboxStatus.COMPLETED
+    assert client.post(f"/inquiries/webhook/inbox/{item_id}/replay").status_code == status.HTTP_409_CONFLICT
+
+def test_only_webhooks_whose_lease_expired_are_requeued(client, db_session):
+    inquiries = _create_inquiries(db_session, count=2)
+    item_ids = [client.post("/inquiries/webhook", json=_webhook(inquiry)).json()["id"] for inquiry in inquiries]
+    service = WebhookInboxService(db_session, MockAIService())
+    assert all(service.claim_item(item_id) for item_id in item_ids)
+
+    # The first webhook's worker went away; the second is still held by a running process
+    service.get_item(item_ids[0]).locked_at = datetime.now(UTC) - timedelta(seconds=service.lease_seconds + 1)
+    db_session.commit()
+
+    assert service.requeue_expired_items() == 1
+    db_session.expire_all()
+    assert [service.get_item(item_id).status for item_id in item_ids] == [InboxStatus.PENDING, InboxStatus.PROCESSING]
+    assert service.get_due_item_ids() == [item_ids[0]]
+
+def test_webhook_that_cannot_apply_fails_without_retrying(client, db_session):
+    [inquiry] = _create_inquiries(db_session)
+    item_id = client.post("/inquiries/webhook", json=_webhook(inquiry, transcript="   ")).json()["id"]
+    item = WebhookInboxService(db_session, CountingAIService()).process_item(item_id)
+    assert item.status == InboxStatus.FAILED
+    assert item.attempts == 1
+    assert item.error == "Transcript must not be empty"
+
+def test_webhook_for_unknown_inquiry_is_not_found(client, db_session):
+    payload = {"metadata": {"inquiry_id": 999999}, "variables": {}, "concatenated_transcript": "hi"}
+    response = client.post("/inquiries/webhook", json=payload)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_concurrent_webhooks_are_all_stored(db_session):
+    count = 100
+    inquiries = _create_inquiries(db_session, count)
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            return await asyncio.gather(*(
+                client.post("/inquiries/webhook", json=_webhook(inquiry, call_id=f"bland-{inquiry.id % 50}"))
+                for inquiry in inquiries
+            ))
+
+    responses = asyncio.run(post_all())
+    assert {response.status_code for response in responses} == {status.HTTP_202_ACCEPTED}
+    # Half are redeliveries of a call ID already received
+    assert sum(response.json()["duplicate"] for response in responses) == count // 2
+    assert len(WebhookInboxService(db_session).get_due_item_ids()) == count // 2